@@ -0,0 +1,64 @@
+"""
+Benchmark the fb2cal birthday card extraction engines on synthetic month pages.
+
+Run from the repository root:
+    python benchmarks/bench_birthday_card_extraction.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fb2cal.src import fb2cal
+
+CARD_COUNTS = [50, 100, 250, 500, 1000]
+REPEAT = 5
+
+
+def synthetic_card(i: int) -> str:
+    """Returns the html of a single birthday card resembling the async
+    birthday endpoint output."""
+    if i % 3:
+        vanity_name = f'friend.number.{i}'
+    else:
+        vanity_name = f'profile.php?id={100000000000 + i}'
+    name = f'Friend Number&#039;{i}'
+    return (f'<li class="_43q7"><a class="link" '
+            f'href="https://www.facebook.com/{vanity_name}" '
+            f'data-hovercard="/ajax/hovercard/user.php?id={i}" '
+            f'data-tooltip-content="{name} ({(i % 12) + 1:02d}/{(i % 28) + 1:02d})">'
+            f'<img class="_s0 _4ooo _1ve7 _rw img" '
+            f'src="https://scontent.xx.fbcdn.net/v/t1.0-1/p32x32/{i}_n.jpg" '
+            f'alt="{name}" aria-label="{name}" role="img" /></a>'
+            f'<div class="_6a"><span class="_43q8">&#x200e;</span></div></li>')
+
+
+def synthetic_month(card_count: int) -> str:
+    """Returns the birthday card html of a month with card_count cards."""
+    return '<ul class="_43q9">' + ''.join(
+        synthetic_card(i) for i in range(card_count)) + '</ul>'
+
+
+def main() -> None:
+    print(f"{'cards':>6} {'regex (ms)':>12} {'single_pass (ms)':>17} "
+          f"{'speedup':>8}")
+    for card_count in CARD_COUNTS:
+        month_html = synthetic_month(card_count)
+        assert fb2cal.extract_birthday_cards_regex(month_html) == \
+            fb2cal.extract_birthday_cards_single_pass(month_html)
+
+        regex_time = min(timeit.repeat(
+            lambda: fb2cal.extract_birthday_cards_regex(month_html),
+            number=10, repeat=REPEAT)) / 10
+        single_pass_time = min(timeit.repeat(
+            lambda: fb2cal.extract_birthday_cards_single_pass(month_html),
+            number=10, repeat=REPEAT)) / 10
+        print(f'{card_count:>6} {regex_time * 1000:>12.3f} '
+              f'{single_pass_time * 1000:>17.3f} '
+              f'{regex_time / single_pass_time:>7.2f}x')
+
+
+if __name__ == '__main__':
+    main()
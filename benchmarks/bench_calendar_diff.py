@@ -0,0 +1,99 @@
+"""
+Benchmark updating a stored birthday calendar from a downloaded one, comparing
+the set based diff engine with the previous list based update loop.
+
+Run from the repository root:
+    python benchmarks/bench_calendar_diff.py
+"""
+
+import os
+import sys
+import copy
+import time
+import random
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from fb2cal.src import fb2cal
+from calendar_store import CalendarStore
+from calendar_diff import diff_calendars, apply_changes
+
+FRIEND_COUNTS = [1000, 5000, 10000]
+CHURN = 0.02  # Fraction of friends added, removed and moved between downloads
+
+
+def synthetic_calendars(count: int) -> tuple:
+    """Returns (stored calendar, downloaded calendar, friend uids) where the
+    downloaded calendar drops, adds and moves CHURN of the birthdays."""
+    random.seed(count)
+    birthdays = [fb2cal.Birthday(str(100000000000000 + i), f'Friend {i}',
+                                 random.randint(1, 28), random.randint(1, 12))
+                 for i in range(count)]
+    churn = int(count * CHURN)
+    new_birthdays = [copy.copy(birthday) for birthday in birthdays[churn:]]
+    for birthday in new_birthdays[:churn]:
+        birthday.day = birthday.day % 28 + 1
+    new_birthdays += [fb2cal.Birthday(str(200000000000000 + i), f'New {i}',
+                                      1, 1) for i in range(churn)]
+    friend_uids = {birthday.uid for birthday in new_birthdays}
+    return (fb2cal.populate_birthdays_calendar(birthdays),
+            fb2cal.populate_birthdays_calendar(new_birthdays), friend_uids)
+
+
+def legacy_update(cal, new_cal, get_friend_uids) -> None:
+    """Previous update_birthday_calendar loop. Iterates over a copy of the
+    stored events so that removing from the set does not raise."""
+    def get_birthday_by_uid(uid, birthday_calendar):
+        for event in birthday_calendar.events:
+            if event.uid == uid:
+                return event.begin
+
+    all_old_uids = [event.uid for event in cal.events]
+    all_new_uids = [event.uid for event in new_cal.events]
+    for event in new_cal.events:
+        if event.uid in all_old_uids:
+            updated_birthday = get_birthday_by_uid(event.uid, new_cal)
+            if event.begin != updated_birthday:
+                event.begin = updated_birthday
+        else:
+            cal.events.add(event)
+    for event in list(cal.events):
+        if event.uid not in all_new_uids:
+            if event.uid not in get_friend_uids():
+                cal.events.remove(event)
+
+
+def diff_update(cal, new_cal, get_friend_uids) -> None:
+    store = CalendarStore(cal)
+    apply_changes(store, diff_calendars(store, CalendarStore(new_cal),
+                                        get_friend_uids))
+
+
+def measure(update, count: int) -> tuple:
+    """Returns (seconds, friend list fetches) of one calendar update."""
+    cal, new_cal, friend_uids = synthetic_calendars(count)
+    fetches = []
+
+    def get_friend_uids():
+        fetches.append(1)
+        return friend_uids
+
+    start = time.perf_counter()
+    update(cal, new_cal, get_friend_uids)
+    return time.perf_counter() - start, len(fetches)
+
+
+def main() -> None:
+    print(f"{'friends':>8} {'legacy (s)':>11} {'fetches':>8} "
+          f"{'diff (s)':>9} {'fetches':>8}")
+    for count in FRIEND_COUNTS:
+        legacy_time, legacy_fetches = measure(legacy_update, count)
+        diff_time, diff_fetches = measure(diff_update, count)
+        print(f'{count:>8} {legacy_time:>11.3f} {legacy_fetches:>8} '
+              f'{diff_time:>9.3f} {diff_fetches:>8}')
+
+
+if __name__ == '__main__':
+    main()
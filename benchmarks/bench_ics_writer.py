@@ -0,0 +1,73 @@
+"""
+Benchmark fb2cal ICS serialization, comparing the streaming writer with
+building an ics Calendar and joining its lines into one string.
+
+Run from the repository root:
+    python benchmarks/bench_ics_writer.py
+"""
+
+import os
+import sys
+import time
+import random
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fb2cal.src import fb2cal
+from fb2cal.src.ics_writer import write_calendar_ics
+
+FRIEND_COUNTS = [1000, 5000, 20000]
+
+
+class NullStream:
+    """Text stream discarding everything written to it."""
+
+    def write(self, text: str) -> int:
+        return len(text)
+
+
+def synthetic_birthdays(count: int) -> list:
+    """Returns count birthdays with unique uids."""
+    random.seed(count)
+    return [fb2cal.Birthday(str(100000000000000 + i), f'Friend {i}',
+                            random.randint(1, 28), random.randint(1, 12))
+            for i in range(count)]
+
+
+def calendar_serialization(birthdays: list) -> None:
+    c = fb2cal.populate_birthdays_calendar(birthdays)
+    NullStream().write(fb2cal.get_ics_str(c.serialize_iter()))
+
+
+def streaming_serialization(birthdays: list) -> None:
+    events = fb2cal.get_birthday_events(birthdays)
+    write_calendar_ics(fb2cal.iter_birthday_events_ics(events), NullStream())
+
+
+def measure(function, birthdays: list) -> tuple:
+    """Returns (seconds, peak traced bytes) of a call to function."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    function(birthdays)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main() -> None:
+    print(f"{'friends':>8} {'calendar (s)':>13} {'peak (KiB)':>11} "
+          f"{'streaming (s)':>14} {'peak (KiB)':>11}")
+    for count in FRIEND_COUNTS:
+        birthdays = synthetic_birthdays(count)
+        calendar_time, calendar_peak = measure(calendar_serialization,
+                                               birthdays)
+        streaming_time, streaming_peak = measure(streaming_serialization,
+                                                 birthdays)
+        print(f'{count:>8} {calendar_time:>13.3f} {calendar_peak / 1024:>11.0f}'
+              f' {streaming_time:>14.3f} {streaming_peak / 1024:>11.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark loading a birthday ics file, comparing the ics parser used by
+tools.parse_ics with the lazy mmap loader. The ics parser alone takes several
+minutes on the 100k event file.
+
+Run from the repository root:
+    python benchmarks/bench_lazy_ics.py
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from ics import Calendar
+from lazy_ics import LazyCalendar
+
+EVENT_COUNTS = [1000, 10000, 100000]
+
+
+def write_synthetic_ics(path: str, count: int) -> None:
+    """Writes count birthday events in the format of FBUser.save_calendar."""
+    random.seed(count)
+    with open(path, 'w') as f:
+        f.write('BEGIN:VCALENDAR\r\nVERSION:2.0\r\n'
+                'PRODID:ics.py - http://git.io/lLljaA\r\n')
+        for i in range(count):
+            f.write(f'BEGIN:VEVENT\r\nRRULE:FREQ=YEARLY\r\n'
+                    f'DTSTART;VALUE=DATE:2021{random.randint(1, 12):02d}'
+                    f'{random.randint(1, 28):02d}\r\n'
+                    + ('DESCRIPTION:Happy birthday\\, have a great day!\r\n'
+                       if i % 4 == 0 else '') +
+                    f'DURATION:P1D\r\nSUMMARY:Friend {i}\'s Birthday\r\n'
+                    f'UID:{100000000000000 + i}\r\nEND:VEVENT\r\n')
+        f.write('END:VCALENDAR')
+
+
+def parse_ics(path: str) -> int:
+    """Same as tools.parse_ics, returns the number of events."""
+    with open(path, 'rb') as g:
+        return len(Calendar(g.read().decode()).events)
+
+
+def index_lazy(path: str) -> int:
+    with LazyCalendar(path) as cal:
+        return len(cal)
+
+
+def load_lazy_records(path: str) -> int:
+    with LazyCalendar(path) as cal:
+        return sum(1 for _ in cal.iter_records())
+
+
+def measure(load, path: str) -> float:
+    start = time.perf_counter()
+    load(path)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    print(f"{'events':>8} {'ics parse (s)':>14} {'lazy index (s)':>15} "
+          f"{'lazy records (s)':>17}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for count in EVENT_COUNTS:
+            path = os.path.join(tmp_dir, f'birthdays_{count}.ics')
+            write_synthetic_ics(path, count)
+            times = [measure(load, path)
+                     for load in (parse_ics, index_lazy, load_lazy_records)]
+            print(f'{count:>8} {times[0]:>14.3f} {times[1]:>15.3f} '
+                  f'{times[2]:>17.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark the memory held by the birthday calendar and the friends list,
+comparing ics Events and [name, url, photo] lists with compact birthday
+records and Friend tuples.
+
+Run from the repository root:
+    python benchmarks/bench_records_memory.py
+"""
+
+import os
+import sys
+import gc
+import random
+import tracemalloc
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from ics import Calendar
+from calendar_store import BirthdayRecord, CalendarStore
+from friend_directory import Friend
+
+FRIEND_COUNTS = [1000, 5000, 20000]
+MESSAGES = ['Happy birthday!', 'Happy birthday, have a great day!',
+            'Wishing you all the best on your birthday!']
+
+
+def synthetic_birthdays(count: int) -> list:
+    """Returns (uid, name, month, day, message) of count friends. A quarter of
+    them have a scheduled message, copied like messages parsed from a file."""
+    random.seed(count)
+    return [(str(100000000000000 + i), f"Friend {i}'s Birthday",
+             random.randint(1, 12), random.randint(1, 28),
+             ''.join(list(random.choice(MESSAGES))) if i % 4 == 0 else None)
+            for i in range(count)]
+
+
+def build_events(birthdays: list) -> Calendar:
+    cal = Calendar()
+    for uid, name, month, day, message in birthdays:
+        event = BirthdayRecord(uid, name, 2021, month, day).to_event()
+        event.description = message
+        cal.events.add(event)
+    return cal
+
+
+def build_records(birthdays: list) -> CalendarStore:
+    return CalendarStore(build_events(birthdays))
+
+
+def build_friend_lists(birthdays: list) -> dict:
+    return {uid: [name[:-11], f'https://www.facebook.com/{uid}',
+                  f'https://scontent.xx.fbcdn.net/{uid}.jpg']
+            for uid, name, _, _, _ in birthdays}
+
+
+def build_friend_records(birthdays: list) -> dict:
+    return {uid: Friend(name[:-11], f'https://www.facebook.com/{uid}',
+                        f'https://scontent.xx.fbcdn.net/{uid}.jpg')
+            for uid, name, _, _, _ in birthdays}
+
+
+def retained_bytes(build, birthdays: list) -> int:
+    """Returns the bytes still allocated once build's result is complete."""
+    gc.collect()
+    tracemalloc.start()
+    result = build(birthdays)
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return retained
+
+
+def main() -> None:
+    print(f"{'friends':>8} {'events (MiB)':>13} {'records (MiB)':>14} "
+          f"{'lists (MiB)':>12} {'tuples (MiB)':>13}")
+    for count in FRIEND_COUNTS:
+        birthdays = synthetic_birthdays(count)
+        sizes = [retained_bytes(build, birthdays) / 2 ** 20
+                 for build in (build_events, build_records,
+                               build_friend_lists, build_friend_records)]
+        print(f'{count:>8} {sizes[0]:>13.2f} {sizes[1]:>14.2f} '
+              f'{sizes[2]:>12.2f} {sizes[3]:>13.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark fb2cal tooltip date parsing across all supported locales, comparing
+the precompiled per-locale parsers with the previous strptime based parsing.
+
+Run from the repository root:
+    python benchmarks/bench_tooltip_parsing.py
+"""
+
+import os
+import sys
+import time
+import logging
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fb2cal.src import fb2cal
+
+TOOLTIPS_PER_LOCALE = 2000
+NAME = 'Jane Doe'
+
+logger = logging.getLogger('bench')
+
+
+def legacy_parse_birthday_day_month(tooltip_content: str, name: str,
+                                    user_locale: str) -> tuple:
+    """Previous implementation of the date path of
+    fb2cal.parse_birthday_day_month: strip, rebuild the locale mapping and
+    call strptime for every tooltip."""
+    birthday_date_str = tooltip_content
+    for string in [name, '(', ')', '&#x200f;', '&#x200e;', '&#x55d;']:
+        birthday_date_str = birthday_date_str.replace(string, '')
+    birthday_date_str = birthday_date_str.strip()
+    locale_date_format_mapping = dict(fb2cal.LOCALE_DATE_FORMAT_MAPPING)
+    parsed_date = datetime.strptime(birthday_date_str,
+                                    locale_date_format_mapping[user_locale])
+    return parsed_date.day, parsed_date.month
+
+
+def synthetic_tooltips(date_format: str) -> list:
+    """Returns TOOLTIPS_PER_LOCALE tooltips cycling through a year of dates."""
+    start = date(2001, 1, 1)
+    return [f'{NAME} (&#x200e;'
+            f'{(start + timedelta(days=i % 365)).strftime(date_format)})'
+            for i in range(TOOLTIPS_PER_LOCALE)]
+
+
+def main() -> None:
+    legacy_total = precompiled_total = 0
+    print(f"{'locale':>7} {'strptime (ms)':>14} {'precompiled (ms)':>17}")
+    for user_locale, date_format in \
+            fb2cal.LOCALE_DATE_FORMAT_MAPPING.items():
+        tooltips = synthetic_tooltips(date_format)
+
+        start = time.perf_counter()
+        expected = [legacy_parse_birthday_day_month(tooltip, NAME,
+                                                    user_locale)
+                    for tooltip in tooltips]
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = [fb2cal.parse_birthday_day_month(tooltip, NAME,
+                                                  user_locale, logger)
+                  for tooltip in tooltips]
+        precompiled_time = time.perf_counter() - start
+
+        assert actual == expected, user_locale
+        legacy_total += legacy_time
+        precompiled_total += precompiled_time
+        print(f'{user_locale:>7} {legacy_time * 1000:>14.2f} '
+              f'{precompiled_time * 1000:>17.2f}')
+
+    print(f"{'total':>7} {legacy_total * 1000:>14.2f} "
+          f"{precompiled_total * 1000:>17.2f} "
+          f"({legacy_total / precompiled_total:.1f}x faster)")
+
+
+if __name__ == '__main__':
+    main()
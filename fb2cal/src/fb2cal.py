@@ -25,7 +25,6 @@ import re
 import mechanicalsoup
 import requests
 import urllib.parse
-from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
 from babel import Locale
@@ -33,6 +32,9 @@ from babel.core import UnknownLocaleError
 from babel.dates import format_date
 import html
 import locale
+import calendar
+import time
+import hashlib
 import pytz
 import json
 import ics
@@ -40,7 +42,19 @@ from ics import Calendar, Event
 from ics.grammar.parse import ContentLine
 import configparser
 import logging
+import logging.handlers
+import queue
+import atexit
 from distutils import util
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+
+from .resolution_cache import ResolutionCache
+from .month_cache import MonthCache
+from .transport import TransportSettings, configure_session
+from .session_store import SessionStore
+from .rate_governor import RateGovernor
+from .ics_writer import iter_calendar_ics, write_calendar_ics, get_event_hash, escape_text
 
 from oauth2client import file, client, tools
 from googleapiclient.discovery import build
@@ -49,13 +63,24 @@ from googleapiclient.errors import HttpError
 from httplib2 import Http
 from io import BytesIO
 
+# Logging
+LOG_PAYLOAD_MAX_LENGTH = 2000
+
+# Config
+CONFIG_FILE_NAME = 'config.ini'
+CONFIG_FILE_PATH = f'fb2cal/config/{CONFIG_FILE_NAME}'
+CONFIG_FILE_TEMPLATE_NAME = 'config-template.ini'
+
 # Classes
 class Birthday:
-    def __init__(self, uid, name, day, month):
-        self.uid = uid # Unique identififer for person (required for ics events)
+    __slots__ = ('uid', 'name', 'day', 'month', 'vanity_name') # Tens of thousands are kept in memory while fetching
+
+    def __init__(self, uid, name, day, month, vanity_name=None):
+        self.uid = uid # Unique identififer for person (required for ics events), None until resolved
         self.name = name
         self.day = day
         self.month = month
+        self.vanity_name = vanity_name # Custom profile name used to resolve uid
 
     def __str__(self):
         return f'{self.name} ({self.day}/{self.month})'
@@ -63,146 +88,368 @@ class Birthday:
     def __unicode__(self):
         return u'{self.name} ({self.day}/{self.month})'
 
+class BirthdayEvent:
+    """ Compact yearly all day event for a birthday. Hashes and compares like the ics Event
+        populate_birthdays_calendar creates, so a set of them iterates in the same order as Calendar.events. """
+
+    __slots__ = ('birthday', 'year', '_hash')
+
+    def __init__(self, birthday, year):
+        datetime(year, birthday.month, birthday.day) # Reject invalid dates like ics does
+        self.birthday = birthday
+        self.year = year
+        self._hash = get_event_hash(birthday.uid)
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if not isinstance(other, BirthdayEvent):
+            return NotImplemented
+        return (self.birthday.name == other.birthday.name and self.year == other.year
+                and self.birthday.month == other.birthday.month and self.birthday.day == other.birthday.day)
+
+    def serialize(self):
+        """ Returns the VEVENT block ics would serialize for this birthday """
+
+        return (f'BEGIN:VEVENT\r\n'
+                f'RRULE:FREQ=YEARLY\r\n'
+                f'DTSTART;VALUE=DATE:{self.year:04d}{self.birthday.month:02d}{self.birthday.day:02d}\r\n'
+                f'DURATION:P1D\r\n'
+                f'SUMMARY:{escape_text(self.birthday.name)}\'s Birthday\r\n'
+                f'UID:{self.birthday.uid}\r\n'
+                f'END:VEVENT')
+
 # Entry point
-def main(logger):
+def main(logger, session_cookies=None):
 
     # Set CWD to script directory
     # os.chdir(sys.path[0])
 
     # Read config
-    CONFIG_FILE_NAME = 'config.ini'
-    CONFIG_FILE_PATH = f'fb2cal/config/{CONFIG_FILE_NAME}'
-    CONFIG_FILE_TEMPLATE_NAME = 'config-template.ini'
-    logger.info(f'Attemping to parse config file {CONFIG_FILE_NAME}...')
+    config = load_config(CONFIG_FILE_PATH, logger)
+
+    # Set logging level based on config
+    set_logging_level(config, logger)
+
+    # Authenticate with Google API early
+    if util.strtobool(config['DRIVE']['UPLOAD_TO_DRIVE']):
+        logger.info('Authenticating with Google Drive API...')
+        service = google_drive_api_authenticate()
+        logger.info('Successfully authenticated with Google Drive API.')
+
+    # Fetch birthday objects for all friends, streaming them into compact events
+    logger.info('Creating birthday ICS file...')
+    events = get_birthday_events(fetch_birthdays(config, logger, session_cookies))
+
+    if len(events) == 0:
+        logger.warning(f'Birthday list is empty. Failed to fetch any birthdays.')
+        raise SystemError
+
+    logger.info(f'A total of {len(events)} birthdays were found.')
+    logger.info('ICS file created successfully.')
+
+    # Save to file system
+    if util.strtobool(config['FILESYSTEM']['SAVE_TO_FILE']):
+        save_ics_file(iter_birthday_events_ics(events), config['FILESYSTEM']['ICS_FILE_PATH'], logger)
+
+    # Upload to drive
+    if util.strtobool(config['DRIVE']['UPLOAD_TO_DRIVE']):
+        ics_str = get_ics_str(iter_birthday_events_ics(events))
+        log_debug_payload(logger, ics_str, 'ics_str')
+
+        if upload_to_drive(service, config, bytearray(ics_str, 'utf-8'), logger): # Pass payload as bytes
+            # Update config file with updated file id and digest for subsequent runs
+            logger.info('Saving changes to config file...')
+            with open(CONFIG_FILE_PATH, 'w') as configfile:
+                config.write(configfile)
+            logger.info('Successfully saved changes to config file.')
+
+    logger.info('Done! Terminating gracefully.')
+
+def load_config(config_file_path, logger):
+    """ Read the fb2cal config file into a ConfigParser """
+
+    logger.info(f'Attemping to parse config file {config_file_path}...')
     config = configparser.ConfigParser()
 
     try:
-        dataset = config.read(CONFIG_FILE_PATH, encoding='UTF-8')
+        dataset = config.read(config_file_path, encoding='UTF-8')
         if not dataset:
-            logger.error(f'{CONFIG_FILE_PATH} does not exist. Please rename {CONFIG_FILE_TEMPLATE_NAME} if you have not done so already.')
+            logger.error(f'{config_file_path} does not exist. Please rename {CONFIG_FILE_TEMPLATE_NAME} if you have not done so already.')
             raise SystemExit
     except configparser.Error as e:
         logger.error(f'ConfigParser error: {e}')
         raise SystemExit
 
     logger.info('Config successfully loaded.')
+    return config
+
+def set_logging_level(config, logger):
+    """ Set the level of the logger from the config. The root logger is left alone, as fb2cal may run inside another application. """
 
-    # Set logging level based on config
     try:
         logger.setLevel(getattr(logging, config['LOGGING']['level']))
-        logging.getLogger().setLevel(logger.level) # Also set root logger level
     except AttributeError:
         logger.error(f'Invalid logging level specified. Level: {config["LOGGING"]["level"]}')
         raise SystemError
 
     logger.info(f'Logging level set to: {logging.getLevelName(logger.level)}')
 
-    # Authenticate with Google API early
-    if util.strtobool(config['DRIVE']['UPLOAD_TO_DRIVE']):
-        logger.info('Authenticating with Google Drive API...')
-        service = google_drive_api_authenticate()
-        logger.info('Successfully authenticated with Google Drive API.')
+def fetch_birthdays(config, logger, session_cookies=None):
+    """ Authenticate with Facebook and yield birthday objects for all friends as they are resolved.
+        Nothing is fetched until the first birthday is requested. Once all birthdays have been consumed,
+        the enabled caches and stored session are written to disk. Nothing else is written to disk. """
+
+    fetch_workers = config.getint('FETCH', 'WORKERS', fallback=1)
+    resolver_workers = config.getint('FETCH', 'RESOLVER_WORKERS', fallback=1)
 
-    # Init browser
+    # Init browser and the rate governor shared by all Facebook requests
     browser = mechanicalsoup.StatefulBrowser()
-    init_browser(browser)
+    init_browser(browser, get_transport_settings(config, fetch_workers + resolver_workers))
+    rate_governor = init_rate_governor(config)
 
-    # Attempt login
+    # Attempt login, reusing a shared or stored session if it is still valid
     logger.info('Attemping to authenticate with Facebook...')
-    facebook_authenticate(browser, config['AUTH']['FB_EMAIL'],
-            config['AUTH']['FB_PASS'], logger)
+    session_store = init_session_store(config)
+    if session_cookies and use_facebook_session_cookies(browser, session_cookies, logger):
+        logger.info('Using shared Facebook session.')
+    elif session_store and restore_facebook_session(browser, session_store, config['AUTH']['FB_EMAIL'], logger):
+        logger.info('Reusing stored Facebook session.')
+    else:
+        facebook_authenticate(browser, config['AUTH']['FB_EMAIL'],
+                config['AUTH']['FB_PASS'], logger)
     logger.info('Successfully authenticated with Facebook.')
 
-    # Get birthday objects for all friends via async endpoint
+    # Load persistent vanity name resolution and month caches
+    resolution_cache = init_resolution_cache(config, logger)
+    month_cache = init_month_cache(config, logger)
+
+    # Fetch birthday objects for all friends via async endpoint
     logger.info('Fetching all Birthdays via async endpoint...')
-    birthdays = get_async_birthdays(browser, logger)
+    yield from iter_async_birthdays(browser, logger,
+            fetch_workers, resolution_cache, resolver_workers,
+            config.getint('FETCH', 'QUEUE_DEPTH', fallback=64),
+            config.get('PARSER', 'CARD_ENGINE', fallback='regex'), month_cache,
+            RefreshPolicy(config.getint('REFRESH', 'NEAR_MONTHS', fallback=2),
+                          config.getint('REFRESH', 'NEAR_REFRESH_DAYS', fallback=1),
+                          config.getint('REFRESH', 'DISTANT_REFRESH_DAYS', fallback=7)),
+            config.getboolean('FETCH', 'SKIP_UNRESOLVED', fallback=False))
+
+    if resolution_cache:
+        resolution_cache.save(logger)
+        logger.info(f'Vanity name resolution cache: {resolution_cache.hits} hits, {resolution_cache.misses} misses.')
+    if month_cache:
+        month_cache.save(logger)
+    if session_store:
+        save_facebook_session(browser, session_store, config['AUTH']['FB_EMAIL'], logger)
+
+    log_rate_governor_stats(rate_governor, logger)
+
+def fetch_birthday_events(config, session_cookies=None, ics_file_path=None):
+    """ Library entry point. Fetch birthdays using an in-memory config and return them as a set of compact
+        BirthdayEvents, without building an ics Calendar. The calendar is only written to disk if ics_file_path is provided. """
 
-    if len(birthdays) == 0:
-        logger.warning(f'Birthday list is empty. Failed to fetch any birthdays.')
-        raise SystemError
+    logger = setup_custom_logger('fb2cal')
+    set_logging_level(config, logger)
+    events = get_birthday_events(fetch_birthdays(config, logger, session_cookies))
+    logger.info(f'A total of {len(events)} birthdays were found.')
 
-    logger.info(f'A total of {len(birthdays)} birthdays were found.')
+    if ics_file_path:
+        save_ics_file(iter_birthday_events_ics(events), ics_file_path, logger)
 
-    # Create birthdays ICS file
-    logger.info('Creating birthday ICS file...')
-    c = populate_birthdays_calendar(birthdays)
-    logger.info('ICS file created successfully.')
+    return events
+
+def get_ics_str(lines):
+    """ Join calendar lines into an ICS string """
 
     # Remove blank lines
-    ics_str = ''.join([line.rstrip('\n') for line in c])
-    logger.debug(f'ics_str: {ics_str}')
+    return ''.join([line.rstrip('\n') for line in lines])
 
-    # Save to file system
-    if util.strtobool(config['FILESYSTEM']['SAVE_TO_FILE']):
-        logger.info(f'Saving ICS file to local file system...')
+def save_ics_file(lines, ics_file_path, logger):
+    """ Stream calendar lines into an ICS file on the local file system """
 
-        if not os.path.exists(os.path.dirname(config['FILESYSTEM']['ICS_FILE_PATH'])):
-            os.makedirs(os.path.dirname(config['FILESYSTEM']['ICS_FILE_PATH']), exist_ok=True)
+    logger.info(f'Saving ICS file to local file system...')
 
-        with open(config['FILESYSTEM']['ICS_FILE_PATH'], mode='w', encoding="UTF-8") as ics_file:
-            ics_file.write(ics_str)
-        logger.info(f'Successfully saved ICS file to {os.path.abspath(config["FILESYSTEM"]["ICS_FILE_PATH"])}')
+    if not os.path.exists(os.path.dirname(ics_file_path)):
+        os.makedirs(os.path.dirname(ics_file_path), exist_ok=True)
 
-    # Upload to drive
-    if util.strtobool(config['DRIVE']['UPLOAD_TO_DRIVE']):
-        logger.info('Uploading ICS file to Google Drive...')
-        metadata = {'name': config['DRIVE']['ICS_FILE_NAME']}
-        UPLOAD_RETRY_ATTEMPTS = 3
-        uploaded_successfully = False
-
-        for attempt in range(UPLOAD_RETRY_ATTEMPTS):
-            try:
-                updated_file = upload_and_replace_file(service, config['DRIVE']['DRIVE_FILE_ID'], metadata, bytearray(ics_str, 'utf-8')) # Pass payload as bytes
-                config.set('DRIVE', 'DRIVE_FILE_ID', updated_file['id'])
-                uploaded_successfully = True
-            except HttpError as e:
-                if e.resp.status == 404: # file not found
-                    if config['DRIVE']['DRIVE_FILE_ID']:
-                        logger.warning(f'{e}. Resetting stored file id in config and trying again. Attempt: {attempt+1}')
-                        config.set('DRIVE', 'DRIVE_FILE_ID', '') # reset stored file_id
-                        continue
-                    else:
-                        logger.error(e)
-                        raise SystemError
-                else:
-                    logger.error(e)
-                    raise SystemError
+    with open(ics_file_path, mode='w', encoding="UTF-8") as ics_file:
+        write_calendar_ics((line.rstrip('\n') for line in lines), ics_file) # Remove blank lines
+    logger.info(f'Successfully saved ICS file to {os.path.abspath(ics_file_path)}')
 
-        if uploaded_successfully:
-            logger.info(f'Successfully uploaded {config["DRIVE"]["ICS_FILE_NAME"]} to Google Drive with file id: {config["DRIVE"]["DRIVE_FILE_ID"]}\nDirect download link: http://drive.google.com/uc?export=download&id={config["DRIVE"]["DRIVE_FILE_ID"]}')
-        else:
-            logger.error(f'Failed to upload {config["DRIVE"]["ICS_FILE_NAME"]} to Google Drive after {UPLOAD_RETRY_ATTEMPTS} attempts.')
-            raise SystemError
+__log_listener = None
+__log_queue_handler = None
+__log_logger = None
+def setup_custom_logger(name):
+    """ Setup logger. Records are handed to a queue and written to the console and a rotating log file by a background thread.
+        Only the named logger and its children are handled, so the logging of other libraries in the process is left alone. """
+    LOGGING_FILE_PATH = './logs/fb2cal.log'
+    LOGGING_FILE_MAX_BYTES = 5 * 1024 * 1024
+    LOGGING_FILE_BACKUP_COUNT = 5
+
+    global __log_listener, __log_queue_handler, __log_logger
+    if __log_listener is None:
+        if not os.path.exists(os.path.dirname(LOGGING_FILE_PATH)):
+            os.makedirs(os.path.dirname(LOGGING_FILE_PATH), exist_ok=True)
+
+        formatter = logging.Formatter('[%(asctime)s] %(name)s %(levelname)s (%(funcName)s) %(message)s')
+        handlers = [logging.StreamHandler(),
+                    logging.handlers.RotatingFileHandler(LOGGING_FILE_PATH, maxBytes=LOGGING_FILE_MAX_BYTES,
+                                                         backupCount=LOGGING_FILE_BACKUP_COUNT, encoding='UTF-8')]
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        log_queue = queue.Queue(-1)
+        __log_listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        __log_listener.start()
+        atexit.register(stop_logging)
+
+        __log_queue_handler = logging.handlers.QueueHandler(log_queue)
+        __log_logger = logging.getLogger(name)
+        __log_logger.addHandler(__log_queue_handler)
+        __log_logger.setLevel(logging.DEBUG)
+        __log_logger.propagate = False # Records are already written, don't hand them to the root logger's handlers too
 
-    # Update config file with updated file id for subsequent runs
-    logger.info('Saving changes to config file...')
-    with open(CONFIG_FILE_PATH, 'w') as configfile:
-        config.write(configfile)
-    logger.info('Successfully saved changes to config file.')
+    return logging.getLogger(name)
 
-    logger.info('Done! Terminating gracefully.')
+def stop_logging():
+    """ Flush queued log records and stop the background log writer """
 
-def setup_custom_logger(name):
-    """ Setup logger """
-    LOGGING_FILE_PATH = './logs/fb2cal.log'
+    global __log_listener, __log_queue_handler, __log_logger
+    if __log_listener is not None:
+        __log_logger.removeHandler(__log_queue_handler)
+        __log_listener.stop()
+        for handler in __log_listener.handlers:
+            handler.close()
+        __log_listener = None
+        __log_queue_handler = None
+        __log_logger = None
 
-    if not os.path.exists(os.path.dirname(LOGGING_FILE_PATH)):
-        os.makedirs(os.path.dirname(LOGGING_FILE_PATH), exist_ok=True)
+def log_debug_payload(logger, payload, label=None):
+    """ Log a potentially large payload (a response, json object or string) at DEBUG level.
+        The payload is only converted to text if DEBUG is enabled and is truncated to LOG_PAYLOAD_MAX_LENGTH characters. """
 
-    logging.basicConfig(
-        format='[%(asctime)s] %(name)s %(levelname)s (%(funcName)s) %(message)s',
-        level=logging.DEBUG,
-        handlers=[logging.StreamHandler(),
-                  logging.FileHandler(LOGGING_FILE_PATH, encoding='UTF-8')]
-    )
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
 
-    return logging.getLogger(name)
+    text = payload.text if isinstance(payload, requests.Response) else str(payload)
+    if len(text) > LOG_PAYLOAD_MAX_LENGTH:
+        text = f'{text[:LOG_PAYLOAD_MAX_LENGTH]}... ({len(text) - LOG_PAYLOAD_MAX_LENGTH} more characters)'
+
+    if label:
+        logger.debug('%s: %s', label, text, stacklevel=2)
+    else:
+        logger.debug('%s', text, stacklevel=2)
+
+
+def init_resolution_cache(config, logger):
+    """ Create and load the persistent vanity name resolution cache. Returns None if the cache is disabled. """
+
+    if not config.getboolean('CACHE', 'RESOLUTION_CACHE_ENABLED', fallback=True):
+        logger.info('Vanity name resolution cache is disabled.')
+        return None
+
+    SECONDS_PER_DAY = 24 * 60 * 60
+    resolution_cache = ResolutionCache(
+        config.get('CACHE', 'RESOLUTION_CACHE_PATH', fallback='./fb2cal/cache/resolution_cache.json'),
+        config.getfloat('CACHE', 'RESOLUTION_TTL_DAYS', fallback=30) * SECONDS_PER_DAY,
+        config.getfloat('CACHE', 'RESOLUTION_NEGATIVE_TTL_DAYS', fallback=1) * SECONDS_PER_DAY,
+        config.getint('CACHE', 'RESOLUTION_CACHE_MAX_ENTRIES', fallback=20000))
+    resolution_cache.load(logger)
+
+    return resolution_cache
+
+def init_month_cache(config, logger):
+    """ Create and load the persistent month cache. Returns None if the cache is disabled. """
+
+    if not config.getboolean('CACHE', 'MONTH_CACHE_ENABLED', fallback=True):
+        logger.info('Month cache is disabled.')
+        return None
+
+    month_cache = MonthCache(config.get('CACHE', 'MONTH_CACHE_PATH', fallback='./fb2cal/cache/month_cache.json'))
+    month_cache.load(logger)
+
+    return month_cache
+
+def init_session_store(config):
+    """ Create the persistent Facebook session store. Returns None if session reuse is disabled. """
+
+    if not config.getboolean('SESSION', 'REUSE_SESSION', fallback=True):
+        return None
+
+    SECONDS_PER_DAY = 24 * 60 * 60
+    return SessionStore(config.get('SESSION', 'SESSION_PATH', fallback='./fb2cal/cache/session.json'),
+                        config.getfloat('SESSION', 'SESSION_TTL_DAYS', fallback=7) * SECONDS_PER_DAY)
+
+def get_transport_settings(config, concurrency):
+    """ Read browser transport settings from config. The connection pool defaults to the fetch concurrency. """
+
+    return TransportSettings(
+        pool_size=config.getint('HTTP', 'POOL_SIZE', fallback=0) or max(concurrency, 1),
+        max_retries=config.getint('HTTP', 'MAX_RETRIES', fallback=3),
+        backoff_factor=config.getfloat('HTTP', 'BACKOFF_FACTOR', fallback=0.5),
+        backoff_jitter=config.getfloat('HTTP', 'BACKOFF_JITTER', fallback=0.5),
+        connect_timeout=config.getfloat('HTTP', 'CONNECT_TIMEOUT', fallback=10),
+        read_timeout=config.getfloat('HTTP', 'READ_TIMEOUT', fallback=30))
+
+__rate_governor = None
+def init_rate_governor(config):
+    """ Create the rate governor shared by all Facebook requests """
+
+    global __rate_governor
+    __rate_governor = RateGovernor(
+        config.getfloat('RATE', 'MAX_RATE', fallback=4),
+        config.getfloat('RATE', 'MIN_RATE', fallback=0.5),
+        config.getint('RATE', 'BURST', fallback=4),
+        config.getfloat('RATE', 'ADDITIVE_INCREASE', fallback=0.1),
+        config.getfloat('RATE', 'MULTIPLICATIVE_DECREASE', fallback=0.5))
+    return __rate_governor
+
+def governed_get(browser, endpoint, url):
+    """ browser.get paced by the shared rate governor, recording statistics for endpoint """
+
+    rate_governor = __rate_governor
+    if rate_governor is None:
+        return browser.get(url)
+
+    wait = rate_governor.acquire()
+    start = time.monotonic()
+    try:
+        response = browser.get(url)
+    except requests.exceptions.RequestException:
+        rate_governor.record(endpoint, time.monotonic() - start, wait, True)
+        raise
+
+    rate_governor.record(endpoint, time.monotonic() - start, wait, is_throttled_response(response))
+    return response
+
+def is_throttled_response(response):
+    """ Returns True if Facebook throttled a request: a 429 or 5xx status, a response that needed retries or a security checkpoint """
 
+    if response.status_code == 429 or response.status_code >= 500:
+        return True
 
-def init_browser(browser):
+    if '/checkpoint' in response.url:
+        return True
+
+    retries = getattr(response.raw, 'retries', None)
+    return bool(retries and retries.history)
+
+def log_rate_governor_stats(rate_governor, logger):
+    """ Log per endpoint request statistics of the rate governor """
+
+    for endpoint, stats in sorted(rate_governor.stats.items()):
+        logger.info(f'Endpoint {endpoint}: {stats}.')
+    logger.info(f'Request rate settled at {rate_governor.rate:.2f} requests/s (max {rate_governor.max_rate:.2f}).')
+
+def init_browser(browser, transport_settings=None):
     """ Initialize browser as needed """
     browser.set_user_agent('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/74.0.3729.169 Safari/537.36')
 
+    if transport_settings:
+        configure_session(browser.session, transport_settings)
+
 def facebook_authenticate(browser, email, password, logger):
     """ Authenticate with Facebook setting up session for further requests """
 
@@ -211,17 +458,17 @@ def facebook_authenticate(browser, email, password, logger):
     regexp = re.compile(FACEBOOK_DATR_TOKEN_REGEXP, re.MULTILINE)
 
     # Add 'datr' cookie to session for countries adhering to GDPR compliance
-    login_page = browser.get(FACEBOOK_LOGIN_URL)
+    login_page = governed_get(browser, 'login', FACEBOOK_LOGIN_URL)
 
     if login_page.status_code != 200:
-        logger.debug(login_page.text)
+        log_debug_payload(logger, login_page)
         logger.error(f'Failed to authenticate with Facebook with email {email}. Stage: Initial Request for datr Token, Status code: {login_page.status_code}.')
         raise SystemError
 
     matches = regexp.search(login_page.text)
 
     if not matches or len(matches.groups()) != 1:
-        logger.debug(login_page.text)
+        log_debug_payload(logger, login_page)
         logger.error(f'Match failed or unexpected number of regexp matches when trying to get datr token.')
         raise SystemError
 
@@ -233,10 +480,10 @@ def facebook_authenticate(browser, email, password, logger):
     browser.get_cookiejar().set_cookie(_js_datr_cookie)
 
     # Perform main login now
-    login_page = browser.get(FACEBOOK_LOGIN_URL)
+    login_page = governed_get(browser, 'login', FACEBOOK_LOGIN_URL)
 
     if login_page.status_code != 200:
-        logger.debug(login_page.text)
+        log_debug_payload(logger, login_page)
         logger.error(f'Failed to authenticate with Facebook with email {email}. Stage: Main Login Attempt, Status code: {login_page.status_code}.')
         raise SystemError
 
@@ -246,19 +493,19 @@ def facebook_authenticate(browser, email, password, logger):
     login_response = browser.submit(login_form, login_page.url)
 
     if login_response.status_code != 200:
-        logger.debug(login_response.text)
+        log_debug_payload(logger, login_response)
         logger.error(f'Failed to authenticate with Facebook with email {email}. Stage: Main Login Reponse, Status code: {login_response.status_code}.')
         raise SystemError
 
     # Check to see if login failed
     if login_response.soup.find('link', {'rel': 'canonical', 'href': 'https://www.facebook.com/login/'}):
-        logger.debug(login_response.text)
+        log_debug_payload(logger, login_response)
         logger.error(f'Failed to authenticate with Facebook with email {email}. Please check provided email/password.')
         raise SystemError
 
     # Check to see if we hit Facebook security checkpoint
     if login_response.soup.find('button', {'id': 'checkpointSubmitButton'}):
-        logger.debug(login_response.text)
+        log_debug_payload(logger, login_response)
         logger.error(f'Hit Facebook security checkpoint. Please login to Facebook manually and follow prompts to authorize this device.')
         raise SystemError
 
@@ -279,10 +526,50 @@ def google_drive_api_authenticate():
     service = build('drive', 'v3', http=creds.authorize(Http()), cache_discovery=False)
     return service
 
-def upload_and_replace_file(service, file_id, metadata, payload):
+def upload_to_drive(service, config, payload, logger):
+    """ Upload the ICS payload to Google Drive unless it is identical to the last uploaded payload.
+        Updates the drive file id and digest in config. Returns True if the payload was uploaded. """
+
+    digest = hashlib.sha256(payload).hexdigest()
+    if config['DRIVE']['DRIVE_FILE_ID'] and config.get('DRIVE', 'DRIVE_FILE_DIGEST', fallback='') == digest:
+        logger.info(f'{config["DRIVE"]["ICS_FILE_NAME"]} is unchanged since the last upload. Skipping upload to Google Drive.')
+        return False
+
+    logger.info('Uploading ICS file to Google Drive...')
+    metadata = {'name': config['DRIVE']['ICS_FILE_NAME']}
+    resumable = len(payload) > config.getint('DRIVE', 'RESUMABLE_UPLOAD_THRESHOLD', fallback=5*1024*1024)
+    UPLOAD_RETRY_ATTEMPTS = 3
+
+    for attempt in range(UPLOAD_RETRY_ATTEMPTS):
+        try:
+            updated_file = upload_and_replace_file(service, config['DRIVE']['DRIVE_FILE_ID'], metadata, payload, resumable)
+        except HttpError as e:
+            if e.resp.status == 404: # file not found
+                if config['DRIVE']['DRIVE_FILE_ID']:
+                    logger.warning(f'{e}. Resetting stored file id in config and trying again. Attempt: {attempt+1}')
+                    config.set('DRIVE', 'DRIVE_FILE_ID', '') # reset stored file_id
+                    continue
+                else:
+                    logger.error(e)
+                    raise SystemError
+            else:
+                logger.error(e)
+                raise SystemError
+
+        config.set('DRIVE', 'DRIVE_FILE_ID', updated_file['id'])
+        config.set('DRIVE', 'DRIVE_FILE_DIGEST', digest)
+        logger.info(f'Successfully uploaded {config["DRIVE"]["ICS_FILE_NAME"]} to Google Drive with file id: {config["DRIVE"]["DRIVE_FILE_ID"]}\nDirect download link: http://drive.google.com/uc?export=download&id={config["DRIVE"]["DRIVE_FILE_ID"]}')
+        return True
+
+    logger.error(f'Failed to upload {config["DRIVE"]["ICS_FILE_NAME"]} to Google Drive after {UPLOAD_RETRY_ATTEMPTS} attempts.')
+    raise SystemError
+
+def upload_and_replace_file(service, file_id, metadata, payload, resumable=True):
+    """ Upload payload to Google Drive, either in a single request or in a resumable session of 1MB chunks """
+
     mine_type = 'text/calendar'
     text_stream = BytesIO(payload)
-    media_body = MediaIoBaseUpload(text_stream, mimetype=mine_type, chunksize=1024*1024, resumable=True)
+    media_body = MediaIoBaseUpload(text_stream, mimetype=mine_type, chunksize=1024*1024, resumable=resumable)
 
     # If file id is provided, update the file, otherwise we'll create a new file
     if file_id:
@@ -306,27 +593,114 @@ def get_async_token(browser, logger):
     if __cached_async_token:
         return __cached_async_token
 
+    birthday_event_page, async_token = fetch_async_token(browser)
+
+    if birthday_event_page.status_code != 200:
+        log_debug_payload(logger, birthday_event_page)
+        logger.error(f'Failed to retreive birthday event page. Status code: {birthday_event_page.status_code}.')
+        raise SystemError
+
+    if not async_token:
+        log_debug_payload(logger, birthday_event_page)
+        logger.error(f'Match failed or unexpected number of regexp matches when trying to get async token.')
+        raise SystemError
+
+    __cached_async_token = async_token
+
+    return async_token
+
+def fetch_async_token(browser):
+    """ Fetch the birthday event page and extract the async token from it.
+        Returns (response, async_token) where async_token is None if the page does not contain one. """
+
     FACEBOOK_BIRTHDAY_EVENT_PAGE_URL = 'https://www.facebook.com/events/birthdays/' # async token is present on this page
     FACEBOOK_ASYNC_TOKEN_REGEXP_STRING = r'{\"token\":\".*?\",\"async_get_token\":\"(.*?)\"}'
     regexp = re.compile(FACEBOOK_ASYNC_TOKEN_REGEXP_STRING, re.MULTILINE)
 
-    birthday_event_page = browser.get(FACEBOOK_BIRTHDAY_EVENT_PAGE_URL)
+    birthday_event_page = governed_get(browser, 'birthday_event_page', FACEBOOK_BIRTHDAY_EVENT_PAGE_URL)
 
     if birthday_event_page.status_code != 200:
-        logger.debug(birthday_event_page.text)
-        logger.error(f'Failed to retreive birthday event page. Status code: {birthday_event_page.status_code}.')
-        raise SystemError
+        return birthday_event_page, None
 
     matches = regexp.search(birthday_event_page.text)
 
     if not matches or len(matches.groups()) != 1:
-        logger.debug(birthday_event_page.text)
-        logger.error(f'Match failed or unexpected number of regexp matches when trying to get async token.')
-        raise SystemError
+        return birthday_event_page, None
 
-    __cached_async_token = matches[1]
+    return birthday_event_page, matches[1]
 
-    return matches[1]
+def restore_facebook_session(browser, session_store, email, logger):
+    """ Load a stored session into the browser and validate it with a single request.
+        Returns True if the session is usable, otherwise the browser is left without cookies and False is returned. """
+
+    global __locale
+
+    session = session_store.load(email, logger)
+    if session is None:
+        return False
+
+    cookies, _, user_locale = session
+    for cookie in cookies:
+        browser.get_cookiejar().set_cookie(cookie)
+
+    if not validate_facebook_session(browser, logger):
+        logger.info('Stored session is no longer valid.')
+        session_store.clear()
+        return False
+
+    __locale = user_locale
+
+    return True
+
+def use_facebook_session_cookies(browser, session_cookies, logger):
+    """ Load session cookies shared by another Facebook client (name -> value dict) into the browser and validate them.
+        Returns True if the session is usable, otherwise the browser is left without cookies and False is returned. """
+
+    for name, value in session_cookies.items():
+        browser.get_cookiejar().set_cookie(requests.cookies.create_cookie(domain='.facebook.com', name=name, value=value))
+
+    if not validate_facebook_session(browser, logger):
+        logger.info('Shared session cookies are not valid.')
+        return False
+
+    return True
+
+def validate_facebook_session(browser, logger):
+    """ Validate the browser session with a single request, caching the async token on success.
+        On failure the browser cookies are cleared so a full login can start from scratch. """
+
+    global __cached_async_token
+
+    # The birthday event page only contains an async token when logged in,
+    # so fetching it both validates the session and refreshes the token
+    _, async_token = fetch_async_token(browser)
+
+    if not async_token:
+        browser.get_cookiejar().clear()
+        return False
+
+    __cached_async_token = async_token
+
+    return True
+
+def get_session_cookies(email, password):
+    """ Log in to Facebook and return the session cookies as a name -> value dict so other clients can share the session """
+
+    logger = setup_custom_logger('fb2cal')
+
+    browser = mechanicalsoup.StatefulBrowser()
+    init_browser(browser)
+
+    logger.info('Attemping to authenticate with Facebook...')
+    facebook_authenticate(browser, email, password, logger)
+    logger.info('Successfully authenticated with Facebook.')
+
+    return browser.get_cookiejar().get_dict()
+
+def save_facebook_session(browser, session_store, email, logger):
+    """ Store the browser session along with the cached async token and locale for subsequent runs """
+
+    session_store.save(email, browser.get_cookiejar(), __cached_async_token, __locale, logger)
 
 __locale = None
 def get_facebook_locale(browser, logger):
@@ -345,10 +719,10 @@ def get_facebook_locale(browser, logger):
     query_params = {'fb_dtsg_ag': get_async_token(browser, logger),
                     '__a': '1'}
 
-    response = browser.get(FACEBOOK_LOCALE_ENDPOINT + urllib.parse.urlencode(query_params))
+    response = governed_get(browser, 'locale', FACEBOOK_LOCALE_ENDPOINT + urllib.parse.urlencode(query_params))
 
     if response.status_code != 200:
-        logger.debug(response.text)
+        log_debug_payload(logger, response)
         logger.error(f'Failed to get Facebook locale. Params: {query_params}. Status code: {response.status_code}.')
         raise SystemError
 
@@ -357,11 +731,11 @@ def get_facebook_locale(browser, logger):
         json_response = json.loads(strip_ajax_response_prefix(response.text))
         current_locale = json_response['jsmods']['require'][0][3][1]['currentLocale']
     except json.decoder.JSONDecodeError as e:
-        logger.debug(response.text)
+        log_debug_payload(logger, response)
         logger.error(f'JSONDecodeError: {e}')
         raise SystemError
     except KeyError as e:
-        logger.debug(json_response)
+        log_debug_payload(logger, json_response)
         logger.error(f'KeyError: {e}')
         raise SystemError
 
@@ -375,36 +749,180 @@ def get_facebook_locale(browser, logger):
     return __locale
 
 
-def get_async_birthdays(browser, logger):
+def get_async_birthdays(browser, logger, workers=1, resolution_cache=None, resolver_workers=1, queue_depth=64, card_engine='regex', month_cache=None, refresh_policy=None, skip_unresolved=False):
     """ Returns list of birthday objects by querying the Facebook birthday async page """
 
-    FACEBOOK_BIRTHDAY_ASYNC_ENDPOINT = 'https://www.facebook.com/async/birthdays/?'
+    return list(iter_async_birthdays(browser, logger, workers, resolution_cache, resolver_workers, queue_depth, card_engine, month_cache, refresh_policy, skip_unresolved))
 
-    birthdays = []
+def iter_async_birthdays(browser, logger, workers=1, resolution_cache=None, resolver_workers=1, queue_depth=64, card_engine='regex', month_cache=None, refresh_policy=None, skip_unresolved=False):
+    """ Yields resolved birthday objects for the next 12 months as a staged pipeline:
+        month pages are fetched by up to `workers` threads, parsed into unresolved birthdays and handed
+        to a pool of `resolver_workers` threads with at most `queue_depth` birthdays in flight.
+        Birthdays are yielded in month order as they are resolved.
+        With a month cache, months whose birthday card html is unchanged reuse the stored birthdays
+        and are neither parsed nor resolved. With a refresh policy as well, months that are still fresh
+        according to the policy are served from the month cache without being fetched at all. """
 
     next_12_months_epoch_timestamps = get_next_12_month_epoch_timestamps(logger)
 
-    for epoch_timestamp in next_12_months_epoch_timestamps:
-        logger.info(f'Processing birthdays for month {datetime.fromtimestamp(epoch_timestamp).strftime("%B")}.')
+    # Months still fresh enough to be stitched in from the month cache without fetching
+    fresh_months = {}
+    if month_cache is not None and refresh_policy is not None:
+        for month_index, epoch_timestamp in enumerate(next_12_months_epoch_timestamps):
+            cached_birthdays = month_cache.get_fresh(get_month_key(epoch_timestamp), refresh_policy.get_max_age_days(month_index))
+            if cached_birthdays is not None:
+                fresh_months[epoch_timestamp] = cached_birthdays
+    stale_epoch_timestamps = [epoch_timestamp for epoch_timestamp in next_12_months_epoch_timestamps if epoch_timestamp not in fresh_months]
+    logger.info(f'Fetching {len(stale_epoch_timestamps)} month(s), {len(fresh_months)} month(s) are still fresh in the month cache.')
+
+    user_locale = None
+    if stale_epoch_timestamps:
+        # Warm the async token and locale caches up front so workers share them instead of racing to fetch them
+        get_async_token(browser, logger)
+        user_locale = get_facebook_locale(browser, logger)
+
+    # Months that had to be parsed, in month order, as (month_key, digest, birthdays, end_position)
+    # They are stored in the month cache once the resolved stream has moved past end_position
+    parsed_months = deque()
+    # Input position of each birthday handed to the resolvers, by id since birthdays are resolved in place
+    positions = {}
+    next_position = 0
+
+    def position(birthday):
+        nonlocal next_position
+        positions[id(birthday)] = next_position
+        next_position += 1
+        return birthday
+
+    def iter_unresolved_birthdays():
+        pages = iter_async_birthday_pages(browser, stale_epoch_timestamps, logger, workers)
+
+        for epoch_timestamp in next_12_months_epoch_timestamps:
+            if epoch_timestamp in fresh_months:
+                for uid, name, day, month in fresh_months[epoch_timestamp]:
+                    yield position(Birthday(uid, name, day, month))
+                continue
+
+            # Pages are yielded in month order so the next page always belongs to this month
+            _, text = next(pages)
+            birthday_card_html = get_birthday_card_html(text, logger)
+
+            if month_cache is None:
+                yield from parse_unresolved_birthdays(browser, epoch_timestamp, birthday_card_html, logger, card_engine)
+                continue
+
+            month_key = get_month_key(epoch_timestamp)
+            digest = get_month_page_digest(birthday_card_html, user_locale, month_key)
+            cached_birthdays = month_cache.lookup(month_key, digest)
+
+            if cached_birthdays is not None:
+                logger.info(f'Birthday cards for month {month_key} are unchanged, reusing {len(cached_birthdays)} stored birthdays.')
+                for uid, name, day, month in cached_birthdays:
+                    yield position(Birthday(uid, name, day, month))
+                continue
+
+            birthdays_for_month = []
+            for birthday in parse_unresolved_birthdays(browser, epoch_timestamp, birthday_card_html, logger, card_engine):
+                birthdays_for_month.append(birthday)
+                yield position(birthday)
+            parsed_months.append((month_key, digest, birthdays_for_month, next_position))
+
+    def store_resolved_months(resolved_position):
+        # Birthdays are resolved in place and yielded in input order, so every month ending at or before
+        # the position of the last resolved birthday is complete
+        # Months with unresolved vanity names are not stored so they are retried on the next run
+        while parsed_months and parsed_months[0][3] <= resolved_position:
+            month_key, digest, birthdays_for_month, _ = parsed_months.popleft()
+            for birthday in birthdays_for_month:
+                positions.pop(id(birthday), None)
+            if all(birthday.uid is not None for birthday in birthdays_for_month):
+                month_cache.store(month_key, digest, [(birthday.uid, birthday.name, birthday.day, birthday.month)
+                                                      for birthday in birthdays_for_month])
+
+    for birthday in iter_resolved_birthdays(browser, iter_unresolved_birthdays(), logger, resolver_workers, queue_depth, resolution_cache, skip_unresolved):
+        if month_cache is not None:
+            store_resolved_months(positions.pop(id(birthday)) + 1)
+        yield birthday
+
+    if month_cache is not None:
+        store_resolved_months(next_position)
+        logger.info(f'Skipped parsing {month_cache.skipped} unchanged month(s).')
+
+class RefreshPolicy:
+    """ Decides how long fetched month pages stay fresh.
+        The first `near_months` months (starting with the current month) are refetched every `near_refresh_days` days,
+        all later months every `distant_refresh_days` days. """
+
+    def __init__(self, near_months, near_refresh_days, distant_refresh_days):
+        self.near_months = near_months
+        self.near_refresh_days = near_refresh_days
+        self.distant_refresh_days = distant_refresh_days
+
+    def get_max_age_days(self, month_index):
+        """ Returns the number of days a month page stays fresh given its index (0 is the current month) """
+
+        return self.near_refresh_days if month_index < self.near_months else self.distant_refresh_days
+
+def get_month_key(epoch_timestamp):
+    """ Returns the 'YYYY-MM' key of the month page starting at the provided epoch timestamp """
+
+    return datetime.fromtimestamp(epoch_timestamp, pytz.timezone('America/Los_Angeles')).strftime('%Y-%m')
+
+def get_month_page_digest(birthday_card_html, user_locale, month_key):
+    """ Returns a digest identifying the birthdays parsed from a month page.
+        Tooltips for the following week use day names instead of dates, so for months within that window
+        the digest also covers todays date as the same html then parses to different birthdays on another day. """
+
+    digest = hashlib.sha256()
+    digest.update(user_locale.encode('UTF-8'))
+    digest.update(birthday_card_html.encode('UTF-8'))
+
+    today = datetime.now()
+    day_name_month_keys = {(today + timedelta(days=offset)).strftime('%Y-%m') for offset in range(8)}
+    if month_key in day_name_month_keys:
+        digest.update(today.strftime('%Y-%m-%d').encode('UTF-8'))
+
+    return digest.hexdigest()
+
+def iter_async_birthday_pages(browser, epoch_timestamps, logger, workers=1):
+    """ Yields (epoch_timestamp, response text) tuples for each month page in month order.
+        Pages are fetched by up to `workers` threads sharing the authenticated browser session. """
+
+    workers = max(1, min(workers, len(epoch_timestamps)))
+    if not epoch_timestamps:
+        return
+    logger.debug(f'Fetching {len(epoch_timestamps)} months using {workers} worker(s).')
+
+    if workers == 1:
+        for epoch_timestamp in epoch_timestamps:
+            yield epoch_timestamp, get_async_birthday_page(browser, epoch_timestamp, logger)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # executor.map yields results in submission order which keeps month order stable
+        texts = executor.map(lambda epoch_timestamp: get_async_birthday_page(browser, epoch_timestamp, logger), epoch_timestamps)
+        yield from zip(epoch_timestamps, texts)
+
+def get_async_birthday_page(browser, epoch_timestamp, logger):
+    """ Returns the async birthday response text for the month starting at the provided epoch timestamp """
 
-        # Not all fields are required for response to be given, required fields are date, fb_dtsg_ag and __a
-        query_params = {'date': epoch_timestamp,
-                        'fb_dtsg_ag': get_async_token(browser, logger),
-                        '__a': '1'}
+    FACEBOOK_BIRTHDAY_ASYNC_ENDPOINT = 'https://www.facebook.com/async/birthdays/?'
 
-        response = browser.get(FACEBOOK_BIRTHDAY_ASYNC_ENDPOINT + urllib.parse.urlencode(query_params))
+    logger.info(f'Processing birthdays for month {datetime.fromtimestamp(epoch_timestamp).strftime("%B")}.')
 
-        if response.status_code != 200:
-            logger.debug(response.text)
-            logger.error(f'Failed to get async birthday response. Params: {query_params}. Status code: {response.status_code}.')
-            raise SystemError
+    # Not all fields are required for response to be given, required fields are date, fb_dtsg_ag and __a
+    query_params = {'date': epoch_timestamp,
+                    'fb_dtsg_ag': get_async_token(browser, logger),
+                    '__a': '1'}
 
-        birthdays_for_month = parse_birthday_async_output(browser,
-                response.text, logger)
-        birthdays.extend(birthdays_for_month)
-        logger.info(f'Found {len(birthdays_for_month)} birthdays for month {datetime.fromtimestamp(epoch_timestamp).strftime("%B")}.')
+    response = governed_get(browser, 'async_birthdays', FACEBOOK_BIRTHDAY_ASYNC_ENDPOINT + urllib.parse.urlencode(query_params))
 
-    return birthdays
+    if response.status_code != 200:
+        log_debug_payload(logger, response)
+        logger.error(f'Failed to get async birthday response. Params: {query_params}. Status code: {response.status_code}.')
+        raise SystemError
+
+    return response.text
 
 def get_next_12_month_epoch_timestamps(logger):
     """ Returns array of epoch timestamps corresponding to the 1st day of the next 12 months starting from the current month.
@@ -432,42 +950,300 @@ def get_next_12_month_epoch_timestamps(logger):
     logger.debug(f'Epoch timestamps are: {epoch_timestamps}')
     return epoch_timestamps
 
-def parse_birthday_async_output(browser, text, logger):
+def parse_birthday_async_output(browser, text, logger, resolution_cache=None):
     """ Parsed Birthday Async output text and returns list of Birthday objects """
-    BIRTHDAY_STRING_REGEXP_STRING = r'class=\"_43q7\".*?href=\"https://www\.facebook\.com/(.*?)\".*?data-tooltip-content=\"(.*?)\">.*?alt=\"(.*?)\".*?/>'
-    regexp = re.compile(BIRTHDAY_STRING_REGEXP_STRING, re.MULTILINE)
 
-    birthdays = []
+    birthday_card_html = get_birthday_card_html(text, logger)
+
+    return list(iter_resolved_birthdays(browser, parse_unresolved_birthdays(browser, None, birthday_card_html, logger),
+            logger, resolution_cache=resolution_cache))
+
+def get_birthday_card_html(text, logger):
+    """ Returns the birthday card html payload of Birthday Async output text """
 
     # Fetch birthday card html payload from json response
     try:
         json_response = json.loads(strip_ajax_response_prefix(text))
         birthday_card_html = json_response['domops'][0][3]['__html']
     except json.decoder.JSONDecodeError as e:
-        logger.debug(text)
+        log_debug_payload(logger, text)
         logger.error(f'JSONDecodeError: {e}')
         raise SystemError
     except KeyError as e:
-        logger.debug(json_response)
+        log_debug_payload(logger, json_response)
         logger.error(f'KeyError: {e}')
         raise SystemError
 
+    return birthday_card_html
+
+def parse_unresolved_birthdays(browser, epoch_timestamp, birthday_card_html, logger, card_engine='regex'):
+    """ Parse birthday card html, yielding Birthday objects.
+        Birthdays of friends with a custom vanity name have no uid yet and must be resolved with resolve_birthday. """
+
     user_locale = get_facebook_locale(browser, logger)
 
-    for vanity_name, tooltip_content, name in regexp.findall(birthday_card_html):
+    count = 0
+    for vanity_name, tooltip_content, name in extract_birthday_cards(birthday_card_html, card_engine, logger):
+        # Parse tooltip content into day/month
+        day, month = parse_birthday_day_month(tooltip_content, name,
+                user_locale, logger)
+
         # Check to see if user has no custom vanity name in which case we'll just take the id directly
         if vanity_name.startswith('profile.php?id='):
-            uid = vanity_name[15:]
+            yield Birthday(vanity_name[15:], html.unescape(name), day, month)
         else:
-            uid = get_entity_id_from_vanity_name(browser, vanity_name, logger)
+            yield Birthday(None, html.unescape(name), day, month, vanity_name)
+        count += 1
 
-        # Parse tooltip content into day/month
-        day, month = parse_birthday_day_month(tooltip_content, name,
-                user_locale, logger)
+    if epoch_timestamp is not None:
+        logger.info(f'Found {count} birthdays for month {datetime.fromtimestamp(epoch_timestamp).strftime("%B")}.')
+
+def extract_birthday_cards(birthday_card_html, card_engine, logger):
+    """ Returns list of (vanity_name, tooltip_content, name) tuples for each birthday card in the birthday card html.
+        Values are returned exactly as they appear in the html (no entity decoding). """
+
+    if card_engine == 'single_pass':
+        return extract_birthday_cards_single_pass(birthday_card_html)
+    elif card_engine == 'regex':
+        return extract_birthday_cards_regex(birthday_card_html)
+
+    logger.error(f'Invalid birthday card parser engine specified. Engine: {card_engine}')
+    raise SystemError
+
+def extract_birthday_cards_regex(birthday_card_html):
+    """ Extract birthday cards by running a single regexp over the whole birthday card html """
+
+    BIRTHDAY_STRING_REGEXP_STRING = r'class=\"_43q7\".*?href=\"https://www\.facebook\.com/(.*?)\".*?data-tooltip-content=\"(.*?)\">.*?alt=\"(.*?)\".*?/>'
+    regexp = re.compile(BIRTHDAY_STRING_REGEXP_STRING, re.MULTILINE)
+
+    return regexp.findall(birthday_card_html)
+
+def extract_birthday_cards_single_pass(birthday_card_html):
+    """ Extract birthday cards by walking the birthday card html once from start to end.
+        Each card is located with successive substring searches that only ever move forward,
+        so unlike the regexp engine a malformed card can never cause backtracking over the rest of the html.
+        A malformed or incomplete card is skipped and scanning resumes at the next card. """
 
-        birthdays.append(Birthday(uid, html.unescape(name), day, month))
+    CARD_MARKER = 'class="_43q7"'
 
-    return birthdays
+    cards = []
+    pos = birthday_card_html.find(CARD_MARKER)
+
+    while pos != -1:
+        # A card's fields must all lie before the next card
+        next_pos = birthday_card_html.find(CARD_MARKER, pos + len(CARD_MARKER))
+        card_limit = len(birthday_card_html) if next_pos == -1 else next_pos
+
+        card = extract_birthday_card(birthday_card_html, pos + len(CARD_MARKER), card_limit)
+        if card is not None:
+            cards.append(card)
+        pos = next_pos
+
+    return cards
+
+def extract_birthday_card(birthday_card_html, start, end):
+    """ Returns the (vanity_name, tooltip_content, name) tuple of the card in birthday_card_html[start:end],
+        or None if the card is malformed or incomplete. """
+
+    PROFILE_URL_MARKER = 'href="https://www.facebook.com/'
+    TOOLTIP_MARKER = 'data-tooltip-content="'
+    NAME_MARKER = 'alt="'
+
+    find = birthday_card_html.find
+
+    profile_url_start = find(PROFILE_URL_MARKER, start, end)
+    if profile_url_start == -1:
+        return None
+    profile_url_start += len(PROFILE_URL_MARKER)
+    profile_url_end = find('"', profile_url_start, end)
+    if profile_url_end == -1:
+        return None
+
+    tooltip_start = find(TOOLTIP_MARKER, profile_url_end + 1, end)
+    if tooltip_start == -1:
+        return None
+    tooltip_start += len(TOOLTIP_MARKER)
+    tooltip_end = find('">', tooltip_start, end) # Tooltip attribute closes its tag
+    if tooltip_end == -1:
+        return None
+
+    name_start = find(NAME_MARKER, tooltip_end + 2, end)
+    if name_start == -1:
+        return None
+    name_start += len(NAME_MARKER)
+    name_end = find('"', name_start, end)
+    if name_end == -1 or find('/>', name_end + 1, end) == -1:
+        return None
+
+    return (birthday_card_html[profile_url_start:profile_url_end],
+            birthday_card_html[tooltip_start:tooltip_end],
+            birthday_card_html[name_start:name_end])
+
+def resolve_birthday(browser, birthday, logger, resolution_cache=None, skip_unresolved=False):
+    """ Resolve the uid of a birthday parsed with parse_unresolved_birthdays.
+        Returns the birthday, or None if skip_unresolved is set and its vanity name could not be resolved. """
+
+    if birthday.uid is not None:
+        return birthday
+
+    birthday.uid = resolve_vanity_name(browser, birthday.vanity_name, logger, resolution_cache, skip_unresolved)
+    if birthday.uid is None:
+        logger.warning(f'Skipping birthday for {birthday.name} as vanity name {birthday.vanity_name} could not be resolved.')
+        return None
+
+    return birthday
+
+def iter_resolved_birthdays(browser, birthdays, logger, workers=1, queue_depth=64, resolution_cache=None, skip_unresolved=False):
+    """ Resolve an iterable of birthdays, yielding resolved birthdays in input order.
+        With more than one worker, resolution runs on a thread pool while the input is still being parsed,
+        so network latency for one friend overlaps with the others. At most `queue_depth` birthdays are in flight. """
+
+    if workers <= 1:
+        for birthday in birthdays:
+            birthday = resolve_birthday(browser, birthday, logger, resolution_cache, skip_unresolved)
+            if birthday is not None:
+                yield birthday
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque() # Resolved birthdays or futures of birthdays being resolved, in input order
+
+        def drain(max_in_flight):
+            while len(in_flight) > max_in_flight:
+                head = in_flight.popleft()
+                birthday = head.result() if isinstance(head, Future) else head
+                if birthday is not None:
+                    yield birthday
+
+        try:
+            for birthday in birthdays:
+                if birthday.uid is None:
+                    in_flight.append(executor.submit(resolve_birthday, browser, birthday, logger, resolution_cache, skip_unresolved))
+                else:
+                    in_flight.append(birthday) # Nothing to resolve, keep position in output order
+                yield from drain(max(queue_depth, 1) - 1)
+
+            yield from drain(0)
+        finally:
+            # Don't start resolving birthdays nobody will consume
+            for head in in_flight:
+                if isinstance(head, Future):
+                    head.cancel()
+
+# Dict with mapping of locale identifier to month/day datetime format
+LOCALE_DATE_FORMAT_MAPPING = {
+    'af_ZA': '%d-%m',
+    'am_ET': '%m/%d',
+    # 'ar_AR': '', # TODO: parse Arabic numeric characters
+    # 'as_IN': '', # TODO: parse Assamese numeric characters
+    'az_AZ': '%d.%m',
+    'be_BY': '%d.%m',
+    'bg_BG': '%d.%m',
+    'bn_IN': '%d/%m',
+    'br_FR': '%d/%m',
+    'bs_BA': '%d.%m.',
+    'ca_ES': '%d/%m',
+    # 'cb_IQ': '', # TODO: parse Arabic numeric characters
+    'co_FR': '%m-%d',
+    'cs_CZ': '%d. %m.',
+    'cx_PH': '%m-%d',
+    'cy_GB': '%d/%m',
+    'da_DK': '%d.%m',
+    'de_DE': '%d.%m.',
+    'el_GR': '%d/%m',
+    'en_GB': '%d/%m',
+    'en_UD': '%m/%d',
+    'en_US': '%m/%d',
+    'eo_EO': '%m-%d',
+    'es_ES': '%d/%m',
+    'es_LA': '%d/%m',
+    'et_EE': '%d.%m',
+    'eu_ES': '%m/%d',
+    # 'fa_IR': '', # TODO: parse Persian numeric characters
+    'ff_NG': '%d/%m',
+    'fi_FI': '%d.%m.',
+    'fo_FO': '%d.%m',
+    'fr_CA': '%m-%d',
+    'fr_FR': '%d/%m',
+    'fy_NL': '%d-%m',
+    'ga_IE': '%d/%m',
+    'gl_ES': '%d/%m',
+    'gn_PY': '%m-%d',
+    'gu_IN': '%d/%m',
+    'ha_NG': '%m/%d',
+    'he_IL': '%d.%m',
+    'hi_IN': '%d/%m',
+    'hr_HR': '%d. %m.',
+    'ht_HT': '%m-%d',
+    'hu_HU': '%m. %d.',
+    'hy_AM': '%d.%m',
+    'id_ID': '%d/%m',
+    'is_IS': '%d.%m.',
+    'it_IT': '%d/%m',
+    'ja_JP': '%m/%d',
+    'ja_KS': '%m/%d',
+    'jv_ID': '%d/%m',
+    'ka_GE': '%d.%m',
+    'kk_KZ': '%d.%m',
+    'km_KH': '%d/%m',
+    'kn_IN': '%d/%m',
+    'ko_KR': '%m. %d.',
+    'ku_TR': '%m-%d',
+    'ky_KG': '%d-%m',
+    'lo_LA': '%d/%m',
+    'lt_LT': '%m-%d',
+    'lv_LV': '%d.%m.',
+    'mg_MG': '%d/%m',
+    'mk_MK': '%d.%m',
+    'ml_IN': '%d/%m',
+    'mn_MN': '%m-&#x440; &#x441;&#x430;&#x440;/%d',
+    # 'mr_IN': '', # TODO: parse Marathi numeric characters
+    'ms_MY': '%d-%m',
+    'mt_MT': '%m-%d',
+    # 'my_MM': '', # TODO: parse Myanmar numeric characters
+    'nb_NO': '%d.%m.',
+    # 'ne_NP': '', # TODO: parse Nepali numeric characters
+    'nl_BE': '%d/%m',
+    'nl_NL': '%d-%m',
+    'nn_NO': '%d.%m.',
+    'or_IN': '%m/%d',
+    'pa_IN': '%d/%m',
+    'pl_PL': '%d.%m',
+    # 'ps_AF': '', # TODO: parse Afghani numeric characters
+    'pt_BR': '%d/%m',
+    'pt_PT': '%d/%m',
+    'ro_RO': '%d.%m',
+    'ru_RU': '%d.%m',
+    'rw_RW': '%m-%d',
+    'sc_IT': '%m-%d',
+    'si_LK': '%m-%d',
+    'sk_SK': '%d. %m.',
+    'sl_SI': '%d. %m.',
+    'sn_ZW': '%m-%d',
+    'so_SO': '%m/%d',
+    'sq_AL': '%d.%m',
+    'sr_RS': '%d.%m.',
+    'sv_SE': '%d/%m',
+    'sw_KE': '%d/%m',
+    'sy_SY': '%m-%d',
+    'sz_PL': '%m-%d',
+    'ta_IN': '%d/%m',
+    'te_IN': '%d/%m',
+    'tg_TJ': '%m-%d',
+    'th_TH': '%d/%m',
+    'tl_PH': '%m/%d',
+    'tr_TR': '%d/%m',
+    'tt_RU': '%d.%m',
+    'tz_MA': '%m/%d',
+    'uk_UA': '%d.%m',
+    'ur_PK': '%d/%m',
+    'uz_UZ': '%d/%m',
+    'vi_VN': '%d/%m',
+    'zh_CN': '%m/%d',
+    'zh_HK': '%d/%m',
+    'zh_TW': '%m/%d',
+    'zz_TR': '%m-%d'
+}
 
 def parse_birthday_day_month(tooltip_content, name, user_locale, logger):
     """ Convert the Facebook birthday tooltip content to a day and month number. Facebook will use a tooltip format based on the users Facebook language (locale).
@@ -493,144 +1269,94 @@ def parse_birthday_day_month(tooltip_content, name, user_locale, logger):
 
     birthday_date_str = birthday_date_str.strip()
 
-    # Dict with mapping of locale identifier to month/day datetime format
-    locale_date_format_mapping = {
-        'af_ZA': '%d-%m',
-        'am_ET': '%m/%d',
-        # 'ar_AR': '', # TODO: parse Arabic numeric characters
-        # 'as_IN': '', # TODO: parse Assamese numeric characters
-        'az_AZ': '%d.%m',
-        'be_BY': '%d.%m',
-        'bg_BG': '%d.%m',
-        'bn_IN': '%d/%m',
-        'br_FR': '%d/%m',
-        'bs_BA': '%d.%m.',
-        'ca_ES': '%d/%m',
-        # 'cb_IQ': '', # TODO: parse Arabic numeric characters
-        'co_FR': '%m-%d',
-        'cs_CZ': '%d. %m.',
-        'cx_PH': '%m-%d',
-        'cy_GB': '%d/%m',
-        'da_DK': '%d.%m',
-        'de_DE': '%d.%m.',
-        'el_GR': '%d/%m',
-        'en_GB': '%d/%m',
-        'en_UD': '%m/%d',
-        'en_US': '%m/%d',
-        'eo_EO': '%m-%d',
-        'es_ES': '%d/%m',
-        'es_LA': '%d/%m',
-        'et_EE': '%d.%m',
-        'eu_ES': '%m/%d',
-        # 'fa_IR': '', # TODO: parse Persian numeric characters
-        'ff_NG': '%d/%m',
-        'fi_FI': '%d.%m.',
-        'fo_FO': '%d.%m',
-        'fr_CA': '%m-%d',
-        'fr_FR': '%d/%m',
-        'fy_NL': '%d-%m',
-        'ga_IE': '%d/%m',
-        'gl_ES': '%d/%m',
-        'gn_PY': '%m-%d',
-        'gu_IN': '%d/%m',
-        'ha_NG': '%m/%d',
-        'he_IL': '%d.%m',
-        'hi_IN': '%d/%m',
-        'hr_HR': '%d. %m.',
-        'ht_HT': '%m-%d',
-        'hu_HU': '%m. %d.',
-        'hy_AM': '%d.%m',
-        'id_ID': '%d/%m',
-        'is_IS': '%d.%m.',
-        'it_IT': '%d/%m',
-        'ja_JP': '%m/%d',
-        'ja_KS': '%m/%d',
-        'jv_ID': '%d/%m',
-        'ka_GE': '%d.%m',
-        'kk_KZ': '%d.%m',
-        'km_KH': '%d/%m',
-        'kn_IN': '%d/%m',
-        'ko_KR': '%m. %d.',
-        'ku_TR': '%m-%d',
-        'ky_KG': '%d-%m',
-        'lo_LA': '%d/%m',
-        'lt_LT': '%m-%d',
-        'lv_LV': '%d.%m.',
-        'mg_MG': '%d/%m',
-        'mk_MK': '%d.%m',
-        'ml_IN': '%d/%m',
-        'mn_MN': '%m-&#x440; &#x441;&#x430;&#x440;/%d',
-        # 'mr_IN': '', # TODO: parse Marathi numeric characters
-        'ms_MY': '%d-%m',
-        'mt_MT': '%m-%d',
-        # 'my_MM': '', # TODO: parse Myanmar numeric characters
-        'nb_NO': '%d.%m.',
-        # 'ne_NP': '', # TODO: parse Nepali numeric characters
-        'nl_BE': '%d/%m',
-        'nl_NL': '%d-%m',
-        'nn_NO': '%d.%m.',
-        'or_IN': '%m/%d',
-        'pa_IN': '%d/%m',
-        'pl_PL': '%d.%m',
-        # 'ps_AF': '', # TODO: parse Afghani numeric characters
-        'pt_BR': '%d/%m',
-        'pt_PT': '%d/%m',
-        'ro_RO': '%d.%m',
-        'ru_RU': '%d.%m',
-        'rw_RW': '%m-%d',
-        'sc_IT': '%m-%d',
-        'si_LK': '%m-%d',
-        'sk_SK': '%d. %m.',
-        'sl_SI': '%d. %m.',
-        'sn_ZW': '%m-%d',
-        'so_SO': '%m/%d',
-        'sq_AL': '%d.%m',
-        'sr_RS': '%d.%m.',
-        'sv_SE': '%d/%m',
-        'sw_KE': '%d/%m',
-        'sy_SY': '%m-%d',
-        'sz_PL': '%m-%d',
-        'ta_IN': '%d/%m',
-        'te_IN': '%d/%m',
-        'tg_TJ': '%m-%d',
-        'th_TH': '%d/%m',
-        'tl_PH': '%m/%d',
-        'tr_TR': '%d/%m',
-        'tt_RU': '%d.%m',
-        'tz_MA': '%m/%d',
-        'uk_UA': '%d.%m',
-        'ur_PK': '%d/%m',
-        'uz_UZ': '%d/%m',
-        'vi_VN': '%d/%m',
-        'zh_CN': '%m/%d',
-        'zh_HK': '%d/%m',
-        'zh_TW': '%m/%d',
-        'zz_TR': '%m-%d'
+    day_month = get_tooltip_date_parser(user_locale, logger).parse(birthday_date_str, logger)
+    if day_month:
+        return day_month
+
+    logger.error(f'Failed to parse birthday day/month. Parse failed with tooltip_content: "{tooltip_content}", locale: "{user_locale}". Date string "{birthday_date_str}" does not match the locale date format or a day name.')
+    raise SystemError
+
+class TooltipDateParser:
+    """ Parses stripped tooltip date strings for a single locale and run date.
+        The locale date format is compiled into a regexp once and day names are mapped straight to a (day, month) tuple
+        the first time one is needed, so each distinct date string is parsed once and then served from a dictionary. """
+
+    # Same patterns datetime.strptime uses for %d and %m
+    FORMAT_DIRECTIVE_PATTERNS = {
+        '%d': r'(?P<day>3[01]|[12]\d|0[1-9]|[1-9]| [1-9])',
+        '%m': r'(?P<month>1[0-2]|0[1-9]|[1-9])'
     }
 
-    # Ensure a supported locale is being used
-    if user_locale not in locale_date_format_mapping:
-        logger.error(f'The locale {user_locale} is not supported by Facebook.')
-        raise SystemError
+    def __init__(self, user_locale, date_format, run_date):
+        self.user_locale = user_locale
+        self.run_date = run_date
+        self.date_regexp = self.compile_date_format(date_format)
+        self.day_names = None # Lowercase day name -> (day, month), built on first use
+        self.parsed = {} # Date string -> (day, month) or None
+
+    @classmethod
+    def compile_date_format(cls, date_format):
+        """ Compile a strptime day/month format into an equivalent regexp """
+
+        pattern = ''
+        for token in re.split(r'(%[dm]|\s+)', date_format):
+            if token in cls.FORMAT_DIRECTIVE_PATTERNS:
+                pattern += cls.FORMAT_DIRECTIVE_PATTERNS[token]
+            elif token.isspace():
+                pattern += r'\s+' # strptime treats whitespace as one or more whitespace characters
+            else:
+                pattern += re.escape(token)
+
+        return re.compile(pattern, re.IGNORECASE)
+
+    def get_day_names(self, logger):
+        """ Returns dict mapping lowercase day names of the following week to the (day, month) they refer to """
+
+        if self.day_names is None:
+            day_names = {}
+            for day_name, offset in get_day_name_offset_dict(self.user_locale, logger).items():
+                date = self.run_date + timedelta(days=offset)
+                day_names[day_name] = (date.day, date.month)
+            self.day_names = day_names
+
+        return self.day_names
+
+    def parse(self, birthday_date_str, logger):
+        """ Returns (day, month) for a stripped tooltip date string or None if it cannot be parsed """
+
+        if birthday_date_str in self.parsed:
+            return self.parsed[birthday_date_str]
+
+        day_month = None
+        matches = self.date_regexp.fullmatch(birthday_date_str)
+        if matches:
+            day, month = int(matches['day']), int(matches['month'])
+            # Validate against a leap year so 29 February birthdays are accepted
+            if day <= calendar.monthrange(2000, month)[1]:
+                day_month = (day, month)
+        else:
+            # Otherwise, have to convert day names to a day and month
+            day_month = self.get_day_names(logger).get(html.unescape(birthday_date_str).lower())
 
-    try:
-        # Try to parse the date using appropriate format based on locale
-        parsed_date = datetime.strptime(birthday_date_str, locale_date_format_mapping[user_locale])
-        return (parsed_date.day, parsed_date.month)
-    except ValueError:
-        # Otherwise, have to convert day names to a day and month
-        offset_dict = get_day_name_offset_dict(user_locale, logger)
-        cur_date = datetime.now()
-
-        # Use beautiful soup to parse special html codes properly before matching with our dict
-        day_name = BeautifulSoup(birthday_date_str, 'lxml').get_text().lower()
-
-        if day_name in offset_dict:
-            cur_date = cur_date + relativedelta(days=offset_dict[day_name])
-            return (cur_date.day, cur_date.month)
-
-    logger.error(f'Failed to parse birthday day/month. Parse failed with tooltip_content: "{tooltip_content}", locale: "{user_locale}". Day name "{day_name}" is not in the offset dict {offset_dict}')
-    raise SystemError
+        self.parsed[birthday_date_str] = day_month
+        return day_month
+
+__tooltip_date_parsers = {}
+def get_tooltip_date_parser(user_locale, logger):
+    """ Returns the TooltipDateParser for the provided locale and todays date, building it on first use """
+
+    run_date = datetime.now().date()
+    key = (user_locale, run_date)
+
+    if key not in __tooltip_date_parsers:
+        # Ensure a supported locale is being used
+        if user_locale not in LOCALE_DATE_FORMAT_MAPPING:
+            logger.error(f'The locale {user_locale} is not supported by Facebook.')
+            raise SystemError
+
+        __tooltip_date_parsers[key] = TooltipDateParser(user_locale, LOCALE_DATE_FORMAT_MAPPING[user_locale], run_date)
+
+    return __tooltip_date_parsers[key]
 
 def get_day_name_offset_dict(user_locale, logger):
     """ The day name to offset dict maps a day name to a numerical day offset which can be used to add days to the current date.
@@ -691,6 +1417,28 @@ def get_day_name_offset_dict(user_locale, logger):
     logger.error(f"Failed to generate day name offset dictionary for provided user locale: '{user_locale}'")
     raise SystemError
 
+def resolve_vanity_name(browser, vanity_name, logger, resolution_cache=None, skip_unresolved=False):
+    """ Resolve a vanity name to an entity id, consulting the resolution cache first.
+        A failed resolution raises SystemError, with or without a cache. With skip_unresolved, it returns None
+        instead and, with a cache, is recorded so that it is not retried until the negative entry expires. """
+
+    if resolution_cache is not None:
+        found, entity_id = resolution_cache.lookup(vanity_name)
+        # Negative entries are only trusted when failures are skipped, otherwise the lookup is retried
+        if found and (entity_id is not None or skip_unresolved):
+            return entity_id
+
+    try:
+        entity_id = get_entity_id_from_vanity_name(browser, vanity_name, logger)
+    except SystemError:
+        if not skip_unresolved:
+            raise
+        entity_id = None
+
+    if resolution_cache is not None:
+        resolution_cache.store(vanity_name, entity_id)
+    return entity_id
+
 def get_entity_id_from_vanity_name(browser, vanity_name, logger):
     """ Given a vanity name (user/page custom name), try to get the unique identifier entity_id """
 
@@ -706,7 +1454,7 @@ def get_entity_id_from_vanity_name(browser, vanity_name, logger):
         if 'alias' in entry and entry['alias'] == vanity_name:
             # Match found!
             return entry['uid']
-    logger.debug(composer_query_entries)
+    log_debug_payload(logger, composer_query_entries)
 
     # Method 2: Scrape users profile page for entity id (significantly slower)
     logger.warning(f'Falling back to getting entity id from profile page for vanity name {vanity_name}. This method is significantly slower.')
@@ -728,10 +1476,10 @@ def get_composer_query_entries(browser, value, logger):
                     'fb_dtsg_ag': get_async_token(browser, logger),
                     '__a': '1'}
 
-    response = browser.get(COMPOSER_QUERY_ASYNC_ENDPOINT + urllib.parse.urlencode(query_params))
+    response = governed_get(browser, 'composer_query', COMPOSER_QUERY_ASYNC_ENDPOINT + urllib.parse.urlencode(query_params))
 
     if response.status_code != 200:
-        logger.debug(response.text)
+        log_debug_payload(logger, response)
         logger.warning(f'Failed to get async composer query response. Params: {query_params}. Status code: {response.status_code}.')
         return []
 
@@ -740,11 +1488,11 @@ def get_composer_query_entries(browser, value, logger):
         json_response = json.loads(strip_ajax_response_prefix(response.text))
         return json_response['payload']['entries']
     except json.decoder.JSONDecodeError as e:
-        logger.debug(response.text)
+        log_debug_payload(logger, response)
         logger.warning(f'JSONDecodeError: {e}')
         return []
     except KeyError as e:
-        logger.debug(json_response)
+        log_debug_payload(logger, json_response)
         logger.warning(f'KeyError: {e}')
         return []
 
@@ -754,16 +1502,16 @@ def get_entity_id_from_profile_page(browser, vanity_name, logger):
     FACEBOOK_PROFILE_PAGE_ENTITY_ID_REGEXP_STRING = r'entity_id:(\d+),ef_page:'
     regexp = re.compile(FACEBOOK_PROFILE_PAGE_ENTITY_ID_REGEXP_STRING, re.MULTILINE)
 
-    response = browser.get(f'https://m.facebook.com/{vanity_name}')
+    response = governed_get(browser, 'profile_page', f'https://m.facebook.com/{vanity_name}')
     if response.status_code != 200:
-        logger.debug(response.text)
+        log_debug_payload(logger, response)
         logger.warning(f'Failed to get entity id from profile page. Vanity name: {vanity_name}, Status code: {response.status_code}.')
         return None
 
     matches = regexp.search(response.text)
 
     if not matches or len(matches.groups()) != 1:
-        logger.debug(response.text)
+        log_debug_payload(logger, response)
         logger.warning(f'Match failed or unexpected number of regexp matches when trying to get entity id from profile page. Vanity name: {vanity_name}.')
         return None
 
@@ -777,8 +1525,8 @@ def strip_ajax_response_prefix(payload):
         return payload[9:]
     return payload
 
-def populate_birthdays_calendar(birthdays):
-    """ Populate a birthdays calendar using birthday objects """
+def create_birthdays_calendar():
+    """ Create an empty birthdays calendar """
 
     c = Calendar()
     c.scale = 'GREGORIAN'
@@ -787,6 +1535,33 @@ def populate_birthdays_calendar(birthdays):
     c.extra.append(ContentLine(name='X-WR-CALNAME', value='Facebook Birthdays (fb2cal)'))
     c.extra.append(ContentLine(name='X-PUBLISHED-TTL', value='PT12H'))
     c.extra.append(ContentLine(name='X-ORIGINAL-URL', value='/events/birthdays/'))
+    return c
+
+def get_birthday_year(birthday, cur_date):
+    """ Calculate the year as this year or next year based on if its past current month or not """
+
+    return cur_date.year if birthday.month >= cur_date.month else (cur_date + relativedelta(years=1)).year
+
+def get_birthday_events(birthdays):
+    """ Returns a set of compact birthday events, ordered like the events of populate_birthdays_calendar(birthdays) """
+
+    cur_date = datetime.now()
+
+    events = set()
+    for birthday in birthdays:
+        events.add(BirthdayEvent(birthday, get_birthday_year(birthday, cur_date)))
+    return events
+
+def iter_birthday_events_ics(events):
+    """ Stream a birthdays calendar as ICS lines, one event at a time.
+        Output is identical to iterating over the populate_birthdays_calendar calendar with the same birthdays. """
+
+    return iter_calendar_ics(create_birthdays_calendar(), (event.serialize() for event in events))
+
+def populate_birthdays_calendar(birthdays):
+    """ Populate a birthdays calendar using birthday objects """
+
+    c = create_birthdays_calendar()
 
     cur_date = datetime.now()
 
@@ -795,9 +1570,8 @@ def populate_birthdays_calendar(birthdays):
         e.uid = birthday.uid
         e.name = f"{birthday.name}'s Birthday"
 
-        # Calculate the year as this year or next year based on if its past current month or not
-        # Also pad day, month with leading zeros to 2dp
-        year = cur_date.year if birthday.month >= cur_date.month else (cur_date + relativedelta(years=1)).year
+        # Pad day, month with leading zeros to 2dp
+        year = get_birthday_year(birthday, cur_date)
         month = '{:02d}'.format(birthday.month)
         day = '{:02d}'.format(birthday.day)
         e.begin = f'{year}-{month}-{day} 00:00:00'
@@ -809,17 +1583,18 @@ def populate_birthdays_calendar(birthdays):
 
     return c
 
-def main2():
+def main2(session_cookies=None):
     logger = setup_custom_logger('fb2cal')
     logger.info(f'Starting fb2cal v{__version__} ({__status__}) [{__website__}]')
     logger.info(f'This project is released under the {__license__} license.')
 
     try:
-        main(logger)
+        main(logger, session_cookies)
     except SystemExit:
         logger.critical(f'Critical error encountered. Terminating.')
         sys.exit()
     finally:
+        stop_logging()
         logging.shutdown()
 
 
@@ -829,10 +1604,11 @@ if __name__ == '__main__':
     logger.info(f'This project is released under the {__license__} license.')
 
     try:
-        main()
+        main(logger)
     except SystemExit:
         logger.critical(f'Critical error encountered. Terminating.')
         sys.exit()
     finally:
+        stop_logging()
         logging.shutdown()
 
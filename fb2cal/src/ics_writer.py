@@ -0,0 +1,61 @@
+"""
+    Streaming ICS serializer for fb2cal.
+
+    Produces the same lines as iterating over an ics Calendar, but serializes one
+    event at a time instead of rendering the whole calendar into a single string first.
+    It mirrors the serializer of ics 0.7.3, the version pinned in requirements.txt.
+"""
+
+from ics.grammar.parse import ContentLine
+
+LINE_ENDING = '\r\n'
+
+def iter_calendar_ics(calendar, event_blocks=None):
+    """ Yields the lines of calendar (with line endings, except for the last line) exactly like iterating over the ics Calendar.
+        event_blocks optionally replaces calendar.events with an iterable of serialized VEVENT blocks. """
+
+    if event_blocks is None:
+        event_blocks = (event.serialize() for event in calendar.events)
+
+    yield f'BEGIN:VCALENDAR{LINE_ENDING}'
+
+    # Same property order as ics CalendarSerializer: extra, VERSION, PRODID, CALSCALE, events, METHOD, todos
+    for line in calendar.extra:
+        yield from iter_block_lines(str(line))
+    yield f'VERSION:2.0{LINE_ENDING}'
+    yield f'{ContentLine("PRODID", value=calendar.creator or "ics.py - http://git.io/lLljaA")}{LINE_ENDING}'
+    if calendar.scale:
+        yield f'CALSCALE:{calendar.scale.upper()}{LINE_ENDING}'
+    for event_block in event_blocks:
+        yield from iter_block_lines(event_block)
+    if calendar.method:
+        yield f'METHOD:{calendar.method.upper()}{LINE_ENDING}'
+    for todo in calendar.todos:
+        yield from iter_block_lines(todo.serialize())
+
+    yield 'END:VCALENDAR'
+
+def iter_block_lines(block):
+    """ Split a serialized block the same way ics does, terminating its last line """
+
+    lines = block.splitlines(keepends=True)
+    lines[-1] += LINE_ENDING
+    return lines
+
+def write_calendar_ics(lines, stream):
+    """ Write calendar lines to a text stream one line at a time. Returns the number of characters written. """
+
+    written = 0
+    for line in lines:
+        written += stream.write(line)
+    return written
+
+def get_event_hash(uid):
+    """ Hash of an ics Event with the provided uid, determines the position of the event in Calendar.events """
+
+    return int(''.join(map(lambda x: '%.3d' % ord(x), uid)))
+
+def escape_text(value):
+    """ Escape a TEXT property value like ics does """
+
+    return value.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n').replace('\r', '\\r')
@@ -0,0 +1,96 @@
+"""
+    Persistent per-month birthday cache for fb2cal.
+
+    Stores, for each month page, a digest of its birthday card html together with the
+    birthdays parsed and resolved from it. A month page whose digest is unchanged can
+    reuse the stored birthdays instead of being parsed and resolved again.
+"""
+
+import os
+import json
+import time
+import threading
+from datetime import datetime
+
+class MonthCache:
+    """ Month key ('YYYY-MM') -> (html digest, fetch time, birthdays) cache """
+
+    FILE_FORMAT_VERSION = 1
+
+    def __init__(self, path):
+        self.path = path
+        self.skipped = 0
+        self._entries = {} # month_key -> {'digest': str, 'fetched_at': epoch seconds, 'birthdays': [[uid, name, day, month], ...]}
+        self._lock = threading.Lock()
+
+    def load(self, logger):
+        """ Load cached months from disk, ignoring a missing or unreadable cache file """
+
+        if not self.path or not os.path.isfile(self.path):
+            return
+
+        try:
+            with open(self.path, 'r', encoding='UTF-8') as cache_file:
+                data = json.load(cache_file)
+        except (OSError, ValueError) as e:
+            logger.warning(f'Failed to read month cache {self.path}, starting with an empty cache. Error: {e}')
+            return
+
+        if data.get('version') != self.FILE_FORMAT_VERSION:
+            logger.info(f'Month cache {self.path} has an unsupported version, starting with an empty cache.')
+            return
+
+        self._entries = data.get('months', {})
+        logger.debug(f'Loaded {len(self._entries)} months from month cache {self.path}.')
+
+    def save(self, logger):
+        """ Write cached months to disk atomically """
+
+        if not self.path:
+            return
+
+        with self._lock:
+            data = {'version': self.FILE_FORMAT_VERSION, 'months': self._entries}
+
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w', encoding='UTF-8') as cache_file:
+                json.dump(data, cache_file)
+            os.replace(tmp_path, self.path)
+
+        logger.debug(f'Saved {len(self._entries)} months to month cache {self.path}.')
+
+    def lookup(self, month_key, digest):
+        """ Returns the stored birthday tuples for the month if its digest matches, otherwise None.
+            A match also marks the month as freshly fetched. """
+
+        with self._lock:
+            entry = self._entries.get(month_key)
+            if entry is None or entry['digest'] != digest:
+                return None
+
+            entry['fetched_at'] = time.time()
+            self.skipped += 1
+            return [tuple(birthday) for birthday in entry['birthdays']]
+
+    def get_fresh(self, month_key, max_age_days):
+        """ Returns the stored birthday tuples for the month if it was fetched less than max_age_days calendar days ago, otherwise None """
+
+        with self._lock:
+            entry = self._entries.get(month_key)
+            if entry is None:
+                return None
+
+            age_days = (datetime.now().date() - datetime.fromtimestamp(entry['fetched_at']).date()).days
+            if age_days >= max_age_days:
+                return None
+
+            return [tuple(birthday) for birthday in entry['birthdays']]
+
+    def store(self, month_key, digest, birthdays):
+        """ Store the (uid, name, day, month) birthday tuples parsed from a month page with the provided digest """
+
+        with self._lock:
+            self._entries[month_key] = {'digest': digest,
+                                        'fetched_at': time.time(),
+                                        'birthdays': [list(birthday) for birthday in birthdays]}
@@ -0,0 +1,80 @@
+"""
+    Adaptive request rate governor for fb2cal.
+
+    A token bucket shared by all Facebook requests. The refill rate follows AIMD: it grows
+    additively after every successful request up to the configured maximum and is cut
+    multiplicatively whenever Facebook throttles a request. Latency, wait time and throttle
+    counts are tracked per endpoint.
+"""
+
+import time
+import threading
+
+class EndpointStats:
+    """ Request statistics of a single endpoint """
+
+    def __init__(self):
+        self.requests = 0
+        self.throttled = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.total_wait = 0.0
+
+    def __str__(self):
+        average_latency = self.total_latency / self.requests if self.requests else 0.0
+        return (f'{self.requests} requests, {self.throttled} throttled, '
+                f'average latency {average_latency * 1000:.0f} ms, max latency {self.max_latency * 1000:.0f} ms, '
+                f'waited {self.total_wait:.1f} s')
+
+class RateGovernor:
+    """ Thread safe token bucket with AIMD rate control. A max_rate of 0 disables rate limiting but keeps statistics. """
+
+    def __init__(self, max_rate, min_rate=0.5, burst=1, additive_increase=0.1, multiplicative_decrease=0.5):
+        self.max_rate = max_rate # Requests per second
+        self.min_rate = min(min_rate, max_rate)
+        self.burst = max(burst, 1)
+        self.additive_increase = additive_increase # Requests per second added after each successful request
+        self.multiplicative_decrease = multiplicative_decrease # Factor applied to the rate after a throttled request
+        self.rate = max_rate
+        self.stats = {} # endpoint -> EndpointStats
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """ Take a token, sleeping until one is available. Returns the time waited in seconds. """
+
+        if self.max_rate <= 0:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1 # Reserve the token, waiting callers queue up behind each other
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def record(self, endpoint, latency, wait, throttled):
+        """ Record a finished request and adapt the rate """
+
+        with self._lock:
+            stats = self.stats.setdefault(endpoint, EndpointStats())
+            stats.requests += 1
+            stats.total_latency += latency
+            stats.max_latency = max(stats.max_latency, latency)
+            stats.total_wait += wait
+
+            if self.max_rate <= 0:
+                stats.throttled += throttled
+                return
+
+            if throttled:
+                stats.throttled += 1
+                self.rate = max(self.min_rate, self.rate * self.multiplicative_decrease)
+                self._tokens = min(self._tokens, 0) # Drop any burst allowance
+            else:
+                self.rate = min(self.max_rate, self.rate + self.additive_increase)
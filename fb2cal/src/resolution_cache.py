@@ -0,0 +1,100 @@
+"""
+    Persistent vanity name to entity id resolution cache for fb2cal.
+
+    Vanity names (custom profile URLs) rarely change their underlying entity id,
+    so resolutions are stored on disk between runs. Failed resolutions are cached
+    for a shorter period so a broken profile does not cost a slow lookup on every run.
+"""
+
+import os
+import json
+import time
+import threading
+
+class ResolutionCache:
+    """ Vanity name -> entity id cache with TTL, negative-result caching and a size bound """
+
+    FILE_FORMAT_VERSION = 1
+
+    def __init__(self, path, ttl_seconds, negative_ttl_seconds, max_entries):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = {} # vanity_name -> [entity_id or None, stored_at epoch seconds]
+        self._lock = threading.Lock()
+
+    def load(self, logger):
+        """ Load cached entries from disk, ignoring a missing or unreadable cache file """
+
+        if not self.path or not os.path.isfile(self.path):
+            return
+
+        try:
+            with open(self.path, 'r', encoding='UTF-8') as cache_file:
+                data = json.load(cache_file)
+        except (OSError, ValueError) as e:
+            logger.warning(f'Failed to read resolution cache {self.path}, starting with an empty cache. Error: {e}')
+            return
+
+        if data.get('version') != self.FILE_FORMAT_VERSION:
+            logger.info(f'Resolution cache {self.path} has an unsupported version, starting with an empty cache.')
+            return
+
+        self._entries = data.get('entries', {})
+        self._evict_expired()
+        logger.debug(f'Loaded {len(self._entries)} entries from resolution cache {self.path}.')
+
+    def save(self, logger):
+        """ Write cached entries to disk atomically """
+
+        if not self.path:
+            return
+
+        with self._lock:
+            self._evict_expired()
+            data = {'version': self.FILE_FORMAT_VERSION, 'entries': self._entries}
+
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w', encoding='UTF-8') as cache_file:
+                json.dump(data, cache_file)
+            os.replace(tmp_path, self.path)
+
+        logger.debug(f'Saved {len(self._entries)} entries to resolution cache {self.path}.')
+
+    def lookup(self, vanity_name):
+        """ Returns (found, entity_id). entity_id is None for a cached failed resolution. """
+
+        with self._lock:
+            entry = self._entries.get(vanity_name)
+            if entry is not None and not self._is_expired(entry, time.time()):
+                self.hits += 1
+                return True, entry[0]
+
+            self.misses += 1
+            return False, None
+
+    def store(self, vanity_name, entity_id):
+        """ Store a resolution result. Pass entity_id None to record a failed resolution. """
+
+        with self._lock:
+            self._entries.pop(vanity_name, None) # Re-insert so dict order tracks recency
+            self._entries[vanity_name] = [entity_id, time.time()]
+
+            # Enforce size bound by evicting the oldest stored entries
+            while len(self._entries) > self.max_entries:
+                del self._entries[next(iter(self._entries))]
+
+    def _is_expired(self, entry, now):
+        ttl = self.ttl_seconds if entry[0] is not None else self.negative_ttl_seconds
+        return now - entry[1] > ttl
+
+    def _evict_expired(self):
+        now = time.time()
+        self._entries = {vanity_name: entry for vanity_name, entry in self._entries.items() if not self._is_expired(entry, now)}
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,76 @@
+"""
+    Persistent Facebook session storage for fb2cal.
+
+    Stores the authenticated cookie jar together with the async token and locale so that
+    subsequent runs can skip the full login flow while the session is still valid.
+"""
+
+import os
+import json
+import time
+import requests
+
+class SessionStore:
+    """ Saves and loads an authenticated Facebook session with an expiry """
+
+    FILE_FORMAT_VERSION = 1
+
+    def __init__(self, path, ttl_seconds):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+
+    def load(self, email, logger):
+        """ Returns (cookies, async_token, locale) of the stored session for email, or None if there is no usable session """
+
+        if not self.path or not os.path.isfile(self.path):
+            return None
+
+        try:
+            with open(self.path, 'r', encoding='UTF-8') as session_file:
+                data = json.load(session_file)
+        except (OSError, ValueError) as e:
+            logger.warning(f'Failed to read stored session {self.path}. Error: {e}')
+            return None
+
+        if data.get('version') != self.FILE_FORMAT_VERSION or data.get('email') != email:
+            logger.info('Stored session does not belong to the configured account.')
+            return None
+
+        if time.time() > data['expires_at']:
+            logger.info('Stored session has expired.')
+            return None
+
+        cookies = [requests.cookies.create_cookie(**cookie) for cookie in data['cookies']]
+        return cookies, data.get('async_token'), data.get('locale')
+
+    def save(self, email, cookiejar, async_token, locale, logger):
+        """ Store the session cookies, async token and locale for email. The file is only readable by its owner. """
+
+        if not self.path:
+            return
+
+        data = {'version': self.FILE_FORMAT_VERSION,
+                'email': email,
+                'expires_at': time.time() + self.ttl_seconds,
+                'async_token': async_token,
+                'locale': locale,
+                'cookies': [{'name': cookie.name,
+                             'value': cookie.value,
+                             'domain': cookie.domain,
+                             'path': cookie.path,
+                             'expires': cookie.expires,
+                             'secure': cookie.secure} for cookie in cookiejar]}
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f'{self.path}.tmp'
+        with open(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w', encoding='UTF-8') as session_file:
+            json.dump(data, session_file)
+        os.replace(tmp_path, self.path)
+
+        logger.debug(f'Saved session with {len(data["cookies"])} cookies to {self.path}.')
+
+    def clear(self):
+        """ Remove the stored session """
+
+        if self.path and os.path.isfile(self.path):
+            os.remove(self.path)
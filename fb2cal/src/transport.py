@@ -0,0 +1,73 @@
+"""
+    HTTP transport configuration for the fb2cal browser session.
+
+    Mounts pooled adapters with per-request timeouts and jittered exponential retries
+    on idempotent GET requests onto the requests session used by mechanicalsoup.
+"""
+
+import random
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+class TransportSettings:
+    """ Settings for the browser session transport """
+
+    def __init__(self, pool_size=10, max_retries=3, backoff_factor=0.5, backoff_jitter=0.5, connect_timeout=10, read_timeout=30):
+        self.pool_size = pool_size # Connections kept alive per host, should be at least the fetch concurrency
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor # Base of the exponential backoff in seconds
+        self.backoff_jitter = backoff_jitter # Random fraction of each backoff added on top of it
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+class JitteredRetry(Retry):
+    """ Retry with exponential backoff where each backoff is stretched by a random fraction of up to `jitter` """
+
+    RETRY_STATUS_CODES = frozenset([500, 502, 503, 504])
+
+    def __init__(self, *args, jitter=0.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.jitter = jitter
+
+    def new(self, **kwargs):
+        retry = super().new(**kwargs)
+        retry.jitter = self.jitter
+        return retry
+
+    def get_backoff_time(self):
+        backoff_time = super().get_backoff_time()
+        return backoff_time + backoff_time * random.uniform(0, self.jitter)
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """ HTTPAdapter applying a default timeout to requests that do not specify one """
+
+    def __init__(self, *args, timeout=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.timeout = timeout
+
+    def send(self, request, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().send(request, **kwargs)
+
+def configure_session(session, settings):
+    """ Mount pooled, retrying adapters with default timeouts on a requests session """
+
+    retry = JitteredRetry(total=settings.max_retries,
+                          connect=settings.max_retries,
+                          read=settings.max_retries,
+                          status=settings.max_retries,
+                          allowed_methods=frozenset(['GET']), # Only retry idempotent requests, never the login form submission
+                          status_forcelist=JitteredRetry.RETRY_STATUS_CODES,
+                          backoff_factor=settings.backoff_factor,
+                          raise_on_status=False, # Hand the final response back so callers can log and handle it
+                          jitter=settings.backoff_jitter)
+
+    for prefix in ['https://', 'http://']:
+        session.mount(prefix, TimeoutHTTPAdapter(pool_connections=settings.pool_size,
+                                                 pool_maxsize=settings.pool_size,
+                                                 max_retries=retry,
+                                                 timeout=(settings.connect_timeout, settings.read_timeout)))
+
+    session.headers['Accept-Encoding'] = 'gzip, deflate'
+    session.headers['Connection'] = 'keep-alive'
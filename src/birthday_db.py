@@ -0,0 +1,188 @@
+import sqlite3
+from datetime import datetime
+from typing import Iterable, List, Tuple
+from ics import Calendar
+from calendar_store import BirthdayRecord, CalendarStore
+
+SCHEMA_VERSION = 1
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS birthdays (
+    uid TEXT PRIMARY KEY,
+    name TEXT,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    day INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS birthdays_by_date ON birthdays (month, day);
+CREATE TABLE IF NOT EXISTS scheduled_messages (
+    uid TEXT PRIMARY KEY REFERENCES birthdays (uid) ON DELETE CASCADE,
+    message TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS send_history (
+    id INTEGER PRIMARY KEY,
+    uid TEXT NOT NULL,
+    message TEXT NOT NULL,
+    sent_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS send_history_by_uid ON send_history (uid);
+'''
+
+SELECT_BIRTHDAYS = '''
+SELECT b.uid, b.name, b.year, b.month, b.day, m.message
+FROM birthdays b LEFT JOIN scheduled_messages m ON m.uid = b.uid
+'''
+
+
+class BirthdayDatabase:
+    """
+    SQLite storage of birthdays, scheduled birthday messages and the history
+    of sent messages. Serves as the backend of a CalendarStore, which writes
+    each change through to it.
+    """
+    path: str
+    _connection: sqlite3.Connection
+
+    def __init__(self, path: str) -> None:
+        """ Open the database, creating it if it does not exist.
+        :param path:    Path of the database file
+        :return         None
+        """
+        self.path = path
+        # FBUser serializes access from its background refresh thread
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute('PRAGMA foreign_keys = ON')
+        version = self._connection.execute('PRAGMA user_version').fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise sqlite3.DatabaseError(
+                f'{path} has an unsupported schema version {version}')
+        # only write when the schema changes, so that opening the database
+        # leaves the file as is and a warm start snapshot stays valid
+        if version < SCHEMA_VERSION:
+            self._connection.executescript(SCHEMA)
+            self._connection.execute(
+                f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def is_empty(self) -> bool:
+        """ Return whether the database has no birthdays.
+        :return:    True if there are no birthdays
+        """
+        return self._connection.execute(
+            'SELECT 1 FROM birthdays LIMIT 1').fetchone() is None
+
+    def load_records(self) -> List[BirthdayRecord]:
+        """ Load all birthdays with their scheduled messages.
+        :return:    A list of birthday records
+        """
+        return [BirthdayRecord(*row)
+                for row in self._connection.execute(SELECT_BIRTHDAYS)]
+
+    def load_store(self, records: Iterable[BirthdayRecord] = None) \
+            -> CalendarStore:
+        """ Load all birthdays into a store that writes changes back.
+        :param records: Birthday records already loaded from this database,
+                        e.g. by a warm start snapshot. If None, they are read
+                        from the database
+        :return:        The birthday store
+        """
+        if records is None:
+            records = self.load_records()
+        return CalendarStore.from_records(records, self)
+
+    def source_paths(self) -> List[str]:
+        """ Return the paths of the files the birthdays are stored in.
+        :return:    A list of paths
+        """
+        return [self.path]
+
+    def get_birthdays_on(self, month: int, day: int) -> List[BirthdayRecord]:
+        """ Load the birthdays on a day of the year.
+        :param month:   Month of the birthdays
+        :param day:     Day of the birthdays
+        :return:        A list of birthday records
+        """
+        return [BirthdayRecord(*row) for row in self._connection.execute(
+            SELECT_BIRTHDAYS + 'WHERE b.month = ? AND b.day = ?',
+            (month, day))]
+
+    def save(self, record: BirthdayRecord) -> None:
+        """ Insert or update a birthday and its scheduled message.
+        :param record:  Birthday record to save
+        :return:        None
+        """
+        self._connection.execute(
+            'INSERT INTO birthdays (uid, name, year, month, day) '
+            'VALUES (?, ?, ?, ?, ?) ON CONFLICT (uid) DO UPDATE SET '
+            'name = excluded.name, year = excluded.year, '
+            'month = excluded.month, day = excluded.day',
+            (record.uid, record.name, record.year, record.month, record.day))
+        if record.description:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO scheduled_messages (uid, message) '
+                'VALUES (?, ?)', (record.uid, record.description))
+        else:
+            self._connection.execute(
+                'DELETE FROM scheduled_messages WHERE uid = ?', (record.uid,))
+
+    def delete(self, uid: str) -> None:
+        """ Delete a birthday and its scheduled message.
+        :param uid: uid of the birthday to delete
+        :return:    None
+        """
+        self._connection.execute('DELETE FROM birthdays WHERE uid = ?',
+                                 (uid,))
+
+    def record_sent(self, uid: str, message: str, sent_at: datetime) -> None:
+        """ Add a sent birthday message to the send history.
+        :param uid:     uid of the friend the message was sent to
+        :param message: Sent message
+        :param sent_at: Time the message was sent
+        :return:        None
+        """
+        self._connection.execute(
+            'INSERT INTO send_history (uid, message, sent_at) '
+            'VALUES (?, ?, ?)', (uid, message, sent_at.isoformat()))
+
+    def get_send_history(self, uid: str) -> List[Tuple[str, datetime]]:
+        """ Return the messages sent to a friend, oldest first.
+        :param uid: uid of the friend
+        :return:    A list of (message, time sent)
+        """
+        return [(message, datetime.fromisoformat(sent_at))
+                for message, sent_at in self._connection.execute(
+                    'SELECT message, sent_at FROM send_history WHERE uid = ? '
+                    'ORDER BY id', (uid,))]
+
+    def import_calendar(self, cal: Calendar) -> int:
+        """ Save all events of an ics Calendar, replacing birthdays with the
+        same uid, in a single transaction.
+        :param cal: Birthday calendar to import
+        :return:    The number of imported birthdays
+        """
+        return self.import_records(CalendarStore(cal))
+
+    def import_records(self, records: Iterable[BirthdayRecord]) -> int:
+        """ Save birthday records, replacing birthdays with the same uid, in a
+        single transaction.
+        :param records: Birthday records to import
+        :return:        The number of imported birthdays
+        """
+        count = 0
+        with self._connection:
+            for record in records:
+                self.save(record)
+                count += 1
+        return count
+
+    def commit(self) -> None:
+        """ Commit the changes since the last commit.
+        :return:    None
+        """
+        self._connection.commit()
+
+    def close(self) -> None:
+        """ Commit pending changes and close the database.
+        :return:    None
+        """
+        self._connection.commit()
+        self._connection.close()
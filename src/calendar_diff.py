@@ -0,0 +1,91 @@
+from typing import Callable, Dict, List, Set, Tuple
+from arrow import Arrow
+from calendar_store import BirthdayRecord, CalendarStore
+
+
+class CalendarChanges:
+    """
+    Differences between a stored birthday calendar and a freshly downloaded
+    one.
+    """
+    added: List[BirthdayRecord]
+    changed: List[Tuple[BirthdayRecord, Arrow]]
+    removed: List[str]
+    kept: List[str]
+
+    def __init__(self) -> None:
+        """ Initialize an empty set of changes.
+        added:      birthdays that are only in the downloaded calendar
+        changed:    (stored birthday, new birthday date) of moved birthdays
+        removed:    uids of stored events of people who are no longer friends
+        kept:       uids of stored events that are missing from the
+                    downloaded calendar but are still friends
+        :return     None
+        """
+        self.added = []
+        self.changed = []
+        self.removed = []
+        self.kept = []
+
+    def summary(self) -> Dict[str, int]:
+        """ Return the number of changes per kind.
+        :return:    A dictionary mapping the kind of change to its count
+        """
+        return {'added': len(self.added), 'changed': len(self.changed),
+                'removed': len(self.removed), 'kept': len(self.kept)}
+
+    def __str__(self) -> str:
+        return ', '.join(f'{count} {kind}'
+                         for kind, count in self.summary().items())
+
+
+def diff_calendars(store: CalendarStore, new_store: CalendarStore,
+                   get_friend_uids: Callable[[], Set[str]]) \
+        -> CalendarChanges:
+    """ Compute the changes needed to bring a stored birthday calendar up to
+    date with a downloaded one, in a single pass over each calendar.
+    A stored birthday is moved if its date changed or if the downloaded
+    calendar has it in a later year. Stored events missing from the downloaded
+    calendar are only removed if the uid is no longer a friend.
+    :param store:           Stored birthday calendar
+    :param new_store:       Downloaded birthday calendar
+    :param get_friend_uids: Returns the uids of all friends. Called at most
+                            once, and only if stored events are missing from
+                            the downloaded calendar
+    :return:                The changes
+    """
+    changes = CalendarChanges()
+
+    for event in new_store:
+        old_event = store.get(event.uid)
+        if old_event is None:
+            changes.added.append(event)
+        elif old_event.begin < event.begin or \
+                (old_event.begin.month, old_event.begin.day) != \
+                (event.begin.month, event.begin.day):
+            changes.changed.append((old_event, event.begin))
+
+    missing_uids = [uid for uid in store.uids() if uid not in new_store]
+    if missing_uids:
+        friend_uids = get_friend_uids()
+        for uid in missing_uids:
+            if uid in friend_uids:
+                changes.kept.append(uid)
+            else:
+                changes.removed.append(uid)
+
+    return changes
+
+
+def apply_changes(store: CalendarStore, changes: CalendarChanges) -> None:
+    """ Apply changes computed by diff_calendars to the stored calendar.
+    :param store:   Stored birthday calendar
+    :param changes: Changes to apply
+    :return:        None
+    """
+    for event in changes.added:
+        store.add(event)
+    for event, begin in changes.changed:
+        store.set_begin(event, begin)
+    for uid in changes.removed:
+        store.remove(uid)
@@ -0,0 +1,211 @@
+import json
+import os
+import time
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+from ics import Calendar
+from calendar_store import BirthdayRecord, CalendarStore
+from lazy_ics import LazyCalendar
+from fb2cal.src.ics_writer import write_calendar_ics
+
+SAVE = 's'
+DELETE = 'd'
+
+
+class CalendarJournal:
+    """
+    Keeps the birthday calendar in an ics snapshot plus an append-only journal
+    of the changes made since. Serves as the backend of a CalendarStore.
+    Journal entries are written and fsynced once per commit, and the snapshot
+    is only rewritten by a compaction, once the journal grows past
+    compact_bytes or compact_seconds have passed since the last compaction.
+    Loading never modifies the files. A last entry torn by a crash is skipped
+    on load and cut off by the first commit.
+    The ics format has no send history, so record_sent is not persisted.
+    """
+    snapshot_path: str
+    journal_path: str
+    compact_bytes: int
+    compact_seconds: float
+    _pending: List[str]
+    _store: Optional[CalendarStore]
+    _tail_repaired: bool
+
+    def __init__(self, snapshot_path: str, journal_path: str,
+                 compact_bytes: int = 1024 * 1024,
+                 compact_seconds: float = 7 * 24 * 60 * 60) -> None:
+        """ Initialize a journal for an ics snapshot.
+        :param snapshot_path:   Path of the ics snapshot
+        :param journal_path:    Path of the journal
+        :param compact_bytes:   Journal size that triggers a compaction
+        :param compact_seconds: Age of the snapshot that triggers a compaction
+        :return                 None
+        """
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path
+        self.compact_bytes = compact_bytes
+        self.compact_seconds = compact_seconds
+        self._pending = []
+        self._store = None
+        self._tail_repaired = False
+
+    def is_empty(self) -> bool:
+        """ Return whether there is neither a snapshot nor a journal.
+        :return:    True if nothing has been stored yet
+        """
+        return not os.path.exists(self.snapshot_path) and \
+            not os.path.exists(self.journal_path)
+
+    def load_store(self, records: Iterable[BirthdayRecord] = None) \
+            -> CalendarStore:
+        """ Load the snapshot and replay the journal on top of it into a
+        store that writes changes back.
+        :param records: Birthday records already loaded from this snapshot
+                        and journal, e.g. by a warm start snapshot. If None,
+                        they are read from the files
+        :return:        The birthday store
+        """
+        if records is None:
+            records = self._load_records()
+        self._store = CalendarStore.from_records(records, self)
+        return self._store
+
+    def source_paths(self) -> List[str]:
+        """ Return the paths of the files the birthdays are stored in.
+        :return:    A list of paths
+        """
+        return [self.snapshot_path, self.journal_path]
+
+    def _load_records(self) -> Iterable[BirthdayRecord]:
+        """ Read the snapshot and replay the journal on top of it. """
+        records = {}
+        if os.path.exists(self.snapshot_path):
+            with LazyCalendar(self.snapshot_path) as cal:
+                for record in cal.iter_records():
+                    records[record.uid] = record
+        for entry in self._read_journal():
+            if entry[0] == SAVE:
+                records[entry[1]] = BirthdayRecord(*entry[1:])
+            elif entry[0] == DELETE:
+                records.pop(entry[1], None)
+        return records.values()
+
+    def import_calendar(self, cal: Calendar) -> int:
+        """ Replace the snapshot with the events of an ics Calendar.
+        :param cal: Birthday calendar to import
+        :return:    The number of imported birthdays
+        """
+        return self.import_records(CalendarStore(cal))
+
+    def import_records(self, records: Iterable[BirthdayRecord]) -> int:
+        """ Replace the snapshot with birthday records.
+        :param records: Birthday records to import
+        :return:        The number of imported birthdays
+        """
+        store = CalendarStore.from_records(records)
+        self._write_snapshot(store)
+        return len(store)
+
+    def save(self, record: BirthdayRecord) -> None:
+        """ Journal an inserted or updated birthday.
+        :param record:  Birthday record to save
+        :return:        None
+        """
+        self._append([SAVE, record.uid, record.name, record.year,
+                      record.month, record.day, record.description])
+
+    def delete(self, uid: str) -> None:
+        """ Journal a deleted birthday.
+        :param uid: uid of the birthday to delete
+        :return:    None
+        """
+        self._append([DELETE, uid])
+
+    def record_sent(self, uid: str, message: str, sent_at: datetime) -> None:
+        """ Sent messages are not persisted in the ics format. """
+
+    def commit(self) -> None:
+        """ Append the pending entries to the journal with a single fsync,
+        then compact if the journal is large or the snapshot old.
+        :return:    None
+        """
+        if self._pending:
+            if not self._tail_repaired:
+                self._repair_tail()
+            with open(self.journal_path, 'a', encoding='UTF-8') as f:
+                f.write(''.join(self._pending))
+                f.flush()
+                os.fsync(f.fileno())
+            self._pending = []
+        if self._store is not None and self._needs_compaction():
+            self.compact()
+
+    def compact(self) -> None:
+        """ Rewrite the snapshot from the store and empty the journal.
+        :return:    None
+        """
+        self._write_snapshot(self._store)
+        # replaying the journal onto the new snapshot is harmless, so a crash
+        # before the journal is removed does not lose or duplicate changes
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self._tail_repaired = True
+
+    def close(self) -> None:
+        """ Commit pending changes.
+        :return:    None
+        """
+        self.commit()
+
+    def _append(self, entry: list) -> None:
+        self._pending.append(json.dumps(entry, separators=(',', ':')) + '\n')
+
+    def _read_journal(self) -> List[list]:
+        """ Read the journal entries, without modifying the journal. """
+        return self._scan_journal()[0]
+
+    def _scan_journal(self) -> Tuple[List[list], int]:
+        """ Read the journal entries up to a last line torn by a crash, and
+        the length of the journal up to that line. """
+        if not os.path.exists(self.journal_path):
+            return [], 0
+        entries = []
+        valid_length = 0
+        with open(self.journal_path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    entries.append(json.loads(line.decode('UTF-8')))
+                except ValueError:
+                    break
+                valid_length += len(line)
+        return entries, valid_length
+
+    def _repair_tail(self) -> None:
+        """ Cut off a last line torn by a crash before appending, so that new
+        entries are on a line of their own and are not hidden by it. """
+        _, valid_length = self._scan_journal()
+        if os.path.exists(self.journal_path) and \
+                os.path.getsize(self.journal_path) > valid_length:
+            with open(self.journal_path, 'rb+') as f:
+                f.truncate(valid_length)
+        self._tail_repaired = True
+
+    def _needs_compaction(self) -> bool:
+        if not os.path.exists(self.journal_path):
+            return False
+        if os.path.getsize(self.journal_path) >= self.compact_bytes:
+            return True
+        return not os.path.exists(self.snapshot_path) or \
+            time.time() - os.path.getmtime(self.snapshot_path) >= \
+            self.compact_seconds
+
+    def _write_snapshot(self, store: CalendarStore) -> None:
+        """ Write the ics snapshot of a store atomically. """
+        tmp_path = f'{self.snapshot_path}.tmp'
+        with open(tmp_path, 'w') as f:
+            write_calendar_ics(store.iter_ics(), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
@@ -0,0 +1,258 @@
+import copy
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from arrow import Arrow
+from ics import Calendar, Event
+from ics.grammar.parse import ContentLine
+from fb2cal.src.ics_writer import iter_calendar_ics
+
+
+class BirthdayRecord:
+    """
+    Compact yearly all day birthday event. Keeps only the fields Genie uses,
+    an ics Event is materialized from it for export.
+    """
+    __slots__ = ('uid', 'name', 'year', 'month', 'day', '_description')
+
+    def __init__(self, uid: str, name: str, year: int, month: int, day: int,
+                 description: str = None) -> None:
+        """ Initialize a birthday record.
+        :param uid:         Friend's FB UID
+        :param name:        Event name, e.g. "Jane Doe's Birthday"
+        :param year:        Year of the next birthday
+        :param month:       Month of the birthday
+        :param day:         Day of the birthday
+        :param description: Scheduled birthday message, if any
+        :return             None
+        """
+        self.uid = uid
+        self.name = name
+        self.year = year
+        self.month = month
+        self.day = day
+        self.description = description
+
+    @property
+    def description(self) -> Optional[str]:
+        return self._description
+
+    @description.setter
+    def description(self, message: Optional[str]) -> None:
+        # template messages repeat across many friends, keep a single copy
+        self._description = sys.intern(message) if message else message
+
+    @property
+    def begin(self) -> Arrow:
+        return Arrow(self.year, self.month, self.day)
+
+    @begin.setter
+    def begin(self, begin: Arrow) -> None:
+        self.year, self.month, self.day = begin.year, begin.month, begin.day
+
+    @classmethod
+    def from_event(cls, event: Event) -> 'BirthdayRecord':
+        """ Create a birthday record from an ics Event.
+        :param event:   Birthday event
+        :return:        Birthday record
+        """
+        begin = event.begin
+        return cls(event.uid, event.name, begin.year, begin.month, begin.day,
+                   event.description)
+
+    def to_event(self) -> Event:
+        """ Materialize the ics Event of this birthday.
+        :return:    Birthday event
+        """
+        event = Event()
+        event.uid = self.uid
+        event.name = self.name
+        event.begin = self.begin
+        event.make_all_day()
+        event.duration = timedelta(days=1)
+        event.extra.append(ContentLine(name='RRULE', value='FREQ=YEARLY'))
+        event.description = self.description
+        return event
+
+
+class CalendarStore:
+    """
+    Birthday calendar with a uid index and a (month, day) index of compact
+    birthday records. ics Events are only materialized for export.
+    Changes are written through to an optional backend, which has the methods
+    save(record), delete(uid), record_sent(uid, message, sent_at), commit()
+    and close().
+    """
+    calendar: Calendar
+    backend: Optional[object]
+    _by_uid: Dict[str, BirthdayRecord]
+    _by_date: Dict[Tuple[int, int], Dict[str, BirthdayRecord]]
+
+    def __init__(self, cal: Calendar, backend: object = None) -> None:
+        """ Index the events of a birthday calendar as birthday records.
+        If several events share a uid, only the first one is kept.
+        :param cal:     Birthday calendar. Its events are moved into the
+                        store, the calendar itself is kept for its other
+                        properties
+        :param backend: Persistent storage that changes are written to. The
+                        events of cal are assumed to be stored already
+        :return         None
+        """
+        self.calendar = cal
+        self.backend = backend
+        self._by_uid = {}
+        self._by_date = {}
+        for event in cal.events:
+            if event.uid not in self._by_uid:
+                self._index(BirthdayRecord.from_event(event))
+        cal.events.clear()
+
+    @classmethod
+    def from_records(cls, records: Iterable[BirthdayRecord],
+                     backend: object = None) -> 'CalendarStore':
+        """ Index birthday records without going through ics Events.
+        :param records: Birthday records, assumed to be stored in backend
+        :param backend: Persistent storage that changes are written to
+        :return:        The store
+        """
+        store = cls(Calendar(), backend)
+        for record in records:
+            store._index(record)
+        return store
+
+    def __len__(self) -> int:
+        return len(self._by_uid)
+
+    def __contains__(self, uid: str) -> bool:
+        return uid in self._by_uid
+
+    def __iter__(self) -> Iterator[BirthdayRecord]:
+        return iter(self._by_uid.values())
+
+    def uids(self) -> List[str]:
+        """ Return the uids of all birthday events.
+        :return:    A list of uids
+        """
+        return list(self._by_uid)
+
+    def get(self, uid: str) -> Optional[BirthdayRecord]:
+        """ Return the birthday event of a uid.
+        :param uid: uid to get the birthday event for
+        :return:    The birthday event, or None if the uid has no event
+        """
+        return self._by_uid.get(uid)
+
+    def get_events_on(self, month: int, day: int) -> List[BirthdayRecord]:
+        """ Return the birthday events on a day of the year.
+        :param month:   Month of the birthdays
+        :param day:     Day of the birthdays
+        :return:        A list of birthday events
+        """
+        return list(self._by_date.get((month, day), {}).values())
+
+    def add(self, event: Union[BirthdayRecord, Event]) -> None:
+        """ Add a birthday, replacing any birthday with the same uid.
+        :param event:   Birthday record, or ics Event to store as one
+        :return:        None
+        """
+        if isinstance(event, Event):
+            event = BirthdayRecord.from_event(event)
+        self._remove(event.uid)
+        self._index(event)
+        if self.backend is not None:
+            self.backend.save(event)
+
+    def remove(self, uid: str) -> Optional[BirthdayRecord]:
+        """ Remove the birthday event of a uid.
+        :param uid: uid to remove the birthday event for
+        :return:    The removed event, or None if the uid has no event
+        """
+        event = self._remove(uid)
+        if event is not None and self.backend is not None:
+            self.backend.delete(uid)
+        return event
+
+    def set_begin(self, event: BirthdayRecord, begin: Arrow) -> None:
+        """ Move a birthday to a new date.
+        :param event:   Birthday record in the store
+        :param begin:   New birthday date
+        :return:        None
+        """
+        self._unindex_date(event)
+        event.begin = begin
+        self._by_date.setdefault(_date_key(event), {})[event.uid] = event
+        if self.backend is not None:
+            self.backend.save(event)
+
+    def set_description(self, event: BirthdayRecord,
+                        message: Optional[str]) -> None:
+        """ Schedule a birthday message.
+        :param event:   Birthday record in the store
+        :param message: Birthday message, or None to unschedule it
+        :return:        None
+        """
+        event.description = message
+        if self.backend is not None:
+            self.backend.save(event)
+
+    def record_sent(self, event: BirthdayRecord, sent_at: datetime) -> None:
+        """ Record that the scheduled message of a birthday has been sent.
+        :param event:   Birthday record in the store
+        :param sent_at: Time the message was sent
+        :return:        None
+        """
+        if self.backend is not None:
+            self.backend.record_sent(event.uid, event.description, sent_at)
+
+    def commit(self) -> None:
+        """ Make the changes since the last commit durable.
+        :return:    None
+        """
+        if self.backend is not None:
+            self.backend.commit()
+
+    def close(self) -> None:
+        """ Commit pending changes and close the backend.
+        :return:    None
+        """
+        if self.backend is not None:
+            self.backend.close()
+
+    def to_calendar(self) -> Calendar:
+        """ Materialize an ics Calendar with an event per birthday.
+        :return:    Birthday calendar
+        """
+        cal = copy.copy(self.calendar)
+        cal.events = {event.to_event() for event in self}
+        return cal
+
+    def iter_ics(self) -> Iterator[str]:
+        """ Yield the lines of the ics file of the birthday calendar,
+        materializing one event at a time.
+        :return:    An iterator of ics lines
+        """
+        return iter_calendar_ics(self.calendar, (event.to_event().serialize()
+                                                 for event in self))
+
+    def _remove(self, uid: str) -> Optional[BirthdayRecord]:
+        event = self._by_uid.pop(uid, None)
+        if event is not None:
+            self._unindex_date(event)
+        return event
+
+    def _index(self, event: BirthdayRecord) -> None:
+        self._by_uid[event.uid] = event
+        self._by_date.setdefault(_date_key(event), {})[event.uid] = event
+
+    def _unindex_date(self, event: BirthdayRecord) -> None:
+        key = _date_key(event)
+        events_on_date = self._by_date.get(key)
+        if events_on_date is not None:
+            events_on_date.pop(event.uid, None)
+            if not events_on_date:
+                del self._by_date[key]
+
+
+def _date_key(event: BirthdayRecord) -> Tuple[int, int]:
+    """ Return the (month, day) of a birthday record. """
+    return event.month, event.day
@@ -6,3 +6,10 @@ download_date = './config/download_date.txt'
 funny_birthday_wish_path = './docs/funny_birthday_wish_template.txt'
 serious_birthday_wish_path = './docs/serious_birthday_wish_template.txt'
 cookies_path = './config/cookies.txt'
+friends_snapshot_path = './config/friends.json'
+database_path = './config/birthdays.db'
+calendar_backend = 'sqlite'  # 'sqlite' or 'journal', see open_birthday_backend
+journal_path = './config/birthdays.journal'
+journal_snapshot_path = './config/birthdays_snapshot.ics'
+log_path = './logs/genie.log'
+warm_start_path = './config/warm_start.bin'
@@ -1,15 +1,30 @@
-from datetime import datetime, timedelta
+from datetime import datetime
 from arrow import Arrow
 from fbchat import Client
 from fbchat.models import *
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional, Union
+import configparser
+import logging
+import threading
+from functools import partial
 from ics import Calendar, Event
 from settings import *
 from dateutil.relativedelta import relativedelta
-from ics.grammar.parse import ContentLine
 import tools
 import exceptions
 from custom_client import CustomClient
+from session_provider import SessionProvider
+from calendar_store import BirthdayRecord, CalendarStore
+from birthday_db import BirthdayDatabase
+from lazy_ics import LazyCalendar
+from calendar_journal import CalendarJournal
+from friend_directory import Friend, FriendDirectory
+from warm_start import WarmStartSnapshot, source_digest
+from startup import StartupOrchestrator
+from calendar_diff import CalendarChanges, diff_calendars, apply_changes
+from fb2cal.src.ics_writer import write_calendar_ics
+
+logger = logging.getLogger(__name__)
 
 
 class FBUser:
@@ -19,31 +34,136 @@ class FBUser:
     """
     _username: str
     _password: str
-    birthday_calendar: Calendar
+    birthday_store: CalendarStore
+    friend_directory: FriendDirectory
     client: CustomClient
 
-    def __init__(self, username: str, password: str, cal: Calendar) -> None:
+    def __init__(self, username: str, password: str,
+                 cal: Union[Calendar, CalendarStore],
+                 session_cookies: Dict = None,
+                 fb2cal_config: configparser.ConfigParser = None,
+                 defer_login: bool = False,
+                 client: CustomClient = None,
+                 session_provider: SessionProvider = None) -> None:
         """ Initialize a new Facebook user with the username and
         password stored in the account_details file.
-        :param username: Facebook username
-        :param password: Facebook password
-        :param cal:      Has attributes events (a set of ics.Event). Important
-                         attributes of an Event include name, uid (facebook
-                         user id), begin (birthday, arrow format), and
-                         description (contains birthday message, str).
-        :return          None
+        :param username:        Facebook username
+        :param password:        Facebook password
+        :param cal:             Has attributes events (a set of ics.Event).
+                                Important attributes of an Event include name,
+                                uid (facebook user id), begin (birthday, arrow
+                                format), and description (contains birthday
+                                message, str). Its events are moved into
+                                compact birthday records. A CalendarStore,
+                                e.g. one loaded from the birthday database,
+                                is used as is
+        :param session_cookies: Session cookies shared with fb2cal. If None,
+                                cookies are read from cookies.txt
+        :param fb2cal_config:   In-memory fb2cal configuration. If None, it is
+                                read from fb2cal config.ini
+        :param defer_login:     If True, do not log in yet, see
+                                start_background_refresh
+        :param client:          fbchat client that is already logged in, see
+                                login_client
+        :param session_provider: Shares the session with fb2cal. It is given
+                                the cookies of the fbchat session after each
+                                login
+        :return                 None
         """
         self._username = username
         self._password = password
-        self.birthday_calendar = cal
-        self.client = _login(self)
+        self.birthday_store = cal if isinstance(cal, CalendarStore) \
+            else CalendarStore(cal)
+        self._fb2cal_config = fb2cal_config or \
+            tools.read_fb2cal_config(username, password)
+        self._session_provider = session_provider
+        # the birthday store is shared with the background refresh
+        self._store_lock = threading.RLock()
+        self._logged_in = threading.Event()
+        self._refresh_thread = None
+        self._refresh_error = None
+        self.client = None
+        self.friend_directory = FriendDirectory(
+            self._fetch_friend_dict,
+            snapshot_path=config.friends_snapshot_path)
+        if client is not None:
+            self._log_in(client=client)
+        elif not defer_login:
+            self._log_in(session_cookies)
+
+    def _log_in(self, session_cookies: Optional[Dict] = None,
+                client: CustomClient = None) -> None:
+        """ Log in with fbchat, unless a logged in client is given, and save
+        the session cookies. """
+        self.client = client if client is not None \
+            else _login(self, session_cookies)
         # save session cookies
         _save_session_cookies(self)
+        self._logged_in.set()
+
+    def start_background_refresh(self,
+                                 get_session_cookies: Callable[[], Dict]) \
+            -> None:
+        """ Log in, update the birthday calendar and refetch the friends list
+        in a background thread, so that a warm start does not wait for the
+        network. Methods that need the fbchat client wait for the login.
+        Failures are logged rather than printed over the menu, see
+        refresh_error.
+        :param get_session_cookies: Returns the session cookies to log in with
+        :return:                    None
+        """
+        def refresh() -> None:
+            try:
+                self._log_in(get_session_cookies())
+                self.update_birthday_calendar()
+                self.friend_directory.invalidate()
+                self.friend_directory.get_friends()
+            except Exception as e:
+                self._refresh_error = e
+                logger.exception("Background refresh failed")
+            finally:
+                self._logged_in.set()
+
+        self._refresh_thread = threading.Thread(target=refresh,
+                                                name='background-refresh',
+                                                daemon=True)
+        self._refresh_thread.start()
+
+    def wait_for_refresh(self) -> None:
+        """ Wait for the background refresh, if any, to finish.
+        :return:    None
+        """
+        if self._refresh_thread is not None:
+            self._refresh_thread.join()
+
+    @property
+    def birthday_calendar(self) -> Calendar:
+        """Materialize the birthday calendar from the birthday store.
+        :return:    Birthday calendar
+        """
+        return self.birthday_store.to_calendar()
+
+    @property
+    def refresh_error(self) -> Optional[Exception]:
+        """The error the background refresh failed with, if any."""
+        return self._refresh_error
+
+    def is_logged_in(self) -> bool:
+        """Return whether the fbchat client is logged in, waiting for a
+        background login.
+        :return:    False if the background login failed
+        """
+        self._logged_in.wait()
+        return self.client is not None
 
     def get_client(self) -> Client:
-        """Return client object.
+        """Return client object, waiting for a background login.
+        If the background login failed, its error is raised.
         :return Client object from the fbchat module
         """
+        self._logged_in.wait()
+        if self.client is None:
+            raise self._refresh_error
         return self.client
 
     def get_name_by_uid(self, uid: str) -> str:
@@ -61,14 +181,22 @@ class FBUser:
 
     def get_friend_dict(self) -> Dict:
         """ Gets a dictionary of friends mapping from their uid to their name.
+        The friends list is cached by the friend directory and only fetched
+        again after it expires or is invalidated.
+        :return:    A dictionary mapping from uid to name, url, and photo url
+        """
+        return self.friend_directory.get_friends()
+
+    def _fetch_friend_dict(self) -> Dict:
+        """ Fetches the friends list from Facebook/Messenger.
         :return:    A dictionary mapping from uid to name, url, and photo url
         """
         friend_dict = {}
-        user_list = [user for user in self.client.get_contact_list() if
+        user_list = [user for user in self.get_client().get_contact_list() if
                      user.is_friend]
 
         for user in user_list:
-            friend_dict[user.uid] = [user.name, user.url, user.photo]
+            friend_dict[user.uid] = Friend(user.name, user.url, user.photo)
         return friend_dict
 
     def send_message(self, uid: str, message: str) -> None:
@@ -77,11 +205,11 @@ class FBUser:
         :param message: Message to send
         :return:        None
         """
-        self.client.send(Message(text=message),
+        self.get_client().send(Message(text=message),
                          thread_id=uid,
                          thread_type=ThreadType.USER)
 
-    def send_scheduled_message(self, event: Event) -> None:
+    def send_scheduled_message(self, event: BirthdayRecord) -> None:
         """ Send a scheduled birthday message and update the birthday's date
         to the next year's birthday.
         :param event:   Birthday event that contains information regarding uid
@@ -89,7 +217,10 @@ class FBUser:
         :return:        None
         """
         self.send_message(event.uid, event.description)
-        event.begin = event.begin.shift(years=1)
+        with self._store_lock:
+            self.birthday_store.record_sent(event, datetime.now())
+            self.birthday_store.set_begin(event, event.begin.shift(years=1))
+            self.birthday_store.commit()
         print(f"Message to {event.uid} has been sent.")
         print(f"Birthday date is updated to {event.begin}.")
 
@@ -97,11 +228,13 @@ class FBUser:
         """Checks and sends all scheduled birthday messages.
         :param today:   today's date
         """
-        for event in self.birthday_calendar.events:
+        with self._store_lock:
+            events = self.birthday_store.get_events_on(today.month, today.day)
+        for event in events:
             if event.description and today.date() == event.begin.date():
                 self.send_scheduled_message(event)
 
-    def update_birthday_calendar(self) -> None:
+    def update_birthday_calendar(self) -> Optional[CalendarChanges]:
         """ Updates the birthday calendar by checking for duplicated events and
         the adding the new events to the existing calendar. This method also
         deletes events for people who are not in the Facebook/Messenger
@@ -109,34 +242,40 @@ class FBUser:
         Regular updates of the birthday calendars ensures newly added friends'
         birthday information is added and if a friend's birthday this year
         (e.g., 2019-08-29) has passed, then that birthday event's begin
-        attribute is updated to a new year's date (e.g., 2020-08-29), with the
-        previously saved birthday message under attribute description removed
-        (set to None).
-        :return:    None
+        attribute is updated to a new year's date (e.g., 2020-08-29).
+        The friends list is fetched at most once.
+        :return:    The applied changes, or None if the calendar has already
+                    been downloaded today
+        """
+        # reuse the fbchat session for fb2cal instead of logging in again
+        return self.apply_birthday_calendar(tools.download_birthday_records(
+            self._fb2cal_config, self.get_client().getSession()))
+
+    def apply_birthday_calendar(self,
+                                new_records: Optional[List[BirthdayRecord]]) \
+            -> Optional[CalendarChanges]:
+        """ Updates the birthday calendar with downloaded birthday records,
+        see update_birthday_calendar. The download is marked as done once the
+        changes are committed.
+        :param new_records: The downloaded birthday records, or None if the
+                            calendar has already been downloaded today
+        :return:            The applied changes, or None if new_records is
+                            None
         """
-        tools.download_birthday_calendar()
-        new_cal = tools.parse_ics()
-        all_old_uids = [event.uid for event in self.birthday_calendar.events]
-        all_new_uids = [event.uid for event in new_cal.events]
-
-        # events in the new calendar but not in the original calendar:
-        for event in new_cal.events:
-            if event.uid in all_old_uids:
-                # if they have changed their birthdays or this year's birthday
-                # has already passed--update to next year's
-                updated_birthday = get_birthday_by_uid(event.uid, new_cal)
-                if event.begin != updated_birthday:
-                    event.begin = updated_birthday
-            else:
-                self.birthday_calendar.events.add(event)
-
-        # events in the original calendar but not in the new calendar
-        for event in self.birthday_calendar.events:
-            if event.uid not in all_new_uids:
-                # check if there is deleted friends and if they are still in
-                # the friends list
-                if event.uid not in self.get_friend_dict():
-                    self.birthday_calendar.events.remove(event)
+        # the calendar has already been downloaded today
+        if new_records is None:
+            return None
+
+        new_store = CalendarStore.from_records(new_records)
+        with self._store_lock:
+            changes = diff_calendars(self.birthday_store, new_store,
+                                     lambda: set(self.get_friend_dict()))
+            apply_changes(self.birthday_store, changes)
+            self.birthday_store.commit()
+        # the download is only used up once its changes are stored
+        tools.mark_downloaded()
+        print(f"Birthday calendar is updated: {changes}.")
+        return changes
 
     def add_friend_birthday(self, uid: str, birthday_date: datetime) -> None:
         """
@@ -152,68 +291,125 @@ class FBUser:
         except exceptions.FriendNotFoundException:
             print(f"UID {uid} is not in your friends list.")
             return
-        # create a birthday event
-        new_birthday_event = \
-            create_birthday_event(uid, name, birthday_date)
-        # add a new event to the birthdays calendar
-        self.birthday_calendar.events.add(new_birthday_event)
+        # add a new birthday to the birthdays calendar
+        with self._store_lock:
+            self.birthday_store.add(create_birthday_record(uid, name,
+                                                           birthday_date))
+            self.birthday_store.commit()
 
     def delete_birthday_by_uid(self, uid: str) -> None:
         """Delete a birthday event by uid."""
-        uid_exists = False
-        for event in self.birthday_calendar.events:
-            if event.uid == uid:
-                birthday_event = event
-                uid_exists = True
-        if uid_exists:
-            self.birthday_calendar.events.remove(birthday_event)
-
-    def save_calendar(self) -> None:
-        """ Save the updated birthday calendar to calendar_dir.
+        with self._store_lock:
+            self.birthday_store.remove(uid)
+            self.birthday_store.commit()
+
+    def save_calendar(self, path: str = config.calendar_dir) -> None:
+        """ Export the birthday calendar to an ics file, calendar_dir by
+        default.
+        """
+        with self._store_lock, open(path, 'w') as f:
+            write_calendar_ics(self.birthday_store.iter_ics(), f)
+
+    def import_calendar(self, path: str = config.calendar_dir) \
+            -> Optional[int]:
+        """ Import the birthdays of an ics file, calendar_dir by default,
+        replacing birthdays with the same uid.
+        :param path:    Path of the ics file
+        :return:        The number of imported birthdays, or None if the ics
+                        file cannot be read
         """
-        with open(config.calendar_dir, 'w') as f:
-            f.writelines(self.birthday_calendar)
+        try:
+            cal = LazyCalendar(path)
+        except OSError as e:
+            print(f"Cannot import {path}: {e.strerror}.")
+            return None
+        except ValueError as e:
+            print(f"Cannot import {path}: {e}.")
+            return None
+        with self._store_lock, cal:
+            for record in cal.iter_records():
+                self.birthday_store.add(record)
+            self.birthday_store.commit()
+            return len(cal)
 
     def schedule_birthday_message_for_uid(self, uid: str, message: str) -> None:
         """Schedules a birthday message for Facebook friend with the given uid.
         """
-        for event in self.birthday_calendar.events:
-            if event.uid == uid:
-                event.description = message
-                print("Message scheduled!")
-                return
-        raise NameError
+        with self._store_lock:
+            event = self.birthday_store.get(uid)
+            if event is None:
+                raise NameError
+            self.birthday_store.set_description(event, message)
+            self.birthday_store.commit()
+        print("Message scheduled!")
+
+    def close_store(self) -> None:
+        """ Commit pending birthday changes and close the birthday storage.
+        """
+        with self._store_lock:
+            self.birthday_store.close()
+
+    def save_warm_start(self, path: str = config.warm_start_path) -> None:
+        """ Save a warm start snapshot of the birthday store and the friends
+        list, keyed by the digest of the birthday storage. Call it after
+        close_store, so that the digest matches the files on the next start.
+        :param path:    Path of the snapshot file
+        :return:        None
+        """
+        backend = self.birthday_store.backend
+        if backend is None:
+            return
+        WarmStartSnapshot(path).save(source_digest(backend.source_paths()),
+                                     self.birthday_store,
+                                     self.friend_directory.get_cached())
 
     def logout(self) -> None:
         """ Logout from a Facebook account"""
-        self.client.logout()
+        self.get_client().logout()
         print("User is logged out")
 
 
 def _save_session_cookies(self) -> None:
     """
-    Get session cookies and save them into cookies.txt
+    Get session cookies, save them into cookies.txt and share them with
+    fb2cal through the session provider
     :param self:    FBUser
     :return:        None
     """
     new_cookies = self.client.getSession()
     tools.save_cookies(new_cookies)
+    if self._session_provider is not None:
+        self._session_provider.update_cookies(new_cookies)
 
 
-def _login(self) -> CustomClient:
+def _login(self, session_cookies: Dict = None) -> CustomClient:
     """ Helper method to login to a Facebook account using a username and
     password from account_details and, optionally, cookies.
-    Save session cookies.
-    If cookies.txt does not exit, raise exception."""
+    See login_client."""
+    return login_client(self._username, self._password, session_cookies)
+
+
+def login_client(username: str, password: str,
+                 session_cookies: Dict = None) -> CustomClient:
+    """ Login to a Facebook account with fbchat using a username and password
+    and, optionally, cookies.
+    Shared session cookies take precedence over cookies.txt.
+    If no shared session cookies are given and cookies.txt does not exit,
+    raise exception."""
+    if session_cookies:
+        client = CustomClient(username, password, max_tries=1,
+                              session_cookies=session_cookies)
+        print("fbchat client logged in with shared session cookies.")
+        return client
     if not tools.session_cookies_file_exists():
         raise exceptions.CookiesFileNotFoundException
     cookies = tools.read_cookies()
     if cookies:
-        client = CustomClient(self._username, self._password, max_tries=1,
+        client = CustomClient(username, password, max_tries=1,
                               session_cookies=cookies)
         print("fbchat client logged in with cookies.")
     else:
-        client = CustomClient(self._username, self._password, max_tries=1)
+        client = CustomClient(username, password, max_tries=1)
         print("fbchat client logged in without cookies.")
     return client
 
@@ -222,40 +418,45 @@ def get_birthday_by_uid(uid: str, birthday_calendar: Calendar) -> Arrow:
     """ Return the birthday of a specific uid, as an arrow object
     :param uid:                   uid to get birthday for
     :param birthday_calendar:     birthday calendar within which to search for
-                                  uid
+                                  uid, or a CalendarStore of it
     :return                       Arrow object representing the birthday
     """
+    if isinstance(birthday_calendar, CalendarStore):
+        event = birthday_calendar.get(uid)
+        return event.begin if event is not None else None
     for event in birthday_calendar.events:
         if event.uid == uid:
             return event.begin
 
 
-def create_birthday_event(uid: str, name: str,
-                          birthday_date: datetime) -> Event:
-    """ Create a birthday event with the provided parameters.
+def create_birthday_record(uid: str, name: str,
+                           birthday_date: datetime) -> BirthdayRecord:
+    """ Create a birthday record with the provided parameters.
     :param uid:             Friend's FB UID
     :param name:            Friend's FB name
     :param birthday_date:   Friend's birthday date
-    :return:                Birthday event
+    :return:                Birthday record
     """
-    # Initialize birthday_event to a new event
-    birthday_event = Event()
-    birthday_event.uid = uid
-    birthday_event.name = f"{name}'s Birthday"
     today = datetime.today()
     # Calculate the year as this year or next year based on if its past
     # current month or not
     year = today.year if birthday_date.month >= today.month else (
             today + relativedelta(years=1)).year
-    # Pad day, month with leading zeros to 2dp
-    month = '{:02d}'.format(birthday_date.month)
-    day = '{:02d}'.format(birthday_date.day)
-    birthday_event.begin = f'{year}-{month}-{day} 00:00:00'
-    birthday_event.make_all_day()
-    birthday_event.duration = timedelta(days=1)
-    birthday_event.extra.append(
-        ContentLine(name='RRULE', value='FREQ=YEARLY'))
-    return birthday_event
+    # Reject invalid dates, e.g. February 29 in a common year
+    datetime(year, birthday_date.month, birthday_date.day)
+    return BirthdayRecord(uid, f"{name}'s Birthday", year,
+                          birthday_date.month, birthday_date.day)
+
+
+def create_birthday_event(uid: str, name: str,
+                          birthday_date: datetime) -> Event:
+    """ Create a birthday event with the provided parameters.
+    :param uid:             Friend's FB UID
+    :param name:            Friend's FB name
+    :param birthday_date:   Friend's birthday date
+    :return:                Birthday event
+    """
+    return create_birthday_record(uid, name, birthday_date).to_event()
 
 
 def get_uid_by_name(name: str, friends: dict) -> List[str]:
@@ -275,9 +476,15 @@ def get_uid_by_name(name: str, friends: dict) -> List[str]:
 def set_up_fbuser() -> FBUser:
     """Helper method for creating and returning class instances.
         (1) Read username and password from account_details
-        (2) Copy account details to fb2cal config.ini
-        (3) Parse a birthdays calendar from the ics file
-        (4) Create and return an FB User
+        (2) Read fb2cal config.ini with the account details
+        (3) Log in to Facebook once, sharing the session between fb2cal and
+            fbchat
+        (4) Open the birthday storage, see open_birthday_backend
+        (5) If a warm start snapshot matches the storage, create an FB User
+            from it and log in and update the calendar in the background
+        (6) Otherwise, log in with fbchat, download the birthday calendar and
+            load the storage concurrently, then create an FB User and update
+            the birthday calendar
         :return: FBUser
     """
     # check if account_details file exist
@@ -287,37 +494,114 @@ def set_up_fbuser() -> FBUser:
     else:
         raise exceptions.AccountDetailsNotFoundException
     # check if fb2cal config.ini exists
-    # if exists, set fb_email and fb_pass
+    # if exists, read it and set fb_email and fb_pass in memory
     if tools.fb2cal_config_exists():
-        tools.set_fb2cal_config_fb_email_fb_pass(account_details[0],
+        fb2cal_config = tools.read_fb2cal_config(account_details[0],
                                                  account_details[1])
     else:
         raise exceptions.FB2CalConfigNotFoundException
-    # check if ics file exists
-    # if not, run fb2cal to create an ics file and download birthdays from FB
-    # into the ics file
-    if not tools.ics_file_exists():
-        tools.download_birthday_calendar()
-    # parse a Calendar from the ics file
-    cal = tools.parse_ics()
-    # create and return a new instance of FBUser
-    user = FBUser(account_details[0], account_details[1], cal)
-    # update birthday calendar
-    user.update_birthday_calendar()
+    # log in once and share the session between fb2cal and fbchat
+    session_provider = SessionProvider(account_details[0], account_details[1])
+    # birthdays are read from and written to the storage incrementally
+    backend = open_birthday_backend(fb2cal_config, session_provider)
+    # warm start: restore the birthdays and friends list from the snapshot
+    # and leave the login and the update to a background refresh
+    warm_start = WarmStartSnapshot(config.warm_start_path)
+    if warm_start.load(source_digest(backend.source_paths())):
+        user = FBUser(account_details[0], account_details[1],
+                      backend.load_store(warm_start.records),
+                      fb2cal_config=fb2cal_config, defer_login=True,
+                      session_provider=session_provider)
+        if warm_start.friends:
+            user.friend_directory.seed(warm_start.friends)
+        user.start_background_refresh(session_provider.get_cookies)
+        return user
+    # cold start: log in with fbchat, download the calendar with fb2cal and
+    # load the storage concurrently, joining only where data depends on it
+    with StartupOrchestrator() as startup:
+        cookies = startup.submit('session cookies',
+                                 session_provider.get_cookies)
+        client = startup.submit('fbchat login',
+                                partial(login_client, account_details[0],
+                                        account_details[1]), cookies)
+        new_records = startup.submit('calendar download',
+                                 partial(tools.download_birthday_records,
+                                         fb2cal_config), cookies)
+        store = startup.submit('storage load', backend.load_store)
+        # create a new instance of FBUser
+        user = FBUser(account_details[0], account_details[1], store.result(),
+                      fb2cal_config=fb2cal_config, client=client.result(),
+                      session_provider=session_provider)
+        # fetch the friends list while waiting for the download
+        friends = startup.submit('friends list', user.get_friend_dict)
+        # update birthday calendar
+        startup.run('calendar update', user.apply_birthday_calendar,
+                    new_records.result())
+        friends.result()
+    print(f"Started in {startup.report()}.")
     return user
 
 
+def open_birthday_backend(fb2cal_config: configparser.ConfigParser,
+                          session_provider: SessionProvider) \
+        -> Union[BirthdayDatabase, CalendarJournal]:
+    """Open the birthday storage selected by config.calendar_backend:
+        'sqlite':   the birthday database at database_path
+        'journal':  an ics snapshot at journal_snapshot_path plus a journal of
+                    changes at journal_path. The snapshot is kept apart from
+                    calendar_dir, which is only used to import and export
+    If the storage is empty, it is filled from the ics file if it exists, or
+    else with a calendar downloaded by fb2cal.
+    :param fb2cal_config:       The fb2cal configuration
+    :param session_provider:    Provides the session cookies for the download
+    :return:                    The storage, see its load_store
+    """
+    if config.calendar_backend == 'journal':
+        backend = CalendarJournal(config.journal_snapshot_path,
+                                  config.journal_path)
+    else:
+        backend = BirthdayDatabase(config.database_path)
+    if backend.is_empty():
+        if tools.ics_file_exists():
+            with LazyCalendar(config.calendar_dir) as cal:
+                backend.import_records(cal.iter_records())
+        else:
+            new_records = tools.download_birthday_records(
+                fb2cal_config, session_provider.get_cookies())
+            backend.import_records(new_records or [])
+            if new_records is not None:
+                tools.mark_downloaded()
+    return backend
+
+
 def save_cal_and_logout(fb_user: FBUser):
     """
-    (1) Send birthday messages scheduled for today
-    (2) Save calendar to the .ics file
-    (3) Logout from fbchat
+    (1) Wait for the background refresh and send birthday messages
+        scheduled for today, if the fbchat client is logged in
+    (2) Commit pending changes to the birthday storage, even if sending
+        failed
+    (3) Save a warm start snapshot
+    (4) Logout from fbchat
+    The ics file at calendar_dir is only written when the calendar is
+    exported.
     """
     today = datetime.today()
-    # Send scheduled birthday messages
-    fb_user.send_all_scheduled_birthday_messages(today)
-    # Save calendar to the .ics file
-    fb_user.save_calendar()
+    # Let a background refresh finish before sending and closing the storage
+    fb_user.wait_for_refresh()
+    if fb_user.refresh_error is not None:
+        print(f"Background refresh failed: {fb_user.refresh_error}")
+    try:
+        # Send scheduled birthday messages, which needs a logged in client
+        if fb_user.is_logged_in():
+            fb_user.send_all_scheduled_birthday_messages(today)
+        else:
+            print("Not logged in, scheduled birthday messages are not sent.")
+    finally:
+        # Commit pending changes to the birthday storage
+        fb_user.close_store()
+    # Save a warm start snapshot for the next start
+    fb_user.save_warm_start()
     # Logout from fbchat
-    fb_user.logout()
-    print("Logged out")
+    if fb_user.is_logged_in():
+        fb_user.logout()
+        print("Logged out")
@@ -0,0 +1,115 @@
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, NamedTuple, Optional
+
+
+class Friend(NamedTuple):
+    """
+    Facebook friend in the friends list, indexable like the [name, url,
+    photo url] lists it replaces but without their per-list overhead.
+    """
+    name: str
+    url: str
+    photo: str
+
+
+class FriendDirectory:
+    """
+    Caches the Facebook friends list, a dictionary mapping from uid to name,
+    url, and photo url, for ttl_seconds. Optionally keeps a snapshot on disk
+    so that a new session can start without fetching the list.
+    """
+    _fetch: Callable[[], Dict]
+    _ttl_seconds: float
+    _snapshot_path: Optional[str]
+    _friends: Optional[Dict]
+    _fetched_at: float
+
+    def __init__(self, fetch: Callable[[], Dict], ttl_seconds: float = 600,
+                 snapshot_path: str = None) -> None:
+        """ Initialize an empty friend directory.
+        :param fetch:           Fetches the friends list over the network
+        :param ttl_seconds:     Seconds a fetched friends list stays valid
+        :param snapshot_path:   Path of the on-disk snapshot. If None, no
+                                snapshot is read or written
+        :return                 None
+        """
+        self._fetch = fetch
+        self._ttl_seconds = ttl_seconds
+        self._snapshot_path = snapshot_path
+        self._friends = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        self.fetches = 0
+
+    def get_friends(self) -> Dict:
+        """ Return the friends list, fetching it if the cached one expired.
+        The returned dictionary is shared and must not be modified.
+        :return:    A dictionary mapping from uid to name, url, and photo url
+        """
+        with self._lock:
+            if self._friends is None:
+                self._load_snapshot()
+            if self._friends is None or \
+                    time.time() - self._fetched_at >= self._ttl_seconds:
+                self._friends = self._fetch()
+                self._fetched_at = time.time()
+                self.fetches += 1
+                self._save_snapshot()
+            return self._friends
+
+    def seed(self, friends: Dict) -> None:
+        """ Serve a friends list restored from elsewhere, e.g. a warm start
+        snapshot, for ttl_seconds from now.
+        :param friends: A dictionary mapping from uid to name, url, and photo
+                        url
+        :return:        None
+        """
+        with self._lock:
+            self._friends = friends
+            self._fetched_at = time.time()
+
+    def get_cached(self) -> Optional[Dict]:
+        """ Return the cached friends list without fetching it.
+        :return:    The friends list, or None if none has been loaded yet
+        """
+        with self._lock:
+            return self._friends
+
+    def invalidate(self) -> None:
+        """ Drop the cached friends list and its snapshot, so that the next
+        lookup fetches it again.
+        :return:    None
+        """
+        with self._lock:
+            self._friends = None
+            self._fetched_at = 0.0
+            if self._snapshot_path and os.path.exists(self._snapshot_path):
+                os.remove(self._snapshot_path)
+
+    def _load_snapshot(self) -> None:
+        """ Load the friends list from the snapshot if it has not expired. """
+        if not self._snapshot_path or not os.path.exists(self._snapshot_path):
+            return
+        try:
+            with open(self._snapshot_path, 'r', encoding='UTF-8') as f:
+                snapshot = json.load(f)
+            if time.time() - snapshot['fetched_at'] < self._ttl_seconds:
+                self._friends = {uid: Friend(*friend) for uid, friend
+                                 in snapshot['friends'].items()}
+                self._fetched_at = snapshot['fetched_at']
+        except (OSError, ValueError, KeyError, TypeError):
+            # an unreadable snapshot is refetched and overwritten
+            pass
+
+    def _save_snapshot(self) -> None:
+        """ Write the friends list to the snapshot atomically. """
+        if not self._snapshot_path:
+            return
+        tmp_path = f'{self._snapshot_path}.tmp'
+        with open(tmp_path, 'w', encoding='UTF-8') as f:
+            json.dump({'fetched_at': self._fetched_at,
+                       'friends': self._friends}, f)
+        os.replace(tmp_path, self._snapshot_path)
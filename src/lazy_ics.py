@@ -0,0 +1,149 @@
+import mmap
+import os
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+from ics import Event
+from ics.grammar.parse import string_to_container
+from calendar_store import BirthdayRecord
+
+BEGIN_EVENT = b'BEGIN:VEVENT'
+END_EVENT = b'END:VEVENT'
+# lines end in CRLF, but files written by fb2cal end them in a bare CR and
+# hand-edited files may use LF
+LINE_BREAK = rb'(?:\r\n|\r|\n)'
+# a line starting with a space or tab continues the previous line
+FOLD_PATTERN = re.compile(LINE_BREAK + rb'[ \t]')
+UID_PATTERN = re.compile(rb'[\r\n]UID(?:;[^:\r\n]*)?:'
+                         rb'([^\r\n]*(?:' + LINE_BREAK + rb'[ \t][^\r\n]*)*)')
+TEXT_ESCAPES = {'\\\\': '\\', '\\;': ';', '\\,': ',', '\\n': '\n',
+                '\\N': '\n'}
+ESCAPE_PATTERN = re.compile(r'\\[\\;,nN]')
+
+
+class LazyCalendar:
+    """
+    Read-only view of a birthday ics file. Opening it only scans the VEVENT
+    boundaries of a memory map of the file to index them by uid; events are
+    parsed when they are accessed.
+    """
+    path: str
+    _offsets: Dict[str, Tuple[int, int]]
+
+    def __init__(self, path: str) -> None:
+        """ Map an ics file and index its events by uid.
+        If several events share a uid, only the first one is kept.
+        If the file has events but none of them has a uid, raise ValueError.
+        :param path:    Path of the ics file
+        :return         None
+        """
+        self.path = path
+        self._offsets = {}
+        self._file = open(path, 'rb')
+        if os.fstat(self._file.fileno()).st_size == 0:
+            # an empty file cannot be mapped
+            self._map = b''
+        else:
+            self._map = mmap.mmap(self._file.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+        self._index()
+
+    def __enter__(self) -> 'LazyCalendar':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __contains__(self, uid: str) -> bool:
+        return uid in self._offsets
+
+    def uids(self) -> List[str]:
+        """ Return the uids of all events, in file order.
+        :return:    A list of uids
+        """
+        return list(self._offsets)
+
+    def get_event(self, uid: str) -> Optional[Event]:
+        """ Parse the ics Event of a uid. Time zones defined in the file are
+        not applied, birthdays are all day events.
+        :param uid: uid of the event
+        :return:    The event, or None if the file has no event with the uid
+        """
+        block = self._get_block(uid)
+        if block is None:
+            return None
+        container = string_to_container(block.decode('UTF-8'))[0]
+        return Event._from_container(container, tz={})
+
+    def get_record(self, uid: str) -> Optional[BirthdayRecord]:
+        """ Parse the birthday record of a uid without building an Event.
+        :param uid: uid of the event
+        :return:    The record, or None if the file has no event with the uid
+        """
+        block = self._get_block(uid)
+        return None if block is None else _parse_record(uid, block)
+
+    def iter_records(self) -> Iterator[BirthdayRecord]:
+        """ Parse the birthday records of all events, in file order.
+        :return:    An iterator of birthday records
+        """
+        for uid in self._offsets:
+            yield self.get_record(uid)
+
+    def close(self) -> None:
+        """ Unmap and close the ics file.
+        :return:    None
+        """
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def _index(self) -> None:
+        """ Record the offsets of each VEVENT block by uid. """
+        start = self._map.find(BEGIN_EVENT)
+        found_events = start != -1
+        while start != -1:
+            end = self._map.find(END_EVENT, start)
+            if end == -1:
+                break
+            end += len(END_EVENT)
+            match = UID_PATTERN.search(self._map, start, end)
+            if match:
+                uid = FOLD_PATTERN.sub(b'', match.group(1)).decode('UTF-8')
+                self._offsets.setdefault(uid, (start, end))
+            start = self._map.find(BEGIN_EVENT, end)
+        if found_events and not self._offsets:
+            self.close()
+            raise ValueError(f'{self.path} has events, but none of them '
+                             f'could be indexed by uid')
+
+    def _get_block(self, uid: str) -> Optional[bytes]:
+        offsets = self._offsets.get(uid)
+        if offsets is None:
+            return None
+        return self._map[offsets[0]:offsets[1]]
+
+
+def _parse_record(uid: str, block: bytes) -> BirthdayRecord:
+    """ Build a birthday record from the SUMMARY, DTSTART and DESCRIPTION of
+    a VEVENT block.
+    """
+    properties = {}
+    for line in FOLD_PATTERN.sub(b'', block).decode('UTF-8').splitlines():
+        name_and_params, _, value = line.partition(':')
+        name = name_and_params.split(';', 1)[0].upper()
+        properties.setdefault(name, value)
+    # DTSTART is a DATE (20201021) or a DATE-TIME (20201021T000000Z)
+    begin = properties['DTSTART']
+    summary = properties.get('SUMMARY')
+    description = properties.get('DESCRIPTION')
+    return BirthdayRecord(uid, summary and _unescape_text(summary),
+                          int(begin[:4]), int(begin[4:6]), int(begin[6:8]),
+                          description and _unescape_text(description))
+
+
+def _unescape_text(value: str) -> str:
+    """ Unescape a TEXT property value. """
+    return ESCAPE_PATTERN.sub(lambda match: TEXT_ESCAPES[match.group()], value)
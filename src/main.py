@@ -1,4 +1,5 @@
 from fb_user import set_up_fbuser, save_cal_and_logout
+from tools import set_up_logging
 from datetime import datetime
 from menu import *
 from switch import Switch
@@ -11,9 +12,11 @@ This file is the entry point for the program
 def main() -> None:
     """Create an instance of FBUser,
     present menu to this user and interact with her/him.
-    Send scheduled birthday messages and save the updated calendar on exit.
+    Send scheduled birthday messages and close the birthday database on
+    exit.
     :return: None
     """
+    set_up_logging()
     fb_user = set_up_fbuser()
     friends = fb_user.get_friend_dict()
     menu = Menu(friends)
@@ -29,6 +32,13 @@ def main() -> None:
                 friend_uid = menu.get_friend_uid(fb_user.get_friend_dict())
                 message = menu.get_birthday_message()
                 fb_user.schedule_birthday_message_for_uid(friend_uid, message)
+            if case("import"):
+                count = fb_user.import_calendar()
+                if count is not None:
+                    print(f"Imported {count} birthdays.")
+            if case("export"):
+                fb_user.save_calendar()
+                print("Birthday calendar exported.")
             if case("exit"):
                 save_cal_and_logout(fb_user)
                 break
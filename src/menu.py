@@ -2,7 +2,9 @@ from PyInquirer import style_from_dict, Token, prompt
 from PyInquirer import Validator, ValidationError
 from datetime import datetime
 from prompt_toolkit.document import Document
+from prompt_toolkit.completion import Completer, Completion
 from fb_user import *
+from name_index import NameIndex
 
 
 class DateValidator(Validator):
@@ -40,28 +42,51 @@ class StringValidator(Validator):
                 cursor_position=len(document.text))  # Move cursor to end
 
 
-def validate_name(name, friends: dict) -> bool:
+def validate_name(name, name_index: NameIndex) -> bool:
     """Validate names.
     :param name:             Name to validate
-    :param friends:          A dictionary of friends mapping from uid to name,
-                             url, and photo url.
+    :param name_index:       Index of the names of friends
     :returns:                True if the name exists
     :raises ValidationError: If name does not exist in friends or is an empty
     string
     """
-    try:
-        get_uid_by_name(name, friends)
-    except NameError:
-        raise ValidationError(
-            message="You don't have a friend with this name",
-            cursor_position=len(name))  # Move cursor to end
     if not name or name.strip() == '':
         raise ValidationError(
             message="Please enter a non-empty input.",
             cursor_position=len(name))  # Move cursor to end
+    if not name_index.find_exact(name):
+        suggestions = name_index.find_fuzzy(name, limit=3)
+        message = "You don't have a friend with this name"
+        if suggestions:
+            message += ". Did you mean " + " or ".join(suggestions) + "?"
+        raise ValidationError(
+            message=message,
+            cursor_position=len(name))  # Move cursor to end
     return True
 
 
+class FriendNameCompleter(Completer):
+    """FriendNameCompleter inherits from Completer and is used for
+    autocompleting friend names.
+    """
+
+    def __init__(self, name_index: NameIndex) -> None:
+        """Initialize a friend name completer.
+        :param name_index:  Index of the names of friends
+        """
+        self.name_index = name_index
+
+    def get_completions(self, document: Document, complete_event):
+        """Yield the friend names starting with the text before the cursor.
+        :param document:        Document to complete
+        :param complete_event:  Event that triggered the completion
+        """
+        text = document.text_before_cursor
+        if text.strip():
+            for name in self.name_index.find_prefix(text):
+                yield Completion(name, start_position=-len(text))
+
+
 class Menu:
     """
     This class contains attributes and methods related to displaying a menu
@@ -74,6 +99,8 @@ class Menu:
             'message': 'What would you like to do?',
             'choices': ["Edit a friend's birthday",
                         "Schedule/Update a Facebook birthday message",
+                        "Import birthdays from the .ics file",
+                        "Export birthdays to the .ics file",
                         "Exit"],
         }]
 
@@ -129,26 +156,16 @@ class Menu:
 
         print("🧞‍♀️ ‍Welcome to Genie!")
         self.friends = friends
-        friend_selection_choices = [uid + " " + self.friends[uid][1] for uid in
-                                    self.friends]
-        self.friend_selection_question = [
-            {
-                'type': 'list',
-                'name': 'friend_selection',
-                'message': 'There are multiple friends with the same name. '
-                           'Their user ids and urls are presented. Please '
-                           'select one.',
-                'choices': friend_selection_choices,
-                'filter': lambda val: val.split(" ")[0]
-            }]
-
+        self.name_index = NameIndex(friends)
+        self.name_completer = FriendNameCompleter(self.name_index)
         self.friend_name_question = [
             {
                 'type': 'input',
                 'name': 'friend_name',
                 'message': "Please enter your friend's first and last name "
                            "(e.g., Jane Doe)",
-                'validate': lambda text: validate_name(text, self.friends)
+                'validate': lambda text: validate_name(text, self.name_index),
+                'completer': self.name_completer
             }]
 
     def update_friends(self, friends: dict) -> None:
@@ -158,6 +175,8 @@ class Menu:
         :return:            None
         """
         self.friends = friends
+        self.name_index = NameIndex(friends)
+        self.name_completer.name_index = self.name_index
 
     def get_main_menu_choice(self) -> str:
         """
@@ -169,6 +188,10 @@ class Menu:
             return "edit"
         elif answer == self.main_menu_question[0]['choices'][1]:
             return "schedule"
+        elif answer == self.main_menu_question[0]['choices'][2]:
+            return "import"
+        elif answer == self.main_menu_question[0]['choices'][3]:
+            return "export"
         else:
             return "exit"
 
@@ -179,12 +202,23 @@ class Menu:
         return prompt(self.friend_name_question,
                       style=self.style)['friend_name']
 
-    def get_friend_selection(self) -> str:
-        """Print a list of friend with the same name to select from and get
+    def get_friend_selection(self, uids: List[str]) -> str:
+        """Print a list of friends with the same name to select from and get
         user's response.
-        :return:    User's friend name
+        :param uids:    uids of the friends with the same name
+        :return:        User's selected friend uid
         """
-        return prompt(self.friend_selection_question,
+        friend_selection_question = [
+            {
+                'type': 'list',
+                'name': 'friend_selection',
+                'message': 'There are multiple friends with the same name. '
+                           'Their user ids and urls are presented. Please '
+                           'select one.',
+                'choices': [uid + " " + self.friends[uid][1] for uid in uids],
+                'filter': lambda val: val.split(" ")[0]
+            }]
+        return prompt(friend_selection_question,
                       style=self.style)['friend_selection']
 
     def get_friend_uid(self, friends) -> str:
@@ -197,15 +231,15 @@ class Menu:
                             url, and photo url.
         :return:            Facebook friend's uid
         """
-        try:
-            friend_name = self.get_friend_name()
-            friend_uids = get_uid_by_name(friend_name, friends)
-            if len(friend_uids) > 1:
-                return self.get_friend_selection()
-            else:
-                return friend_uids[0]
-        except NameError:
-            print(f"Friend not found.")
+        if friends is not self.friends:
+            self.update_friends(friends)
+        friend_name = self.get_friend_name()
+        friend_uids = self.name_index.find_exact(friend_name)
+        if len(friend_uids) > 1:
+            return self.get_friend_selection(friend_uids)
+        elif friend_uids:
+            return friend_uids[0]
+        print(f"Friend not found.")
 
     def get_friend_birthday(self) -> str:
         """Print the friend birthday question and get user's response.
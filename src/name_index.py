@@ -0,0 +1,102 @@
+import unicodedata
+from bisect import bisect_left
+from typing import Dict, List
+
+
+def normalize_name(name: str) -> str:
+    """ Normalize a name for case and accent insensitive comparison, e.g.
+    ' Zoë  Doe' becomes 'zoe doe'.
+    :param name:    Name to normalize
+    :return:        Normalized name
+    """
+    decomposed = unicodedata.normalize('NFKD', name)
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(stripped.casefold().split())
+
+
+def bounded_edit_distance(a: str, b: str, max_distance: int) -> int:
+    """ Levenshtein distance between two strings, giving up as soon as it
+    exceeds max_distance.
+    :param a:               First string
+    :param b:               Second string
+    :param max_distance:    Largest distance of interest
+    :return:                The distance, or max_distance + 1 if it is larger
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (char_a != char_b)))
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return min(previous[-1], max_distance + 1)
+
+
+class NameIndex:
+    """
+    Index of friend names supporting case and accent insensitive exact,
+    prefix and fuzzy lookups.
+    """
+    _uids_by_name: Dict[str, List[str]]
+    _display_names: Dict[str, str]
+    _sorted_names: List[str]
+
+    def __init__(self, friends: Dict) -> None:
+        """ Index the names of a friend dictionary.
+        :param friends: A dictionary mapping from uid to name, url, and photo
+                        url
+        :return         None
+        """
+        self._uids_by_name = {}
+        self._display_names = {}
+        for uid, friend in friends.items():
+            key = normalize_name(friend[0])
+            self._uids_by_name.setdefault(key, []).append(uid)
+            self._display_names.setdefault(key, friend[0])
+        self._sorted_names = sorted(self._uids_by_name)
+
+    def find_exact(self, name: str) -> List[str]:
+        """ Find the uids of friends with a name, ignoring case and accents.
+        :param name:    Name to find uids for
+        :return:        A list of uids, empty if no friend has the name
+        """
+        return list(self._uids_by_name.get(normalize_name(name), []))
+
+    def find_prefix(self, prefix: str, limit: int = 10) -> List[str]:
+        """ Find friend names starting with a prefix, ignoring case and
+        accents.
+        :param prefix:  Beginning of the names
+        :param limit:   Maximum number of names to return
+        :return:        A list of names in alphabetical order
+        """
+        key = normalize_name(prefix)
+        names = []
+        i = bisect_left(self._sorted_names, key)
+        while i < len(self._sorted_names) and len(names) < limit and \
+                self._sorted_names[i].startswith(key):
+            names.append(self._display_names[self._sorted_names[i]])
+            i += 1
+        return names
+
+    def find_fuzzy(self, name: str, max_distance: int = 2,
+                   limit: int = 5) -> List[str]:
+        """ Find friend names within max_distance edits of a name, ignoring
+        case and accents.
+        :param name:            Name to find similar names for
+        :param max_distance:    Maximum number of edits
+        :param limit:           Maximum number of names to return
+        :return:                A list of names, closest first
+        """
+        key = normalize_name(name)
+        matches = []
+        for candidate in self._sorted_names:
+            distance = bounded_edit_distance(key, candidate, max_distance)
+            if distance <= max_distance:
+                matches.append((distance, candidate))
+        matches.sort()
+        return [self._display_names[candidate]
+                for _, candidate in matches[:limit]]
@@ -0,0 +1,46 @@
+from typing import Dict, Optional
+import tools
+from fb2cal.src import fb2cal
+
+
+class SessionProvider:
+    """
+    Logs in to Facebook once and hands the same session cookies to both the
+    fb2cal scraper and the fbchat client.
+    """
+    _username: str
+    _password: str
+    _cookies: Optional[Dict]
+
+    def __init__(self, username: str, password: str) -> None:
+        """ Initialize a session provider for a Facebook account.
+        :param username: Facebook username
+        :param password: Facebook password
+        :return          None
+        """
+        self._username = username
+        self._password = password
+        self._cookies = None
+
+    def get_cookies(self) -> Dict:
+        """ Return the shared session cookies, logging in on first use.
+        Cookies saved in cookies.txt by a previous session are reused;
+        otherwise a single login is performed through fb2cal.
+        :return:    A dictionary mapping cookie names to values
+        """
+        if self._cookies is None:
+            if tools.session_cookies_file_exists():
+                self._cookies = tools.read_cookies()
+            if not self._cookies:
+                self._cookies = fb2cal.get_session_cookies(self._username,
+                                                           self._password)
+                print("Logged in to Facebook.")
+        return self._cookies
+
+    def update_cookies(self, cookies: Dict) -> None:
+        """ Replace the shared session cookies, e.g. after the fbchat client
+        refreshed them.
+        :param cookies: A dictionary mapping cookie names to values
+        :return:        None
+        """
+        self._cookies = cookies
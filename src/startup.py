@@ -0,0 +1,82 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+
+class StartupOrchestrator:
+    """
+    Runs independent startup stages concurrently in a thread pool. A stage
+    starts once the stages it depends on are done and receives their results,
+    and the time each stage takes is recorded.
+    """
+    timings: Dict[str, float]
+
+    def __init__(self, max_workers: int = 8) -> None:
+        """ Initialize an orchestrator.
+        :param max_workers: Maximum number of concurrent stages. Stages that
+                            wait for their dependencies hold a worker, so it
+                            should not be lower than the number of stages
+        :return             None
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='startup')
+        self._lock = threading.Lock()
+        self._started_at = time.perf_counter()
+        self.timings = {}
+
+    def __enter__(self) -> 'StartupOrchestrator':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
+
+    def submit(self, name: str, fn: Callable, *dependencies: Future) \
+            -> Future:
+        """ Run a stage in the thread pool.
+        :param name:            Name of the stage in the timings
+        :param fn:              Runs the stage, called with the results of the
+                                dependencies
+        :param dependencies:    Futures of the stages this stage depends on
+        :return:                The future of the stage's result
+        """
+        def stage() -> Any:
+            args = [dependency.result() for dependency in dependencies]
+            return self.run(name, fn, *args)
+
+        return self._executor.submit(stage)
+
+    def run(self, name: str, fn: Callable, *args: Any) -> Any:
+        """ Run a stage in the calling thread.
+        :param name:    Name of the stage in the timings
+        :param fn:      Runs the stage
+        :param args:    Arguments of fn
+        :return:        The stage's result
+        """
+        started_at = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.timings[name] = time.perf_counter() - started_at
+
+    def elapsed(self) -> float:
+        """ Return the seconds since the orchestrator was created.
+        :return:    Elapsed seconds
+        """
+        return time.perf_counter() - self._started_at
+
+    def report(self) -> str:
+        """ Describe the time taken by each stage and in total.
+        :return:    A one line report
+        """
+        with self._lock:
+            stages = ', '.join(f'{name} {seconds:.2f}s'
+                               for name, seconds in self.timings.items())
+        return f'{self.elapsed():.2f}s ({stages})'
+
+    def shutdown(self) -> None:
+        """ Wait for running stages and release the thread pool.
+        :return:    None
+        """
+        self._executor.shutdown(wait=True)
@@ -6,3 +6,10 @@ download_date = './config/test/download_date.txt'
 funny_birthday_wish_path = './docs/funny_birthday_wish_template.txt'
 serious_birthday_wish_path = './docs/serious_birthday_wish_template.txt'
 cookies_path = './config/test/cookies.txt'
+friends_snapshot_path = './config/test/friends.json'
+database_path = './config/test/birthdays.db'
+calendar_backend = 'sqlite'
+journal_path = './config/test/birthdays.journal'
+journal_snapshot_path = './config/test/birthdays_snapshot.ics'
+log_path = './logs/test/genie.log'
+warm_start_path = './config/test/warm_start.bin'
@@ -0,0 +1,67 @@
+from googleapiclient.errors import HttpError
+from httplib2 import Response
+
+
+class FakeRequest:
+    """
+    Mimics a googleapiclient HttpRequest, running the call on execute().
+    """
+
+    def __init__(self, call) -> None:
+        self._call = call
+
+    def execute(self) -> dict:
+        return self._call()
+
+
+class FakeDriveService:
+    """
+    Local stand-in for the Google Drive v3 service used by fb2cal. Stores
+    uploaded files in memory and counts the calls made to it.
+    """
+
+    def __init__(self) -> None:
+        self.files_by_id = {}
+        self.calls = {'create': 0, 'update': 0, 'permissions': 0}
+        self.resumable_uploads = 0
+        self._next_id = 1
+
+    def files(self) -> 'FakeDriveService':
+        return self
+
+    def permissions(self) -> 'FakePermissions':
+        return FakePermissions(self)
+
+    def create(self, body: dict, media_body) -> FakeRequest:
+        def call():
+            self.calls['create'] += 1
+            file_id = f'file{self._next_id}'
+            self._next_id += 1
+            self.files_by_id[file_id] = self._read(media_body)
+            return {'id': file_id, 'name': body['name']}
+        return FakeRequest(call)
+
+    def update(self, fileId: str, body: dict, media_body) -> FakeRequest:
+        def call():
+            self.calls['update'] += 1
+            if fileId not in self.files_by_id:
+                raise HttpError(Response({'status': 404}), b'File not found')
+            self.files_by_id[fileId] = self._read(media_body)
+            return {'id': fileId, 'name': body['name']}
+        return FakeRequest(call)
+
+    def _read(self, media_body) -> bytes:
+        if media_body.resumable():
+            self.resumable_uploads += 1
+        return media_body.getbytes(0, media_body.size())
+
+
+class FakePermissions:
+    def __init__(self, service: FakeDriveService) -> None:
+        self._service = service
+
+    def create(self, fileId: str, body: dict) -> FakeRequest:
+        def call():
+            self._service.calls['permissions'] += 1
+            return {'id': 'anyoneWithLink'}
+        return FakeRequest(call)
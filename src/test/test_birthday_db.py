@@ -0,0 +1,77 @@
+import os
+import arrow
+import pytest
+from datetime import datetime
+from ics import Calendar
+from birthday_db import BirthdayDatabase
+from fb_user import create_birthday_event, create_birthday_record
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    cal = Calendar()
+    cal.events.add(create_birthday_event('1', 'Jane Doe',
+                                         arrow.get('2020-10-21')))
+    cal.events.add(create_birthday_event('2', 'John Doe',
+                                         arrow.get('2020-10-21')))
+    cal.events.add(create_birthday_event('3', 'Natalia Moran',
+                                         arrow.get('2020-03-15')))
+    path = os.path.join(str(tmp_path), 'birthdays.db')
+    database = BirthdayDatabase(path)
+    database.import_calendar(cal)
+    database.close()
+    return path
+
+
+def test_import_and_load(db_path):
+    # Act
+    database = BirthdayDatabase(db_path)
+    store = database.load_store()
+
+    # Assert
+    assert not database.is_empty()
+    assert sorted(store.uids()) == ['1', '2', '3']
+    assert store.get('3').name == "Natalia Moran's Birthday"
+    assert sorted(record.uid for record in
+                  database.get_birthdays_on(10, 21)) == ['1', '2']
+
+
+def test_store_writes_changes_through(db_path):
+    # Arrange
+    database = BirthdayDatabase(db_path)
+    store = database.load_store()
+
+    # Act
+    store.set_description(store.get('1'), 'Happy birthday!')
+    store.set_begin(store.get('3'), arrow.get('2021-03-16'))
+    store.add(create_birthday_record('4', 'Zoe Smith',
+                                     arrow.get('2020-01-05')))
+    store.remove('2')
+    store.close()
+    reloaded = BirthdayDatabase(db_path).load_store()
+
+    # Assert
+    assert sorted(reloaded.uids()) == ['1', '3', '4']
+    assert reloaded.get('1').description == 'Happy birthday!'
+    assert (reloaded.get('3').month, reloaded.get('3').day) == (3, 16)
+    assert reloaded.get('4').name == "Zoe Smith's Birthday"
+
+
+def test_send_history_and_unscheduling(db_path):
+    # Arrange
+    database = BirthdayDatabase(db_path)
+    store = database.load_store()
+    event = store.get('1')
+    sent_at = datetime(2020, 10, 21, 9, 30)
+
+    # Act
+    store.set_description(event, 'Happy birthday!')
+    store.record_sent(event, sent_at)
+    store.set_description(event, None)
+    store.commit()
+
+    # Assert
+    assert database.get_send_history('1') == [('Happy birthday!', sent_at)]
+    assert database.get_send_history('2') == []
+    assert BirthdayDatabase(db_path).load_store().get('1').description \
+        is None
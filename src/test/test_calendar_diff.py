@@ -0,0 +1,53 @@
+import arrow
+from ics import Calendar
+from calendar_store import CalendarStore
+from calendar_diff import diff_calendars, apply_changes
+from fb_user import create_birthday_event
+
+
+def make_store(birthdays):
+    cal = Calendar()
+    for uid, date in birthdays:
+        cal.events.add(create_birthday_event(uid, f'Friend {uid}',
+                                             arrow.get(date)))
+    return CalendarStore(cal)
+
+
+def test_diff_applies_added_changed_and_removed_events():
+    # Arrange
+    store = make_store([('1', '2020-10-21'), ('2', '2020-11-02'),
+                        ('3', '2020-12-24'), ('4', '2020-01-05')])
+    new_store = make_store([('1', '2020-10-21'), ('2', '2020-11-03'),
+                            ('5', '2020-06-15')])
+    friend_fetches = []
+
+    def get_friend_uids():
+        friend_fetches.append(1)
+        return {'1', '2', '4', '5'}
+
+    # Act
+    changes = diff_calendars(store, new_store, get_friend_uids)
+    apply_changes(store, changes)
+
+    # Assert
+    assert changes.summary() == {'added': 1, 'changed': 1, 'removed': 1,
+                                 'kept': 1}
+    assert len(friend_fetches) == 1
+    assert sorted(store.uids()) == ['1', '2', '4', '5']
+    assert (store.get('2').begin.month, store.get('2').begin.day) == (11, 3)
+
+
+def test_diff_does_not_fetch_friends_without_missing_events():
+    # Arrange
+    store = make_store([('1', '2020-10-21')])
+    new_store = make_store([('1', '2020-10-21'), ('2', '2020-11-02')])
+
+    def get_friend_uids():
+        raise AssertionError('friend list fetched')
+
+    # Act
+    changes = diff_calendars(store, new_store, get_friend_uids)
+
+    # Assert
+    assert changes.summary() == {'added': 1, 'changed': 0, 'removed': 0,
+                                 'kept': 0}
@@ -0,0 +1,82 @@
+import os
+import arrow
+import pytest
+from ics import Calendar
+from calendar_journal import CalendarJournal
+from lazy_ics import LazyCalendar
+from fb_user import create_birthday_event, create_birthday_record
+
+
+@pytest.fixture
+def paths(tmp_path):
+    cal = Calendar()
+    cal.events.add(create_birthday_event('1', 'Jane Doe',
+                                         arrow.get('2020-10-21')))
+    cal.events.add(create_birthday_event('2', 'John Doe',
+                                         arrow.get('2020-11-02')))
+    snapshot_path = os.path.join(str(tmp_path), 'birthdays.ics')
+    journal_path = os.path.join(str(tmp_path), 'birthdays.journal')
+    CalendarJournal(snapshot_path, journal_path).import_calendar(cal)
+    return snapshot_path, journal_path
+
+
+def test_changes_are_journaled_and_replayed(paths):
+    # Arrange
+    snapshot_path, journal_path = paths
+    snapshot = open(snapshot_path).read()
+    store = CalendarJournal(*paths).load_store()
+
+    # Act
+    store.set_description(store.get('1'), 'Happy birthday!')
+    store.add(create_birthday_record('3', 'Zoe Smith',
+                                     arrow.get('2020-01-05')))
+    store.remove('2')
+    journaled_before_commit = os.path.exists(journal_path)
+    store.commit()
+    reloaded = CalendarJournal(*paths).load_store()
+
+    # Assert
+    assert not journaled_before_commit
+    assert len(open(journal_path).readlines()) == 3
+    assert open(snapshot_path).read() == snapshot
+    assert sorted(reloaded.uids()) == ['1', '3']
+    assert reloaded.get('1').description == 'Happy birthday!'
+
+
+def test_large_journal_is_compacted_into_the_snapshot(paths):
+    # Arrange
+    snapshot_path, journal_path = paths
+    store = CalendarJournal(*paths, compact_bytes=1).load_store()
+
+    # Act
+    store.remove('2')
+    store.commit()
+
+    # Assert
+    assert not os.path.exists(journal_path)
+    with LazyCalendar(snapshot_path) as cal:
+        assert cal.uids() == ['1']
+
+
+def test_torn_last_entry_is_dropped(paths):
+    # Arrange
+    snapshot_path, journal_path = paths
+    store = CalendarJournal(*paths).load_store()
+    store.remove('2')
+    store.commit()
+    with open(journal_path, 'a') as f:
+        f.write('["d","1')
+    torn_journal = open(journal_path, 'rb').read()
+
+    # Act
+    journal = CalendarJournal(*paths)
+    store = journal.load_store()
+    unchanged_by_load = open(journal_path, 'rb').read() == torn_journal
+    store.add(create_birthday_record('3', 'Zoe Smith',
+                                     arrow.get('2020-01-05')))
+    store.commit()
+
+    # Assert
+    assert unchanged_by_load
+    assert '["d","1' not in open(journal_path).read()
+    assert sorted(CalendarJournal(*paths).load_store().uids()) == ['1', '3']
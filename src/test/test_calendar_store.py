@@ -0,0 +1,72 @@
+import arrow
+import pytest
+from ics import Calendar
+from calendar_store import CalendarStore
+from fb_user import create_birthday_event
+
+
+@pytest.fixture
+def store():
+    cal = Calendar()
+    cal.events.add(create_birthday_event('1', 'Jane Doe',
+                                         arrow.get('2020-10-21')))
+    cal.events.add(create_birthday_event('2', 'John Doe',
+                                         arrow.get('2020-10-21')))
+    cal.events.add(create_birthday_event('3', 'Natalia Moran',
+                                         arrow.get('2020-03-15')))
+    return CalendarStore(cal)
+
+
+def test_lookups_by_uid_and_date(store):
+    # Act
+    events_on_date = store.get_events_on(10, 21)
+
+    # Assert
+    assert store.get('3').name == "Natalia Moran's Birthday"
+    assert store.get('4') is None
+    assert sorted(event.uid for event in events_on_date) == ['1', '2']
+
+
+def test_add_and_remove_keep_calendar_in_sync(store):
+    # Act
+    store.add(create_birthday_event('4', 'Zoe Smith', arrow.get('2020-01-05')))
+    removed = store.remove('1')
+
+    # Assert
+    assert removed.uid == '1'
+    assert store.remove('1') is None
+    assert sorted(event.uid for event in store.to_calendar().events) == \
+        ['2', '3', '4']
+    assert [event.uid for event in store.get_events_on(10, 21)] == ['2']
+    assert [event.uid for event in store.get_events_on(1, 5)] == ['4']
+
+
+def test_set_begin_moves_event_between_dates(store):
+    # Arrange
+    event = store.get('3')
+
+    # Act
+    store.set_begin(event, arrow.get('2021-03-16'))
+
+    # Assert
+    assert store.get_events_on(3, 15) == []
+    assert store.get_events_on(3, 16) == [event]
+    assert [e.begin for e in store.to_calendar().events if e.uid == '3'] == \
+        [arrow.get('2021-03-16')]
+
+
+def test_records_round_trip_through_ics(store):
+    # Arrange
+    store.get('1').description = 'Happy birthday!'
+
+    # Act
+    ics = ''.join(store.iter_ics())
+    parsed = CalendarStore(Calendar(ics))
+
+    # Assert
+    assert not store.calendar.events
+    assert sorted(parsed.uids()) == ['1', '2', '3']
+    assert parsed.get('1').description == 'Happy birthday!'
+    assert parsed.get('3').name == "Natalia Moran's Birthday"
+    assert parsed.get('3').begin == store.get('3').begin
+    assert 'RRULE:FREQ=YEARLY' in ics
@@ -0,0 +1,76 @@
+import configparser
+import logging
+import pytest
+from fb2cal.src import fb2cal
+from test.fake_drive_service import FakeDriveService
+
+logger = logging.getLogger('test')
+
+
+@pytest.fixture
+def config():
+    configuration = configparser.ConfigParser()
+    configuration.read_dict({'DRIVE': {'UPLOAD_TO_DRIVE': 'True',
+                                       'DRIVE_FILE_ID': '',
+                                       'ICS_FILE_NAME': 'birthdays.ics'}})
+    return configuration
+
+
+def test_first_upload_creates_file_once(config):
+    # Arrange
+    service = FakeDriveService()
+
+    # Act
+    uploaded = fb2cal.upload_to_drive(service, config, b'BEGIN:VCALENDAR',
+                                      logger)
+
+    # Assert
+    assert uploaded
+    assert service.calls == {'create': 1, 'update': 0, 'permissions': 1}
+    assert service.files_by_id[config['DRIVE']['DRIVE_FILE_ID']] == \
+        b'BEGIN:VCALENDAR'
+    assert service.resumable_uploads == 0
+
+
+def test_unchanged_payload_is_not_uploaded_again(config):
+    # Arrange
+    service = FakeDriveService()
+    fb2cal.upload_to_drive(service, config, b'BEGIN:VCALENDAR', logger)
+
+    # Act
+    unchanged = fb2cal.upload_to_drive(service, config, b'BEGIN:VCALENDAR',
+                                       logger)
+    changed = fb2cal.upload_to_drive(service, config, b'END:VCALENDAR',
+                                     logger)
+
+    # Assert
+    assert not unchanged
+    assert changed
+    assert service.calls == {'create': 1, 'update': 1, 'permissions': 1}
+
+
+def test_missing_file_is_recreated(config):
+    # Arrange
+    service = FakeDriveService()
+    config.set('DRIVE', 'DRIVE_FILE_ID', 'deleted')
+
+    # Act
+    uploaded = fb2cal.upload_to_drive(service, config, b'BEGIN:VCALENDAR',
+                                      logger)
+
+    # Assert
+    assert uploaded
+    assert service.calls == {'create': 1, 'update': 1, 'permissions': 1}
+    assert config['DRIVE']['DRIVE_FILE_ID'] == 'file1'
+
+
+def test_large_payload_uses_resumable_upload(config):
+    # Arrange
+    service = FakeDriveService()
+    config.set('DRIVE', 'RESUMABLE_UPLOAD_THRESHOLD', '4')
+
+    # Act
+    fb2cal.upload_to_drive(service, config, b'BEGIN:VCALENDAR', logger)
+
+    # Assert
+    assert service.resumable_uploads == 1
@@ -0,0 +1,161 @@
+import datetime
+import logging
+import pytest
+from fb2cal.src import fb2cal
+from fb2cal.src.month_cache import MonthCache
+
+logger = logging.getLogger('test')
+
+
+def birthday_card(vanity_name, tooltip_content, name):
+    return (f'<li class="_43q7"><a class="link" '
+            f'href="https://www.facebook.com/{vanity_name}" '
+            f'data-hovercard="/ajax/hovercard/user.php?id=1" '
+            f'data-tooltip-content="{tooltip_content}">'
+            f'<img class="_s0 img" src="https://scontent.xx.fbcdn.net/1.jpg" '
+            f'alt="{name}" aria-label="{name}" role="img" /></a></li>')
+
+
+@pytest.fixture
+def month_html():
+    cards = [
+        ('jane.doe', 'Jane Doe (10/21)', 'Jane Doe'),
+        ('profile.php?id=1104705831', 'Natalia Moran (10/22)',
+         'Natalia Moran'),
+        ('zoe.o', 'Zo&#xeb; O&#039;Neil (&#x200e;Monday)',
+         'Zo&#xeb; O&#039;Neil'),
+    ]
+    return '<ul>' + ''.join(birthday_card(*card) for card in cards) + '</ul>'
+
+
+def test_single_pass_engine_matches_regex_engine(month_html):
+    # Act
+    regex_cards = fb2cal.extract_birthday_cards_regex(month_html)
+    single_pass_cards = fb2cal.extract_birthday_cards_single_pass(month_html)
+
+    # Assert
+    assert len(regex_cards) == 3
+    assert single_pass_cards == regex_cards
+
+
+def test_single_pass_engine_keeps_raw_html_values(month_html):
+    # Act
+    cards = fb2cal.extract_birthday_cards_single_pass(month_html)
+
+    # Assert
+    assert cards[2] == ('zoe.o', 'Zo&#xeb; O&#039;Neil (&#x200e;Monday)',
+                        'Zo&#xeb; O&#039;Neil')
+
+
+def test_single_pass_engine_ignores_incomplete_trailing_card(month_html):
+    # Arrange
+    truncated_html = month_html + '<li class="_43q7"><a class="link" ' \
+                                  'href="https://www.facebook.com/cut.off"'
+
+    # Act
+    regex_cards = fb2cal.extract_birthday_cards_regex(truncated_html)
+    single_pass_cards = fb2cal.extract_birthday_cards_single_pass(
+        truncated_html)
+
+    # Assert
+    assert single_pass_cards == regex_cards
+    assert len(single_pass_cards) == 3
+
+
+def test_single_pass_engine_skips_malformed_card(month_html):
+    # Arrange
+    malformed_card = '<li class="_43q7"><a class="link" ' \
+                     'href="https://www.facebook.com/no.tooltip"></a></li>'
+    html = month_html.replace('<ul>', '<ul>' + malformed_card, 1)
+    valid_cards = fb2cal.extract_birthday_cards_regex(month_html)
+
+    # Act
+    cards = fb2cal.extract_birthday_cards_single_pass(html)
+
+    # Assert
+    assert cards == valid_cards
+
+
+@pytest.mark.parametrize('user_locale, tooltip_content, expected', [
+    ('en_US', 'Jane Doe (10/21)', (21, 10)),
+    ('en_GB', 'Jane Doe (21/10)', (21, 10)),
+    ('de_DE', 'Jane Doe (21.10.)', (21, 10)),
+    ('cs_CZ', 'Jane Doe (21. 10.)', (21, 10)),
+    ('hu_HU', 'Jane Doe (10. 21.)', (21, 10)),
+    ('en_US', 'Jane Doe (2/29)', (29, 2)),
+])
+def test_parse_birthday_day_month_dates(user_locale, tooltip_content,
+                                        expected):
+    # Act
+    day_month = fb2cal.parse_birthday_day_month(tooltip_content, 'Jane Doe',
+                                                user_locale, logger)
+
+    # Assert
+    assert day_month == expected
+
+
+def test_parse_birthday_day_month_day_names():
+    # Arrange
+    tomorrow = datetime.date.today() + datetime.timedelta(days=1)
+    day_name = tomorrow.strftime('%A')
+
+    # Act
+    day_month = fb2cal.parse_birthday_day_month(
+        f'Jane Doe (&#x200e;{day_name})', 'Jane Doe', 'en_US', logger)
+
+    # Assert
+    assert day_month == (tomorrow.day, tomorrow.month)
+
+
+def test_parse_birthday_day_month_rejects_invalid_dates():
+    # Act / Assert
+    with pytest.raises(SystemError):
+        fb2cal.parse_birthday_day_month('Jane Doe (2/30)', 'Jane Doe',
+                                        'en_US', logger)
+
+
+def test_month_cache_stores_months_while_streaming(monkeypatch):
+    # Arrange
+    epoch_timestamps = fb2cal.get_next_12_month_epoch_timestamps(logger)
+    month_keys = [fb2cal.get_month_key(epoch_timestamp)
+                  for epoch_timestamp in epoch_timestamps]
+
+    def parse(browser, epoch_timestamp, html, logger, card_engine):
+        month = epoch_timestamps.index(epoch_timestamp) + 1
+        yield fb2cal.Birthday(str(month), 'Jane Doe', 1, month)
+        yield fb2cal.Birthday(None, 'John Doe', 2, month, f'john.{month}')
+
+    def resolve(browser, birthday, logger, resolution_cache,
+                skip_unresolved):
+        # the vanity name of the second month cannot be resolved
+        if birthday.uid is None and birthday.vanity_name != 'john.2':
+            birthday.uid = birthday.vanity_name
+        return birthday if birthday.uid is not None else None
+
+    monkeypatch.setattr(fb2cal, 'iter_async_birthday_pages',
+                        lambda browser, epoch_timestamps, logger, workers:
+                        ((epoch_timestamp, '') for epoch_timestamp
+                         in epoch_timestamps))
+    monkeypatch.setattr(fb2cal, 'get_async_token', lambda *args: 'token')
+    monkeypatch.setattr(fb2cal, 'get_facebook_locale', lambda *args: 'en_US')
+    monkeypatch.setattr(fb2cal, 'get_birthday_card_html',
+                        lambda text, logger: text)
+    monkeypatch.setattr(fb2cal, 'parse_unresolved_birthdays', parse)
+    monkeypatch.setattr(fb2cal, 'resolve_birthday', resolve)
+    month_cache = MonthCache(None)
+
+    # Act
+    birthdays = fb2cal.iter_async_birthdays(None, logger,
+                                            month_cache=month_cache)
+    first_three = [next(birthdays) for _ in range(3)]
+    stored_while_streaming = month_cache.get_fresh(month_keys[0], 1)
+    rest = list(birthdays)
+
+    # Assert
+    assert [birthday.uid for birthday in first_three] == ['1', 'john.1', '2']
+    assert stored_while_streaming == [('1', 'Jane Doe', 1, 1),
+                                      ('john.1', 'John Doe', 2, 1)]
+    assert len(first_three) + len(rest) == 23
+    assert month_cache.get_fresh(month_keys[1], 1) is None
+    assert month_cache.get_fresh(month_keys[11], 1) == [
+        ('12', 'Jane Doe', 1, 12), ('john.12', 'John Doe', 2, 12)]
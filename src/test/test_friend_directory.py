@@ -0,0 +1,55 @@
+import os
+from friend_directory import Friend, FriendDirectory
+
+
+class FakeContacts:
+    def __init__(self):
+        self.calls = 0
+
+    def fetch(self):
+        self.calls += 1
+        return {'1104705831': Friend('Natalia Moran', 'url', 'photo')}
+
+
+def test_friends_are_cached_until_invalidated():
+    # Arrange
+    contacts = FakeContacts()
+    directory = FriendDirectory(contacts.fetch)
+
+    # Act
+    first = directory.get_friends()
+    second = directory.get_friends()
+    directory.invalidate()
+    directory.get_friends()
+
+    # Assert
+    assert first is second
+    assert contacts.calls == 2
+
+
+def test_expired_friends_are_fetched_again():
+    # Arrange
+    contacts = FakeContacts()
+    directory = FriendDirectory(contacts.fetch, ttl_seconds=0)
+
+    # Act
+    directory.get_friends()
+    directory.get_friends()
+
+    # Assert
+    assert contacts.calls == 2
+
+
+def test_snapshot_is_reused_by_a_new_directory(tmp_path):
+    # Arrange
+    snapshot_path = os.path.join(str(tmp_path), 'friends.json')
+    contacts = FakeContacts()
+    FriendDirectory(contacts.fetch, snapshot_path=snapshot_path).get_friends()
+
+    # Act
+    friends = FriendDirectory(contacts.fetch,
+                              snapshot_path=snapshot_path).get_friends()
+
+    # Assert
+    assert friends == {'1104705831': Friend('Natalia Moran', 'url', 'photo')}
+    assert contacts.calls == 1
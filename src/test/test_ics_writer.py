@@ -0,0 +1,86 @@
+import random
+import pytest
+from ics import Calendar, Event
+from fb2cal.src import fb2cal
+from fb2cal.src.ics_writer import iter_calendar_ics
+import tools
+from calendar_store import CalendarStore
+
+
+@pytest.fixture
+def birthdays():
+    random.seed(7)
+    birthdays = [fb2cal.Birthday(str(random.randrange(10 ** 15)),
+                                 f'Friend {i}', random.randint(1, 28),
+                                 random.randint(1, 12)) for i in range(500)]
+    birthdays.append(fb2cal.Birthday('100', 'Zoë O\'Neil, Jr; \\x', 28,
+                                     2))
+    # duplicate uid with the same and with a different name
+    birthdays.append(fb2cal.Birthday(birthdays[0].uid, birthdays[0].name,
+                                     birthdays[0].day, birthdays[0].month))
+    birthdays.append(fb2cal.Birthday(birthdays[1].uid, 'Renamed', 1, 1))
+    return birthdays
+
+
+def test_birthday_events_match_populated_calendar(birthdays):
+    # Arrange
+    c = fb2cal.populate_birthdays_calendar(birthdays)
+
+    # Act
+    events = fb2cal.get_birthday_events(birthdays)
+    lines = list(fb2cal.iter_birthday_events_ics(events))
+
+    # Assert
+    assert len(events) == len(c.events)
+    assert ''.join(lines) == c.serialize()
+    assert fb2cal.get_ics_str(lines) == fb2cal.get_ics_str(c.serialize_iter())
+
+
+def test_calendar_lines_match_ics_iteration():
+    # Arrange
+    c = Calendar(fb2cal.populate_birthdays_calendar(
+        [fb2cal.Birthday('1', 'Jane Doe', 21, 10),
+         fb2cal.Birthday('2', 'John Doe', 3, 2)]).serialize())
+    e = Event(name='Custom', begin='2020-01-01 10:00:00', uid='3',
+              description='Happy birthday,\nJane!')
+    c.events.add(e)
+
+    # Act
+    lines = list(iter_calendar_ics(c))
+
+    # Assert
+    assert lines == c.serialize_iter()
+
+
+def test_downloaded_records_match_populated_calendar(birthdays, monkeypatch,
+                                                     tmp_path):
+    # Arrange
+    download_date_path = tmp_path / 'download_date.txt'
+    download_date_path.write_text('')
+    monkeypatch.setattr(tools.config, 'download_date', str(download_date_path))
+    monkeypatch.setattr(tools.fb2cal, 'fetch_birthday_events',
+                        lambda config, session_cookies:
+                        fb2cal.get_birthday_events(birthdays))
+    expected = CalendarStore(fb2cal.populate_birthdays_calendar(birthdays))
+
+    # Act
+    records = tools.download_birthday_records(None)
+
+    # Assert
+    assert len(records) == len(expected)
+    for record in records:
+        expected_record = expected.get(record.uid)
+        assert (record.name, record.begin) == \
+            (expected_record.name, expected_record.begin)
+
+
+def test_birthday_events_compare_only_to_birthday_events():
+    # Arrange
+    event = fb2cal.BirthdayEvent(fb2cal.Birthday('1', 'Jane Doe', 21, 10),
+                                 2020)
+
+    # Act / Assert
+    assert event == fb2cal.BirthdayEvent(
+        fb2cal.Birthday('1', 'Jane Doe', 21, 10), 2020)
+    assert event != 'Jane Doe'
+    assert event not in [None, '1']
@@ -0,0 +1,103 @@
+import configparser
+import logging
+import os
+import arrow
+import pytest
+from ics import Calendar
+from calendar_store import CalendarStore
+from lazy_ics import LazyCalendar
+from fb_user import FBUser, create_birthday_event
+from fb2cal.src.fb2cal import save_ics_file
+
+
+def write_ics(tmp_path, text):
+    path = os.path.join(str(tmp_path), 'birthdays.ics')
+    with open(path, 'w') as f:
+        f.write(text)
+    return path
+
+
+def test_records_match_the_written_calendar(tmp_path):
+    # Arrange
+    cal = Calendar()
+    cal.events.add(create_birthday_event('1', 'Jane Doe',
+                                         arrow.get('2020-10-21')))
+    cal.events.add(create_birthday_event('3', 'Natalia Moran',
+                                         arrow.get('2020-03-15')))
+    store = CalendarStore(cal)
+    store.set_description(store.get('1'), 'Happy birthday, Jane;\nenjoy!')
+    path = write_ics(tmp_path, ''.join(store.iter_ics()))
+
+    # Act
+    with LazyCalendar(path) as lazy_cal:
+        uids = sorted(lazy_cal.uids())
+        records = {record.uid: record for record in lazy_cal.iter_records()}
+        event = lazy_cal.get_event('3')
+        missing = lazy_cal.get_record('2')
+
+    # Assert
+    assert uids == ['1', '3']
+    assert missing is None
+    for uid in uids:
+        assert records[uid].name == store.get(uid).name
+        assert records[uid].description == store.get(uid).description
+        assert records[uid].begin == store.get(uid).begin
+    assert event.name == "Natalia Moran's Birthday"
+    assert event.begin == store.get('3').begin
+
+
+def test_folded_lines_and_empty_files(tmp_path):
+    # Arrange
+    path = write_ics(tmp_path, 'BEGIN:VCALENDAR\r\nBEGIN:VEVENT\r\n'
+                               'DTSTART:20201021T000000Z\r\n'
+                               'SUMMARY:Jane Doe\'s \r\n Birthday\r\n'
+                               'UID:12\r\n 34\r\nEND:VEVENT\r\n'
+                               'END:VCALENDAR')
+
+    # Act
+    with LazyCalendar(path) as lazy_cal:
+        record = lazy_cal.get_record('1234')
+    with LazyCalendar(write_ics(tmp_path, '')) as empty_cal:
+        empty_count = len(empty_cal)
+
+    # Assert
+    assert record.name == "Jane Doe's Birthday"
+    assert (record.month, record.day) == (10, 21)
+    assert empty_count == 0
+
+
+def test_import_calendar_written_by_fb2cal(tmp_path):
+    # Arrange
+    cal = Calendar()
+    cal.events.add(create_birthday_event('1', 'Jane Doe',
+                                         arrow.get('2020-10-21')))
+    cal.events.add(create_birthday_event('3', 'Natalia Moran',
+                                         arrow.get('2020-03-15')))
+    path = os.path.join(str(tmp_path), 'birthdays.ics')
+    # fb2cal strips the LF of each CRLF, leaving bare CR line endings
+    save_ics_file(CalendarStore(cal).iter_ics(), path,
+                  logging.getLogger(__name__))
+    user = FBUser('username', 'password', Calendar(),
+                  fb2cal_config=configparser.ConfigParser(), defer_login=True)
+
+    # Act
+    count = user.import_calendar(path)
+
+    # Assert
+    assert b'\r\n' not in open(path, 'rb').read()
+    assert count == 2
+    assert user.birthday_store.get('3').name == "Natalia Moran's Birthday"
+    assert (user.birthday_store.get('1').month,
+            user.birthday_store.get('1').day) == (10, 21)
+
+
+def test_events_without_a_readable_uid_are_reported(tmp_path):
+    # Arrange
+    path = write_ics(tmp_path, 'BEGIN:VCALENDAR\r\nBEGIN:VEVENT\r\n'
+                               'DTSTART:20201021T000000Z\r\n'
+                               'SUMMARY:Jane Doe\'s Birthday\r\n'
+                               'END:VEVENT\r\nEND:VCALENDAR')
+
+    # Act / Assert
+    with pytest.raises(ValueError):
+        LazyCalendar(path)
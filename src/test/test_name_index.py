@@ -0,0 +1,57 @@
+import pytest
+from name_index import NameIndex, normalize_name, bounded_edit_distance
+
+
+@pytest.fixture
+def friends():
+    return {'1': ['Jane Doe', 'https://facebook.com/1', ''],
+            '2': ['John Smith', 'https://facebook.com/2', ''],
+            '3': ['jane doe', 'https://facebook.com/3', ''],
+            '4': ['Zoë Lefèvre', 'https://facebook.com/4', ''],
+            '5': ['Janet Jackson', 'https://facebook.com/5', '']}
+
+
+def test_normalize_name():
+    assert normalize_name('  Zoë   LEFÈVRE ') == 'zoe lefevre'
+
+
+def test_find_exact_ignores_case_and_accents(friends):
+    # Arrange
+    index = NameIndex(friends)
+
+    # Act / Assert
+    assert index.find_exact('zoe lefevre') == ['4']
+    assert sorted(index.find_exact('JANE DOE')) == ['1', '3']
+    assert index.find_exact('Jane') == []
+
+
+def test_find_prefix(friends):
+    # Arrange
+    index = NameIndex(friends)
+
+    # Act
+    names = index.find_prefix('jan')
+
+    # Assert
+    assert names == ['Jane Doe', 'Janet Jackson']
+    assert index.find_prefix('jan', limit=1) == ['Jane Doe']
+    assert index.find_prefix('x') == []
+
+
+def test_find_fuzzy_orders_by_distance(friends):
+    # Arrange
+    index = NameIndex(friends)
+
+    # Act
+    names = index.find_fuzzy('Jon Smth')
+
+    # Assert
+    assert names == ['John Smith']
+    assert index.find_fuzzy('Jane Do') == ['Jane Doe']
+    assert index.find_fuzzy('Someone Else') == []
+
+
+def test_bounded_edit_distance_gives_up_past_bound():
+    assert bounded_edit_distance('kitten', 'sitting', 3) == 3
+    assert bounded_edit_distance('kitten', 'sitting', 2) == 3
+    assert bounded_edit_distance('a', 'abcdef', 2) == 3
@@ -0,0 +1,53 @@
+import time
+from fb2cal.src.rate_governor import RateGovernor
+
+
+def test_rate_backs_off_and_recovers_additively():
+    # Arrange
+    governor = RateGovernor(10, min_rate=1, additive_increase=1,
+                            multiplicative_decrease=0.5)
+
+    # Act
+    governor.record('async_birthdays', 0.1, 0, True)
+    throttled_rate = governor.rate
+    governor.record('async_birthdays', 0.1, 0, True)
+    governor.record('async_birthdays', 0.1, 0, True)
+    governor.record('async_birthdays', 0.1, 0, True)
+    min_rate = governor.rate
+    governor.record('async_birthdays', 0.1, 0, False)
+
+    # Assert
+    assert throttled_rate == 5
+    assert min_rate == 1
+    assert governor.rate == 2
+
+
+def test_acquire_paces_requests_beyond_burst():
+    # Arrange
+    governor = RateGovernor(50, burst=2)
+
+    # Act
+    start = time.monotonic()
+    waits = [governor.acquire() for _ in range(6)]
+    elapsed = time.monotonic() - start
+
+    # Assert
+    assert waits[:2] == [0, 0]
+    assert elapsed >= 4 / 50 * 0.9
+
+
+def test_stats_are_kept_per_endpoint():
+    # Arrange
+    governor = RateGovernor(0)
+
+    # Act
+    governor.record('composer_query', 0.2, 0, False)
+    governor.record('composer_query', 0.4, 0, True)
+    governor.record('profile_page', 0.1, 0, False)
+
+    # Assert
+    assert governor.acquire() == 0
+    assert governor.stats['composer_query'].requests == 2
+    assert governor.stats['composer_query'].throttled == 1
+    assert governor.stats['composer_query'].max_latency == 0.4
+    assert governor.stats['profile_page'].requests == 1
@@ -0,0 +1,93 @@
+import os
+import logging
+import pytest
+from fb2cal.src import fb2cal
+from fb2cal.src.resolution_cache import ResolutionCache
+
+logger = logging.getLogger('test')
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return os.path.join(str(tmp_path), 'resolution_cache.json')
+
+
+def test_lookup_counts_hits_and_misses(cache_path):
+    # Arrange
+    cache = ResolutionCache(cache_path, 60, 60, 10)
+
+    # Act
+    miss = cache.lookup('jane.doe')
+    cache.store('jane.doe', '1104705831')
+    hit = cache.lookup('jane.doe')
+
+    # Assert
+    assert miss == (False, None)
+    assert hit == (True, '1104705831')
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_negative_results_expire_separately(cache_path):
+    # Arrange
+    cache = ResolutionCache(cache_path, 60, -1, 10)
+
+    # Act
+    cache.store('broken.profile', None)
+    cache.store('jane.doe', '1104705831')
+
+    # Assert
+    assert cache.lookup('broken.profile') == (False, None)
+    assert cache.lookup('jane.doe') == (True, '1104705831')
+
+
+def test_size_bound_evicts_oldest(cache_path):
+    # Arrange
+    cache = ResolutionCache(cache_path, 60, 60, 2)
+
+    # Act
+    cache.store('a', '1')
+    cache.store('b', '2')
+    cache.store('c', '3')
+
+    # Assert
+    assert len(cache) == 2
+    assert cache.lookup('a') == (False, None)
+
+
+def test_save_and_load_round_trip(cache_path):
+    # Arrange
+    cache = ResolutionCache(cache_path, 60, 60, 10)
+    cache.store('jane.doe', '1104705831')
+    cache.store('broken.profile', None)
+
+    # Act
+    cache.save(logger)
+    reloaded = ResolutionCache(cache_path, 60, 60, 10)
+    reloaded.load(logger)
+
+    # Assert
+    assert reloaded.lookup('jane.doe') == (True, '1104705831')
+    assert reloaded.lookup('broken.profile') == (True, None)
+
+
+def test_failed_resolution_raises_unless_skipped(cache_path, monkeypatch):
+    # Arrange
+    def fail(browser, vanity_name, logger):
+        raise SystemError
+
+    monkeypatch.setattr(fb2cal, 'get_entity_id_from_vanity_name', fail)
+    cache = ResolutionCache(cache_path, 60, 60, 10)
+
+    # Act
+    with pytest.raises(SystemError):
+        fb2cal.resolve_vanity_name(None, 'broken.profile', logger, cache)
+    not_stored = cache.lookup('broken.profile')
+    skipped = fb2cal.resolve_vanity_name(None, 'broken.profile', logger,
+                                         cache, skip_unresolved=True)
+
+    # Assert
+    assert not_stored == (False, None)
+    assert skipped is None
+    assert cache.lookup('broken.profile') == (True, None)
+    with pytest.raises(SystemError):
+        fb2cal.resolve_vanity_name(None, 'broken.profile', logger, cache)
@@ -0,0 +1,43 @@
+import time
+import pytest
+from startup import StartupOrchestrator
+
+
+def test_stages_overlap_and_receive_dependency_results():
+    # Arrange
+    def slow(value):
+        time.sleep(0.2)
+        return value
+
+    # Act
+    with StartupOrchestrator() as startup:
+        cookies = startup.submit('cookies', lambda: 'cookies')
+        login = startup.submit('login', slow, cookies)
+        download = startup.submit('download', slow, cookies)
+        joined = startup.run('join', lambda a, b: (a, b), login.result(),
+                             download.result())
+
+    # Assert
+    assert joined == ('cookies', 'cookies')
+    assert set(startup.timings) == {'cookies', 'login', 'download', 'join'}
+    assert startup.timings['login'] >= 0.2
+    assert startup.elapsed() < startup.timings['login'] + \
+        startup.timings['download']
+    assert 'login' in startup.report()
+
+
+def test_stage_errors_are_raised_by_dependents():
+    # Arrange
+    def fail():
+        raise ValueError('login failed')
+
+    # Act
+    with StartupOrchestrator() as startup:
+        login = startup.submit('login', fail)
+        update = startup.submit('update', lambda client: client, login)
+
+    # Assert
+    with pytest.raises(ValueError):
+        update.result()
+    assert 'login' in startup.timings
+    assert 'update' not in startup.timings
@@ -0,0 +1,101 @@
+import configparser
+import os
+import arrow
+from birthday_db import BirthdayDatabase
+from calendar_store import CalendarStore
+from friend_directory import Friend
+from warm_start import WarmStartSnapshot, source_digest
+from fb_user import FBUser, create_birthday_record, save_cal_and_logout
+
+
+def test_snapshot_round_trip_and_digest_mismatch(tmp_path):
+    # Arrange
+    source_path = os.path.join(str(tmp_path), 'birthdays.db')
+    with open(source_path, 'wb') as f:
+        f.write(b'birthdays')
+    snapshot_path = os.path.join(str(tmp_path), 'warm_start.bin')
+    store = CalendarStore.from_records([
+        create_birthday_record('1', 'Jane Doe', arrow.get('2020-10-21')),
+        create_birthday_record('2', 'John Doe', arrow.get('2020-11-02'))])
+    store.set_description(store.get('1'), 'Happy birthday!')
+    friends = {'1': Friend('Jane Doe', 'url', 'photo')}
+    digest = source_digest([source_path])
+    WarmStartSnapshot(snapshot_path).save(digest, store, friends)
+
+    # Act
+    snapshot = WarmStartSnapshot(snapshot_path)
+    loaded = snapshot.load(digest)
+    with open(source_path, 'ab') as f:
+        f.write(b' changed')
+    stale = WarmStartSnapshot(snapshot_path).load(source_digest([source_path]))
+
+    # Assert
+    assert loaded
+    assert not stale
+    assert sorted(record.uid for record in snapshot.records) == ['1', '2']
+    assert {record.uid: record.description
+            for record in snapshot.records}['1'] == 'Happy birthday!'
+    assert snapshot.friends == friends
+
+
+def test_snapshot_matches_reopened_database(tmp_path):
+    # Arrange
+    db_path = os.path.join(str(tmp_path), 'birthdays.db')
+    snapshot_path = os.path.join(str(tmp_path), 'warm_start.bin')
+    db = BirthdayDatabase(db_path)
+    store = db.load_store()
+    store.add(create_birthday_record('1', 'Jane Doe', arrow.get('2020-10-21')))
+    store.set_description(store.get('1'), 'Happy birthday!')
+    store.close()
+    WarmStartSnapshot(snapshot_path).save(source_digest(db.source_paths()),
+                                          store, {})
+
+    # Act
+    reopened = BirthdayDatabase(db_path)
+    loaded = WarmStartSnapshot(snapshot_path).load(
+        source_digest(reopened.source_paths()))
+    reopened.close()
+
+    # Assert
+    assert loaded
+
+
+def test_missing_or_corrupt_snapshot_is_ignored(tmp_path):
+    # Arrange
+    snapshot_path = os.path.join(str(tmp_path), 'warm_start.bin')
+
+    # Act
+    missing = WarmStartSnapshot(snapshot_path).load('digest')
+    with open(snapshot_path, 'wb') as f:
+        f.write(b'not a snapshot')
+    corrupt = WarmStartSnapshot(snapshot_path).load('digest')
+
+    # Assert
+    assert not missing
+    assert not corrupt
+
+
+def test_exit_closes_storage_when_background_login_fails(tmp_path,
+                                                         monkeypatch):
+    # Arrange
+    db_path = os.path.join(str(tmp_path), 'birthdays.db')
+    user = FBUser('username', 'password',
+                  BirthdayDatabase(db_path).load_store(),
+                  fb2cal_config=configparser.ConfigParser(), defer_login=True)
+    monkeypatch.setattr(user, 'save_warm_start', lambda: None)
+
+    def fail_login():
+        raise ConnectionError('login failed')
+
+    user.start_background_refresh(fail_login)
+    user.birthday_store.add(
+        create_birthday_record('1', 'Jane Doe', arrow.get('2020-10-21')))
+
+    # Act
+    save_cal_and_logout(user)
+
+    # Assert
+    assert isinstance(user.refresh_error, ConnectionError)
+    assert not user.is_logged_in()
+    assert [record.uid for record in
+            BirthdayDatabase(db_path).load_records()] == ['1']
@@ -1,4 +1,6 @@
 from typing import List
+import logging
+import os
 from os import path
 from settings import *
 import exceptions
@@ -7,7 +9,8 @@ from ics import Calendar
 from fb2cal.src import fb2cal
 import random
 from datetime import datetime
-from typing import Dict
+from typing import Dict, Optional
+from calendar_store import BirthdayRecord
 import ast
 
 """
@@ -76,33 +79,44 @@ def read_account_details() -> List[str]:
     return account_details
 
 
-def set_fb2cal_config_fb_email_fb_pass(username: str, password: str) -> None:
-    """Update fb_email and fb_pass in fb2cal config.ini file.
+def read_fb2cal_config(username: str,
+                       password: str) -> configparser.ConfigParser:
+    """Read the fb2cal config.ini file into memory and set fb_email and
+    fb_pass. The file itself is left unchanged.
     :param username:    Facebook username
-    :param username:    Facebook password
-    :return:            None
+    :param password:    Facebook password
+    :return:            The fb2cal configuration
     """
     configuration = configparser.ConfigParser()
-    configuration.read(config.config_dir)
+    configuration.read(config.config_dir, encoding='UTF-8')
     configuration.set("AUTH", "fb_email", username)
     configuration.set("AUTH", "fb_pass", password)
-    with open(config.config_dir, "w") as f:
-        configuration.write(f)
+    return configuration
 
 
-def parse_ics() -> Calendar:
+def parse_ics(path: str = config.calendar_dir) -> Calendar:
     """ Parse a calendar from ics format.
+    :param path:    Path of the ics file, calendar_dir by default
     :return: A Calendar object
     """
-    with open(config.calendar_dir, 'rb') as g:
+    with open(path, 'rb') as g:
         return Calendar(g.read().decode())
 
 
-def download_birthday_calendar() -> None:
-    """ Gets a birthday calendar from Facebook and saves it as an ics file.
+def download_birthday_records(fb2cal_config: configparser.ConfigParser,
+                              session_cookies: Dict = None) \
+        -> Optional[List[BirthdayRecord]]:
+    """ Gets the birthdays from Facebook by running fb2cal in-process, as
+    compact birthday records rather than an ics Calendar.
     Facebook calendar can be downloaded only once a day. The date of the last
-    download is saved in download_date.txt
-    :return:    None
+    download is saved in download_date.txt by mark_downloaded, which the
+    caller calls once the calendar is stored, so that a failed update is
+    retried on the next start.
+    :param fb2cal_config:   The fb2cal configuration, see read_fb2cal_config
+    :param session_cookies: Session cookies of an existing Facebook login to
+                            reuse instead of logging in again
+    :return:                The downloaded birthday records, or None if they
+                            have already been downloaded today
     """
     # check if the download_date.txt file exists
     # if not, return an exception
@@ -112,17 +126,43 @@ def download_birthday_calendar() -> None:
     # if it is not written in download_date.txt or is not the same date as
     # today's, download the FB birthdays calendar
     # Otherwise, skip downloading
-    with open(config.download_date, 'r+') as f:
+    with open(config.download_date, 'r') as f:
         download_date = f.read()
-        today = datetime.today().strftime('%Y-%m-%d')
-        if not download_date or download_date != today:
-            fb2cal.main2()
-            f.seek(0)
-            f.write(today)
-            f.truncate()
-            print("FB birthdays calendar is downloaded")
-        else:
-            print("FB birthdays calendar cannot be downloaded twice a day")
+    today = datetime.today().strftime('%Y-%m-%d')
+    if not download_date or download_date != today:
+        records = {}
+        for event in fb2cal.fetch_birthday_events(fb2cal_config,
+                                                  session_cookies):
+            birthday = event.birthday
+            # keep the first event of a uid, like CalendarStore does
+            records.setdefault(birthday.uid, BirthdayRecord(
+                birthday.uid, f"{birthday.name}'s Birthday", event.year,
+                birthday.month, birthday.day))
+        print("FB birthdays calendar is downloaded")
+        return list(records.values())
+    else:
+        print("FB birthdays calendar cannot be downloaded twice a day")
+        return None
+
+
+def mark_downloaded() -> None:
+    """ Save today's date in download_date.txt, see
+    download_birthday_records.
+    :return:    None
+    """
+    with open(config.download_date, 'w') as f:
+        f.write(datetime.today().strftime('%Y-%m-%d'))
+
+
+def set_up_logging() -> None:
+    """ Write Genie's log records, e.g. failures of the background refresh,
+    to log_path rather than over the menu.
+    :return:    None
+    """
+    os.makedirs(path.dirname(config.log_path), exist_ok=True)
+    logging.basicConfig(filename=config.log_path, level=logging.INFO,
+                        format='[%(asctime)s] %(name)s %(levelname)s '
+                               '%(message)s')
 
 
 def read_cookies() -> Dict:
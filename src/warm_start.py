@@ -0,0 +1,86 @@
+import hashlib
+import marshal
+import os
+import sys
+from typing import Dict, Iterable, List, Optional
+from calendar_store import BirthdayRecord, CalendarStore
+from friend_directory import Friend
+
+SNAPSHOT_VERSION = 1
+# marshal data is only readable by the Python version that wrote it
+FORMAT = (SNAPSHOT_VERSION, marshal.version, sys.version_info[:2])
+
+
+def source_digest(paths: Iterable[str]) -> str:
+    """ Hash the contents of the files a snapshot is made from. Missing files
+    are hashed as empty.
+    :param paths:   Paths of the source files
+    :return:        A hex digest
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(path.encode())
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(chunk)
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class WarmStartSnapshot:
+    """
+    Binary snapshot of the birthday records and the friends list, keyed by a
+    digest of the birthday storage it was taken from, so that a later start
+    can skip loading the storage and fetching the friends list.
+    """
+    path: str
+    records: List[BirthdayRecord]
+    friends: Dict
+
+    def __init__(self, path: str) -> None:
+        """ Initialize an empty warm start snapshot.
+        :param path:    Path of the snapshot file
+        :return         None
+        """
+        self.path = path
+        self.records = []
+        self.friends = {}
+
+    def load(self, digest: str) -> bool:
+        """ Load the snapshot if it was taken from storage with this digest.
+        :param digest:  Digest of the birthday storage, see source_digest
+        :return:        True if the snapshot was loaded
+        """
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, 'rb') as f:
+                snapshot_format, snapshot_digest, records, friends = \
+                    marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            # an unreadable snapshot is ignored and overwritten on exit
+            return False
+        if tuple(snapshot_format) != FORMAT or snapshot_digest != digest:
+            return False
+        self.records = [BirthdayRecord(*record) for record in records]
+        self.friends = {uid: Friend(*friend)
+                        for uid, friend in friends.items()}
+        return True
+
+    def save(self, digest: str, store: CalendarStore,
+             friends: Optional[Dict]) -> None:
+        """ Write the snapshot atomically.
+        :param digest:  Digest of the birthday storage, see source_digest
+        :param store:   Birthday records to save
+        :param friends: Friends list to save, if one has been loaded
+        :return:        None
+        """
+        records = [(record.uid, record.name, record.year, record.month,
+                    record.day, record.description) for record in store]
+        friends = {uid: tuple(friend)
+                   for uid, friend in (friends or {}).items()}
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            marshal.dump((FORMAT, digest, records, friends), f)
+        os.replace(tmp_path, self.path)